@@ -0,0 +1,78 @@
+"""
+Measure the overhead of logging on PageSoup.find, per call, with the logger in different
+states (see selene.core.logger.log_enabled and set_silent).
+
+    python -m benchmarks.bench_logging
+"""
+
+import io
+import logging
+import timeit
+
+from selene.core.logger import set_silent
+from selene.core.soup.page import PageSoup
+
+HTML = '<div id="main"><p class="a">1</p><span class="b">2</span></div>'
+ARGS = ("span", {"class": "b"})
+
+
+def get_test_logger(level):
+    """Get a logger which writes to memory, so that output does not affect the timings."""
+    logger = logging.getLogger(f"bench_logging.{level}")
+    logger.handlers = [logging.StreamHandler(io.StringIO())]
+    logger.setLevel(level)
+    logger.propagate = False
+    return logger
+
+
+def best_of(func, repeat=5, number=20000):
+    """Return the best time per call (in seconds) over a number of repeats."""
+    return min(timeit.repeat(func, repeat=repeat, number=number)) / number
+
+
+def run(repeat=5, number=20000):
+    """
+    Run the benchmark.
+
+    Returns
+    ----------
+        results : list
+            one dict per case, with the time per find call in seconds
+    """
+    page = PageSoup.from_html("http://a.b/", HTML)
+    cases = [
+        ("logger=None", None, False),
+        ("logger at INFO (DEBUG off)", get_test_logger("INFO"), False),
+        ("logger at DEBUG, set_silent()", get_test_logger("DEBUG"), True),
+        ("logger at DEBUG (output)", get_test_logger("DEBUG"), False),
+    ]
+    results = []
+    for label, logger, silent in cases:
+        page.logger = logger
+        set_silent(silent)
+        try:
+            seconds = best_of(lambda: page.find(*ARGS), repeat, number)
+        finally:
+            set_silent(False)
+        results.append({"case": label, "seconds": seconds})
+    return results
+
+
+def main():
+    """
+    Run the benchmark and print the time per find call, and the overhead of logging
+    (compared with logger=None).
+    """
+    results = run()
+    baseline = results[0]["seconds"]
+    print(f"{'case':<34}{'per find':>12}{'overhead':>12}")
+    for result in results:
+        seconds = result["seconds"]
+        print(
+            f"{result['case']:<34}{seconds * 1e6:>10.2f}us"
+            f"{(seconds - baseline) * 1e6:>10.2f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
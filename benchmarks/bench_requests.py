@@ -0,0 +1,92 @@
+"""
+Time fetching and parsing pages with PageSoup.from_request, from the local fixture
+server (see benchmarks.fixtures.FixtureServer): one large page, and a crawl loop over
+many pages, sequentially and from a pool of threads sharing one HttpSession.
+
+    python -m benchmarks.bench_requests
+"""
+
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+
+from selene.core.soup.page import PageSoup
+from selene.core.soup.session import HttpSession
+
+from benchmarks.fixtures import FixtureServer
+
+
+def best_of(func, repeat=3, number=1):
+    """Return the best time per call (in seconds) over a number of repeats."""
+    return min(timeit.repeat(func, repeat=repeat, number=number)) / number
+
+
+def crawl(session, url):
+    """Fetch and parse one page, and find the data on it, as a crawl loop would."""
+    page = PageSoup.from_request(url, session=session)
+    return len(page.find_all("h3", {"class": "country-name"}))
+
+
+def run(repeat=3, pages=40, latency=20, workers=4):
+    """
+    Run the benchmark.
+
+    Parameters
+    ----------
+        repeat : int
+            the number of times to repeat each case (the best time is kept)
+        pages : int
+            the number of pages in the crawl loop
+        latency : int
+            the server's response time for each page in the crawl loop, in milliseconds
+        workers : int
+            the number of threads in the threaded crawl loop
+
+    Returns
+    ----------
+        results : list
+            one dict per case, with the time in seconds
+    """
+    results = []
+    with FixtureServer() as server, HttpSession(pool_maxsize=workers) as session:
+        url_table = server.url("table")
+        urls = [
+            server.url("countries", n=50, seed=i, latency=latency) for i in range(pages)
+        ]
+
+        def crawl_threads():
+            with ThreadPoolExecutor(workers) as executor:
+                list(executor.map(lambda url: crawl(session, url), urls))
+
+        cases = [
+            ("from_request table (5000 rows)", lambda: crawl(session, url_table), 1),
+            (
+                f"crawl loop {pages} pages ({latency}ms latency), sequential",
+                lambda: [crawl(session, url) for url in urls],
+                pages,
+            ),
+            (
+                f"crawl loop {pages} pages ({latency}ms latency), {workers} threads",
+                crawl_threads,
+                pages,
+            ),
+        ]
+        for label, func, n_pages in cases:
+            seconds = best_of(func, repeat)
+            results.append(
+                {"case": label, "seconds": seconds, "pages_per_second": n_pages / seconds}
+            )
+    return results
+
+
+def main():
+    """Run the benchmark and print the time and throughput of each case."""
+    print(f"{'case':<56}{'seconds':>10}{'pages/s':>10}")
+    for result in run():
+        print(
+            f"{result['case']:<56}{result['seconds']:>10.3f}"
+            f"{result['pages_per_second']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Time the PageSelene navigation, find and scroll paths, the condition waits and the
+CrawlerSelene loop against the local fixture server (see benchmarks.fixtures), so the
+timings do not depend on a live site. Requires Chrome and chromedriver.
+
+    python -m benchmarks.bench_selenium
+"""
+
+import time
+
+from selenium.webdriver.common.by import By
+
+from selene.core.config import *
+from selene.core.selenium.page import PageSelene
+from selene.core.selenium.driver import get_driver, stop_driver
+from selene.core.selenium.crawler import CrawlerSelene
+from selene.core.selenium.conditions import bool_visible
+
+from benchmarks.fixtures import FixtureServer
+
+
+def best_of(func, repeat=3, setup=None):
+    """
+    Return the best time (in seconds) of a function over a number of repeats, calling
+    setup (untimed) before each repeat.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def cases_page(driver, server):
+    """The navigation, find and soup cases, as (label, function, setup)."""
+    url_countries = server.url("countries")
+    url_table = server.url("table", rows=1000)
+    page = PageSelene.from_url(driver, url_table)
+    return [
+        ("from_url countries", lambda: PageSelene.from_url(driver, url_countries), None),
+        (
+            "from_url table (1000 rows)",
+            lambda: PageSelene.from_url(driver, url_table),
+            None,
+        ),
+        (
+            "find_all tr.result",
+            lambda: page.find_all(driver, By.CSS_SELECTOR, "tr.result"),
+            lambda: driver.get(url_table),
+        ),
+        (
+            "find_all tr.result + get_text",
+            lambda: [
+                element.get_text()
+                for element in page.find_all(driver, By.CSS_SELECTOR, "tr.result")
+            ],
+            None,
+        ),
+        (
+            "find_all tr.result, prefetch",
+            lambda: page.find_all(driver, By.CSS_SELECTOR, "tr.result", prefetch=True),
+            None,
+        ),
+        (
+            "extract_all tr.result text",
+            lambda: page.extract_all(driver, By.CSS_SELECTOR, "tr.result"),
+            None,
+        ),
+        (
+            "get_page_soup + find_all_soup tr",
+            lambda: page.get_page_soup(driver).find_all("tr", {"class": "result"}),
+            None,
+        ),
+    ]
+
+
+def cases_waits(driver, server, delay=500):
+    """
+    The condition wait cases, as (label, function, setup): the time from navigating to
+    a page until an element added after delay milliseconds is found, with each wait engine.
+    """
+    url_slow = server.url("slow", delay=delay)
+    cases = []
+    for engine in ("poll", "observer"):
+        policy = WaitPolicy(engine=engine)
+
+        def wait(policy=policy):
+            driver.get(url_slow)
+            assert bool_visible(
+                driver, By.CLASS_NAME, "slow-item", WAIT_NORMAL, None, policy
+            )
+
+        cases.append((f"wait for element after {delay}ms ({engine})", wait, None))
+    return cases
+
+
+def cases_scroll(driver, server):
+    """The scrolling and tab panel cases, as (label, function, setup)."""
+    url_scroll = server.url("scroll", n=200, batch=50, delay=50)
+    url_tabs = server.url("tabs")
+    page_scroll = PageSelene(driver, url_scroll)
+    page_tabs = PageSelene(driver, url_tabs)
+
+    def click_tabs():
+        for i in range(1, 10):
+            page_tabs.click(driver, By.ID, f"tab-{i}")
+            assert bool_visible(driver, By.ID, f"panel-{i}", WAIT_NORMAL, None)
+
+    return [
+        (
+            "expand_scroll_height (200 items)",
+            lambda: page_scroll.expand_scroll_height(driver),
+            lambda: driver.get(url_scroll),
+        ),
+        ("click 9 tab panels", click_tabs, lambda: driver.get(url_tabs)),
+    ]
+
+
+def cases_tabs(driver, server, n=8, latency=250):
+    """Loading pages one by one, and in browser tabs, as (label, function, setup)."""
+    urls = [server.url("countries", n=50, seed=i, latency=latency) for i in range(n)]
+    return [
+        (
+            f"from_url {n} pages ({latency}ms latency), sequential",
+            lambda: [PageSelene.from_url(driver, url) for url in urls],
+            None,
+        ),
+        (
+            f"from_urls_in_tabs {n} pages ({latency}ms latency), 4 tabs",
+            lambda: list(PageSelene.from_urls_in_tabs(driver, urls, tabs=4)),
+            None,
+        ),
+    ]
+
+
+def cases_crawler(server, driver_kwargs, n=8, latency=250):
+    """
+    The CrawlerSelene.run cases (including starting the drivers), as
+    (label, function, setup).
+    """
+    urls = [server.url("countries", n=50, seed=i, latency=latency) for i in range(n)]
+
+    def task(url):
+        def scrape(driver, id_page):
+            page = PageSelene.from_url(driver, url, id_page=id_page)
+            return len(page.find_all_soup("h3", {"class": "country-name"}))
+
+        return scrape
+
+    def crawl(workers):
+        crawler = CrawlerSelene(debug=False)
+        results = list(crawler.run([task(url) for url in urls], workers, **driver_kwargs))
+        assert all(result.error is None for result in results)
+
+    return [
+        (
+            f"CrawlerSelene.run {n} pages, {workers} workers",
+            lambda w=workers: crawl(w),
+            None,
+        )
+        for workers in (1, 2)
+    ]
+
+
+def run(repeat=3, driver_kwargs=None):
+    """
+    Run the benchmark.
+
+    Parameters
+    ----------
+        repeat : int
+            the number of times to repeat each case (the best time is kept)
+        driver_kwargs : dict
+            passed through to get_driver
+
+    Returns
+    ----------
+        results : list
+            one dict per case, with the time in seconds
+    """
+    driver_kwargs = driver_kwargs or {}
+    results = []
+    with FixtureServer() as server:
+        driver = get_driver(**driver_kwargs)
+        try:
+            cases = (
+                cases_page(driver, server)
+                + cases_waits(driver, server)
+                + cases_scroll(driver, server)
+                + cases_tabs(driver, server)
+            )
+            for label, func, setup in cases:
+                results.append({"case": label, "seconds": best_of(func, repeat, setup)})
+        finally:
+            stop_driver(driver)
+        for label, func, setup in cases_crawler(server, driver_kwargs):
+            results.append({"case": label, "seconds": best_of(func, 1, setup)})
+    return results
+
+
+def main():
+    """Run the benchmark and print the time of each case."""
+    print(f"{'case':<56}{'seconds':>10}")
+    for result in run():
+        print(f"{result['case']:<56}{result['seconds']:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
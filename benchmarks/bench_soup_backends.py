@@ -0,0 +1,107 @@
+"""
+Compare the PageSoup parser backends (see selene.core.soup.backends) on the
+fixture pages: parse time, and find/find_all time on the parsed tree.
+
+    python -m benchmarks.bench_soup_backends
+"""
+
+import timeit
+
+from selene.core.soup.page import PageSoup
+from selene.core.soup.backends import BACKENDS
+
+from benchmarks.fixtures import page_countries, page_table
+
+# (page name, html, parse_only target, [(label, method, args), ...])
+CASES = [
+    (
+        "countries",
+        page_countries(),
+        ("h3", {"class": "country-name"}),
+        [
+            ("find_all h3.country-name", "find_all", ("h3", {"class": "country-name"})),
+            ("find div.col-md-4.country", "find", ("div", {"class": "col-md-4 country"})),
+            ("find a.data-attribution", "find", ("a", {"class": "data-attribution"})),
+        ],
+    ),
+    (
+        "table",
+        page_table(),
+        ("div", {"id": "header"}),
+        [
+            ("find_all tr.result", "find_all", ("tr", {"class": "result"})),
+            ("find_all a", "find_all", ("a",)),
+            ("find div#footer", "find", ("div", {"id": "footer"})),
+        ],
+    ),
+]
+
+
+def best_of(func, repeat=5, number=1):
+    """Return the best time per call (in seconds) over a number of repeats."""
+    return min(timeit.repeat(func, repeat=repeat, number=number)) / number
+
+
+def run(repeat=5):
+    """
+    Run the benchmark.
+
+    Returns
+    ----------
+        results : list
+            one dict per (page, operation, backend), with the time in seconds
+    """
+    results = []
+    for name, html, parse_only, finds in CASES:
+        for backend in BACKENDS:
+            timings = [
+                (
+                    "parse",
+                    lambda: PageSoup.from_html("http://a.b/", html, backend=backend),
+                    1,
+                ),
+                (
+                    "parse (parse_only)",
+                    lambda: PageSoup.from_html(
+                        "http://a.b/", html, backend=backend, parse_only=parse_only
+                    ),
+                    1,
+                ),
+            ]
+            page = PageSoup.from_html("http://a.b/", html, backend=backend)
+            for label, method, args in finds:
+                timings.append((label, lambda m=method, a=args: getattr(page, m)(*a), 10))
+            for label, func, number in timings:
+                seconds = best_of(func, repeat, number)
+                results.append(
+                    {
+                        "page": name,
+                        "operation": label,
+                        "backend": backend,
+                        "seconds": seconds,
+                    }
+                )
+    return results
+
+
+def main():
+    """Run the benchmark and print a comparison table."""
+    results = run()
+    rows = {}
+    for result in results:
+        rows.setdefault((result["page"], result["operation"]), {})[result["backend"]] = (
+            result["seconds"]
+        )
+    backends = list(BACKENDS)
+    print(
+        f"{'page':<10} {'operation':<28}"
+        + "".join(f"{b:>12}" for b in backends)
+        + f"{'speedup':>10}"
+    )
+    for (page, operation), times in rows.items():
+        cells = "".join(f"{times[b] * 1000:>10.2f}ms" for b in backends)
+        print(f"{page:<10} {operation:<28}{cells}{times['bs4'] / times['lxml']:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+"""
+Generated html fixture pages, modelled on the pages we scrape, so benchmarks
+can run offline and give the same input on every run.
+
+FixtureServer serves them over http from a local thread, for the benchmarks which
+need a browser or real requests:
+
+    with FixtureServer() as server:
+        page = PageSoup.from_request(server.url("table", rows=100))
+"""
+
+import time
+import random
+import threading
+import functools
+from urllib.parse import urlencode, urlsplit, parse_qsl
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+def page_countries(n=250, seed=0):
+    """
+    A grid of country cards, like https://www.scrapethissite.com/pages/simple/
+
+    Parameters
+    ----------
+        n : int
+            the number of countries
+        seed : int
+            the random seed
+
+    Returns
+    ----------
+        html : str
+            the page html
+    """
+    rng = random.Random(seed)
+    cards = []
+    for i in range(n):
+        cards.append(f"""
+            <div class="col-md-4 country">
+                <h3 class="country-name"><i class="flag-icon flag-icon-{i}"></i>Country {i}</h3>
+                <div class="country-info">
+                    <strong>Capital:</strong> <span class="country-capital">Capital {i}</span><br>
+                    <strong>Population:</strong> <span class="country-population">{rng.randint(1000, 10**9)}</span><br>
+                    <strong>Area (km<sup>2</sup>):</strong> <span class="country-area">{rng.random() * 10**6:.1f}</span><br>
+                </div>
+            </div>""")
+    return f"""<!doctype html>
+<html lang="en">
+<head><title>Countries of the World</title><script>var x = 1;</script></head>
+<body>
+    <nav id="site-nav"><a href="/" id="nav-homepage">Home</a><a href="/pages/">Sandbox</a></nav>
+    <section id="countries">
+        <div class="container">
+            <div class="row"><div class="col-md-6 text-right">There are {n} countries.
+                <a class="data-attribution" href="http://example.com/">Data via example.com</a>
+            </div></div>
+            <div class="row">{"".join(cards)}
+            </div>
+        </div>
+    </section>
+</body>
+</html>"""
+
+
+def page_table(rows=5000, columns=8, seed=0):
+    """
+    A large results table, with a link in the first column of every row.
+
+    Parameters
+    ----------
+        rows : int
+            the number of table rows
+        columns : int
+            the number of table columns
+        seed : int
+            the random seed
+
+    Returns
+    ----------
+        html : str
+            the page html
+    """
+    rng = random.Random(seed)
+    header = "".join(f"<th>Column {j}</th>" for j in range(columns))
+    body = []
+    for i in range(rows):
+        cells = "".join(
+            f"<td class='cell'>{rng.randint(0, 10**6)}</td>" for _ in range(columns - 1)
+        )
+        body.append(
+            f"<tr class='result {'odd' if i % 2 else 'even'}'>"
+            f"<td class='cell name'><a href='/cases/{i}'>Case {i}</a></td>{cells}</tr>"
+        )
+    return f"""<!doctype html>
+<html>
+<head><title>Results</title></head>
+<body>
+    <div id="header"><h1>Results</h1><p class="summary">{rows} results</p></div>
+    <table id="results"><thead><tr>{header}</tr></thead><tbody>{"".join(body)}</tbody></table>
+    <div id="footer"><a href="/about">About</a></div>
+</body>
+</html>"""
+
+
+def page_scroll(n=500, batch=50, delay=100):
+    """
+    An infinite scroll list: a first batch of items, and another batch appended
+    (after a delay) whenever the page is scrolled to the bottom, until there are n.
+
+    Parameters
+    ----------
+        n : int
+            the total number of items
+        batch : int
+            the number of items loaded at a time
+        delay : int
+            the time taken to load a batch, in milliseconds
+
+    Returns
+    ----------
+        html : str
+            the page html
+    """
+    return f"""<!doctype html>
+<html>
+<head><title>Feed</title><style>.item {{ height: 40px; }}</style></head>
+<body>
+    <div id="feed"></div>
+    <div id="loading" style="display: none">Loading...</div>
+    <script>
+    var total = {n}, batch = {batch}, delay = {delay}, loading = false;
+    var feed = document.getElementById("feed");
+    function load() {{
+        var start = feed.children.length;
+        for (var i = start; i < Math.min(start + batch, total); i++) {{
+            var item = document.createElement("div");
+            item.className = "item";
+            item.innerHTML = "<a href='/items/" + i + "'>Item " + i + "</a>";
+            feed.appendChild(item);
+        }}
+    }}
+    load();
+    window.addEventListener("scroll", function () {{
+        var bottom = window.innerHeight + window.scrollY >= document.body.scrollHeight - 10;
+        if (!bottom || loading || feed.children.length >= total) return;
+        loading = true;
+        document.getElementById("loading").style.display = "block";
+        setTimeout(function () {{
+            load();
+            loading = false;
+            document.getElementById("loading").style.display = "none";
+        }}, delay);
+    }});
+    </script>
+</body>
+</html>"""
+
+
+def page_tabs(tabs=10, rows=100, seed=0):
+    """
+    A page of tab panels, only the first of which is visible: clicking a tab shows its
+    panel (a table) and hides the others.
+
+    Parameters
+    ----------
+        tabs : int
+            the number of tabs
+        rows : int
+            the number of table rows per panel
+        seed : int
+            the random seed
+
+    Returns
+    ----------
+        html : str
+            the page html
+    """
+    rng = random.Random(seed)
+    buttons, panels = [], []
+    for i in range(tabs):
+        buttons.append(
+            f'<li><a href="#" class="tab" id="tab-{i}" data-panel="{i}">Tab {i}</a></li>'
+        )
+        body = "".join(
+            f"<tr class='result'><td>{i}.{j}</td><td>{rng.randint(0, 10**6)}</td></tr>"
+            for j in range(rows)
+        )
+        style = "" if i == 0 else ' style="display: none"'
+        panels.append(
+            f'<div class="panel" id="panel-{i}"{style}><table>{body}</table></div>'
+        )
+    return f"""<!doctype html>
+<html>
+<head><title>Tabs</title></head>
+<body>
+    <ul id="tabs">{"".join(buttons)}</ul>
+    <div id="panels">{"".join(panels)}</div>
+    <script>
+    document.querySelectorAll(".tab").forEach(function (tab) {{
+        tab.addEventListener("click", function (event) {{
+            event.preventDefault();
+            document.querySelectorAll(".panel").forEach(function (panel) {{
+                panel.style.display = "none";
+            }});
+            document.getElementById("panel-" + tab.dataset.panel).style.display = "block";
+        }});
+    }});
+    </script>
+</body>
+</html>"""
+
+
+def page_slow(delay=500, n=10):
+    """
+    A page whose content is added by JavaScript after a delay, like a page filled by
+    an api call after it has loaded.
+
+    Parameters
+    ----------
+        delay : int
+            the time before the content is added, in milliseconds
+        n : int
+            the number of elements added
+
+    Returns
+    ----------
+        html : str
+            the page html
+    """
+    return f"""<!doctype html>
+<html>
+<head><title>Slow</title></head>
+<body>
+    <div id="content"><p class="placeholder">Loading...</p></div>
+    <script>
+    setTimeout(function () {{
+        var html = "";
+        for (var i = 0; i < {n}; i++) {{
+            html += "<div class='slow-item'>Item " + i + "</div>";
+        }}
+        document.getElementById("content").innerHTML = html;
+    }}, {delay});
+    </script>
+</body>
+</html>"""
+
+
+PAGES = {
+    "countries": page_countries,
+    "table": page_table,
+    "scroll": page_scroll,
+    "tabs": page_tabs,
+    "slow": page_slow,
+}
+
+
+@functools.lru_cache(maxsize=64)
+def render(name, params=()):
+    """
+    Generate a fixture page (cached, as the pages are deterministic).
+
+    Parameters
+    ----------
+        name : str
+            the name of the page (see PAGES)
+        params : tuple
+            (name, int) pairs of arguments for the page's function
+
+    Returns
+    ----------
+        html : bytes
+            the page html, utf-8 encoded
+    """
+    return PAGES[name](**dict(params)).encode()
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """
+    Serve /<page name>?<arguments> (see PAGES). The "latency" argument delays the
+    response by that many milliseconds, to model a remote server.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        """Send a fixture page."""
+        parts = urlsplit(self.path)
+        name = parts.path.strip("/") or "countries"
+        params = {key: int(value) for key, value in parse_qsl(parts.query)}
+        latency = params.pop("latency", 0)
+        if name not in PAGES:
+            self.send_error(404)
+            return
+        body = render(name, tuple(sorted(params.items())))
+        if latency:
+            time.sleep(latency / 1000)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """Do not log requests."""
+
+
+class FixtureServer:
+    """
+    Serve the fixture pages from a local http server, in a background thread.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0):
+        """
+        Initialise a FixtureServer instance.
+
+        Parameters
+        ----------
+            host : str
+                the host to bind to
+            port : int
+                the port to bind to (default: any free port)
+        """
+        self.server = ThreadingHTTPServer((host, port), FixtureHandler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    def url(self, name, **params):
+        """
+        Get the url of a fixture page.
+
+        Parameters
+        ----------
+            name : str
+                the name of the page (see PAGES)
+            params :
+                arguments for the page's function, and/or latency (in milliseconds)
+
+        Returns
+        ----------
+            url : str
+                the page's url
+        """
+        host, port = self.server.server_address[:2]
+        query = f"?{urlencode(params)}" if params else ""
+        return f"http://{host}:{port}/{name}{query}"
+
+    def start(self):
+        """Start serving in a background thread."""
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving, and close the socket."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        """Start serving; stop() is called on exit."""
+        return self.start()
+
+    def __exit__(self, *args):
+        """Stop serving."""
+        self.stop()
@@ -0,0 +1,169 @@
+"""
+Run the benchmark suites and write the results as JSON, so that runs on different
+versions (or machines) can be compared:
+
+    python -m benchmarks.run --output results/v1.1.0.json
+    python -m benchmarks.run --suites soup_backends,requests --compare results/v1.0.2.json
+
+A suite which cannot run (e.g. selenium, when Chrome is not installed) is recorded as
+skipped, with the reason. With --compare, the exit status is 1 if any case is slower
+than in the baseline by more than --threshold.
+"""
+
+import sys
+import json
+import argparse
+import platform
+import subprocess
+from datetime import datetime, timezone
+from importlib import metadata
+
+from benchmarks import bench_logging, bench_requests, bench_selenium, bench_soup_backends
+
+# The benchmark suites, by name: each run() returns a list of dicts with a "seconds" key
+SUITES = {
+    "soup_backends": bench_soup_backends.run,
+    "logging": bench_logging.run,
+    "requests": bench_requests.run,
+    "selenium": bench_selenium.run,
+}
+
+
+def get_metadata():
+    """
+    Describe the environment the benchmarks ran in.
+
+    Returns
+    ----------
+        output : dict
+            the time, the git commit, and the python, platform and library
+            (including selene, if installed) versions
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    versions = {}
+    for name in ("selene", "selenium", "beautifulsoup4", "lxml", "requests"):
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = None
+    return {
+        "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "versions": versions,
+    }
+
+
+def get_case(result):
+    """Get the name of a case from a suite's result: its values other than timings."""
+    if "case" in result:
+        return result["case"]
+    return " / ".join(
+        str(value)
+        for key, value in result.items()
+        if key != "seconds" and not isinstance(value, float)
+    )
+
+
+def run(suites=None):
+    """
+    Run benchmark suites.
+
+    Parameters
+    ----------
+        suites : list
+            the names of the suites to run (default: all, see SUITES)
+
+    Returns
+    ----------
+        output : dict
+            the metadata (see get_metadata), the results (one dict per case, with the
+            suite, case and seconds, and any other measures) and the skipped suites
+    """
+    output = {"metadata": get_metadata(), "results": [], "skipped": {}}
+    for suite in suites or SUITES:
+        print(f"Running {suite}...", file=sys.stderr)
+        try:
+            results = SUITES[suite]()
+        except Exception as e:
+            output["skipped"][suite] = f"{type(e).__name__}: {e}".strip()
+            print(f"Skipped {suite}: {output['skipped'][suite]}", file=sys.stderr)
+            continue
+        for result in results:
+            output["results"].append({"suite": suite, "case": get_case(result), **result})
+    return output
+
+
+def compare(output, baseline, threshold=0.1):
+    """
+    Compare results with a baseline.
+
+    Parameters
+    ----------
+        output : dict
+            the results (see run)
+        baseline : dict
+            the baseline results (see run)
+        threshold : float
+            the relative slowdown above which a case is a regression
+
+    Returns
+    ----------
+        rows : list
+            (suite, case, baseline seconds, seconds, ratio, regression) for each case
+            in both
+    """
+    before = {(r["suite"], r["case"]): r["seconds"] for r in baseline["results"]}
+    rows = []
+    for result in output["results"]:
+        key = (result["suite"], result["case"])
+        if key not in before:
+            continue
+        ratio = result["seconds"] / before[key] if before[key] else float("inf")
+        rows.append((*key, before[key], result["seconds"], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def main(argv=None):
+    """Run the benchmarks from the command line (see the module docstring)."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--suites", help="comma-separated suites: " + ",".join(SUITES))
+    parser.add_argument("--output", help="the path of the JSON file to write")
+    parser.add_argument("--compare", help="the path of a JSON file to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    args = parser.parse_args(argv)
+    suites = args.suites.split(",") if args.suites else None
+    output = run(suites)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+    print(f"{'suite':<14} {'case':<60}{'seconds':>12}")
+    for result in output["results"]:
+        print(f"{result['suite']:<14} {result['case']:<60}{result['seconds']:>12.6f}")
+    if not args.compare:
+        return 0
+    with open(args.compare) as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {args.compare} ({baseline['metadata'].get('commit')}):")
+    print(f"{'suite':<14} {'case':<60}{'before':>12}{'after':>12}{'ratio':>8}")
+    regressions = 0
+    for suite, case, before, after, ratio, regression in compare(
+        output, baseline, args.threshold
+    ):
+        regressions += regression
+        flag = "  slower" if regression else ""
+        print(f"{suite:<14} {case:<60}{before:>12.6f}{after:>12.6f}{ratio:>7.2f}x{flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
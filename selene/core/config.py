@@ -1,10 +1,178 @@
+import contextvars
+from contextlib import contextmanager
+
 # Different waits for WebdriverWait
+# (a wait of WAIT_TINY or less checks the condition once, without sleeping)
 WAIT_TINY = 1e-6
 WAIT_SMALL = 1
 WAIT_NORMAL = 10
 WAIT_BIG = 30
 WAIT_HUGE = 300
 
+# The engine behind the bool_* waits (see core.selenium.conditions.wait_until):
+#   "poll": poll the condition from python, backing off (see WaitPolicy)
+#   "observer": block in one asynchronous script until the browser reports a change
+WAIT_ENGINE = "poll"
+
+
+class WaitPolicy:
+    """
+    How the bool_* waits (see core.selenium.conditions.wait_until) check their conditions.
+
+    When polling, the first re-check happens after poll_min seconds, and each interval after
+    that is multiplied by backoff, up to poll_max. Conditions which are met quickly are then
+    noticed within milliseconds, while long waits do not flood the webdriver with commands.
+
+    A policy can be set:
+        - per call, with the policy argument of the bool_* and task_find* functions
+        - per page, with the wait_policy class attribute of a PageSelene subclass
+        - per crawler, with the wait_policy argument of Crawler
+        - for a block of code, with use_wait_policy
+        - globally, by replacing WAIT_POLICY
+    """
+
+    def __init__(self, poll_min=0.01, poll_max=0.5, backoff=2.0, engine=None):
+        """
+        Initialise a WaitPolicy instance.
+
+        Parameters
+        ----------
+            poll_min : float
+                the first polling interval, in seconds
+            poll_max : float
+                the longest polling interval, in seconds
+            backoff : float
+                the factor by which the polling interval grows
+            engine : str
+                "poll" or "observer" (default: WAIT_ENGINE)
+        """
+        self.poll_min = poll_min
+        self.poll_max = poll_max
+        self.backoff = backoff
+        self.engine = engine
+
+    def intervals(self):
+        """
+        Generate the polling intervals, in seconds.
+
+        Returns
+        ----------
+            output : generator
+                an endless sequence of intervals
+        """
+        interval = self.poll_min
+        while True:
+            yield interval
+            interval = min(interval * self.backoff, self.poll_max)
+
+    def get_engine(self):
+        """Get the wait engine, "poll" or "observer"."""
+        return self.engine or WAIT_ENGINE
+
+    def __repr__(self):
+        """Show the policy's settings."""
+        return (
+            f"WaitPolicy(poll_min={self.poll_min}, poll_max={self.poll_max}, "
+            f"backoff={self.backoff}, engine={self.engine})"
+        )
+
+
+# The default WaitPolicy
+WAIT_POLICY = WaitPolicy()
+
+_wait_policy = contextvars.ContextVar("wait_policy", default=None)
+
+
+def get_wait_policy(policy=None):
+    """
+    Get the WaitPolicy to use: the given policy if there is one, otherwise the policy set by
+    use_wait_policy (if any), otherwise WAIT_POLICY.
+
+    Parameters
+    ----------
+        policy : WaitPolicy
+            a specific policy, or None
+
+    Returns
+    ----------
+        policy : WaitPolicy
+            the policy to use
+    """
+    return policy or _wait_policy.get() or WAIT_POLICY
+
+
+@contextmanager
+def use_wait_policy(policy):
+    """
+    Use a WaitPolicy for all waits in a block of code (in the current thread or task).
+
+    Usage:
+
+        with use_wait_policy(WaitPolicy(poll_max=0.1)):
+            page = PageSelene.from_url(driver, url)
+
+    Parameters
+    ----------
+        policy : WaitPolicy
+            the policy to use (None to use the default)
+    """
+    token = _wait_policy.set(policy)
+    try:
+        yield policy
+    finally:
+        _wait_policy.reset(token)
+
+
+# Timeouts (in seconds) for http requests
+TIMEOUT_CONNECT = 10
+TIMEOUT_READ = 30
+
+# The default parser backend for PageSoup and ElementSoup: "bs4" or "lxml"
+SOUP_BACKEND = "bs4"
+
+
+def _extension_patterns(*extensions):
+    """
+    Get the URL patterns which match paths ending in one of the file extensions, with
+    or without a query string (so that hosts or pages which only contain the text,
+    e.g. https://www.gifts.com/, are not matched).
+    """
+    return [pattern for ext in extensions for pattern in (f"*.{ext}", f"*.{ext}?*")]
+
+
+# URL patterns blocked by get_driver(block=[...]), by name
+# ("*" matches any characters, and a pattern must match the whole URL; see the Chrome
+# DevTools Network.setBlockedURLs command)
+BLOCK_PATTERNS = {
+    "image": _extension_patterns(
+        "png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp"
+    ),
+    "font": _extension_patterns("woff", "woff2", "ttf", "otf", "eot"),
+    "media": _extension_patterns("mp4", "webm", "m4v", "mov", "mp3", "m4a", "ogg", "wav"),
+    "stylesheet": _extension_patterns("css"),
+    "ads": [
+        "*doubleclick.net*",
+        "*googlesyndication.com*",
+        "*googleadservices.com*",
+        "*adservice.google.*",
+        "*amazon-adsystem.com*",
+        "*adnxs.com*",
+        "*criteo.com*",
+        "*taboola.com*",
+        "*outbrain.com*",
+    ],
+    "analytics": [
+        "*google-analytics.com*",
+        "*googletagmanager.com*",
+        "*hotjar.com*",
+        "*segment.io*",
+        "*segment.com*",
+        "*mixpanel.com*",
+        "*connect.facebook.net*",
+        "*scorecardresearch.com*",
+    ],
+}
+
 # A long list of user agents to use in the driver
 USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/78.0.3904.108 Safari/537.36",
@@ -1,13 +1,24 @@
-from selene.core.logger import get_logger
+import math
+import time
+import heapq
+import hashlib
+import threading
+from collections import namedtuple
+
+from selene.core.logger import get_logger, log_message
+from selene.core.utils import get_domain, canonicalise_url
 from selene.core.selenium.tasks import task_screenshot_to_notebook
 
+# A url taken from a Frontier (see Frontier.pop)
+FrontierItem = namedtuple("FrontierItem", ["url", "priority", "depth", "data"])
+
 
 class Crawler:
     """
     A parent crawler class to assist any worflow.
     """
 
-    def __init__(self, id_crawler="Crawler", debug=True):
+    def __init__(self, id_crawler="Crawler", debug=True, wait_policy=None):
         """
         Initialise Crawler.
 
@@ -17,37 +28,35 @@ class Crawler:
                 an ID to show up in the logging message
             debug : bool
                 whether to start the crawler in debug mode
+            wait_policy : core.config.WaitPolicy
+                how the crawler's waits check their conditions (see core.config.use_wait_policy)
         """
         self.id = "Crawler"
         self.debug = debug
+        self.wait_policy = wait_policy
         # Get logger
         if debug:
             self.logger = get_logger(level="DEBUG")
         else:
             self.logger = get_logger(level="INFO")
 
-    def log(self, message, level="DEBUG"):
+    def log(self, message, level="DEBUG", *args):
         """
         Output a log message, with the appropriate loglevel (default=DEBUG).
 
+        The message is only formatted if the loglevel is enabled, so pass any values to
+        include in it as args, e.g. self.log("find: %s", "DEBUG", identifier).
+
         Parameters
         ----------
             message : str
                 the message to log
             level : str
                 the loglevel of the message
+            args :
+                arguments for the message (see core.logger.log_message)
         """
-        if self.logger is None:
-            return
-        message = f"{self.id}: {message}"
-        if level == "DEBUG":
-            self.logger.debug(message)
-        elif level == "INFO":
-            self.logger.info(message)
-        elif level == "WARNING":
-            self.logger.warning(message)
-        elif level == "EXCEPTION":
-            self.logger.exception(message)
+        log_message(self.logger, message, level, args, prefix=self.id)
 
     def screenshot_to_notebook(self, driver, debug=None):
         """
@@ -65,3 +74,325 @@ class Crawler:
             debug = self.debug
         if debug:
             task_screenshot_to_notebook(driver, width=600, height=400, logger=None)
+
+
+class BloomFilter:
+    """
+    A memory-compact set of strings, for the urls a crawl has seen (see Frontier).
+
+    Each string sets k bits of a bit array, so membership tests can give false
+    positives (at most error_rate of them, as long as no more than capacity strings are
+    added) but never false negatives. A million urls take about 4MB at an error rate
+    of one in a million, rather than the ~100MB of a set of str. Each time capacity is
+    exceeded, a new bit array twice the size (with half the error rate) is added, so
+    the overall error rate stays below error_rate.
+    """
+
+    def __init__(self, capacity=10**6, error_rate=1e-6):
+        """
+        Initialise a BloomFilter instance.
+
+        Parameters
+        ----------
+            capacity : int
+                the number of strings the first bit array is sized for
+            error_rate : float
+                the target false positive rate
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.count = 0
+        # (bits, number of bits, number of hashes, capacity) for each bit array
+        self._filters = []
+        self._add_filter(capacity, error_rate / 2)
+
+    def _add_filter(self, capacity, error_rate):
+        """Add a bit array sized for a capacity and an error rate."""
+        n_bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        n_hashes = max(1, round(n_bits / capacity * math.log(2)))
+        self._filters.append((bytearray((n_bits + 7) // 8), n_bits, n_hashes, capacity))
+
+    @staticmethod
+    def _hashes(item):
+        """
+        Two independent 64 bit hashes of a string: its k bits in a bit array of n bits
+        are (a + i * b) % n for i in range(k) (double hashing).
+        """
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        return (
+            int.from_bytes(digest[:8], "little"),
+            int.from_bytes(digest[8:], "little") | 1,
+        )
+
+    def _contains(self, hashes):
+        """Whether a string with these hashes has (probably) been added."""
+        a, b = hashes
+        for bits, n_bits, n_hashes, _ in self._filters:
+            index, step = a % n_bits, b % n_bits
+            for _ in range(n_hashes):
+                if not bits[index >> 3] & (1 << (index & 7)):
+                    break
+                index += step
+                if index >= n_bits:
+                    index -= n_bits
+            else:
+                return True
+        return False
+
+    def __contains__(self, item):
+        """Whether a string has (probably) been added."""
+        return self._contains(self._hashes(item))
+
+    def add(self, item):
+        """
+        Add a string.
+
+        Parameters
+        ----------
+            item : str
+                the string
+
+        Returns
+        ----------
+            output : bool
+                True if the string was new, False if it had (probably) been added before
+        """
+        hashes = self._hashes(item)
+        if self._contains(hashes):
+            return False
+        if self.count >= sum(f[3] for f in self._filters):
+            capacity = self._filters[-1][3] * 2
+            self._add_filter(capacity, self.error_rate / 2 ** (len(self._filters) + 1))
+        bits, n_bits, n_hashes, _ = self._filters[-1]
+        index, step = hashes[0] % n_bits, hashes[1] % n_bits
+        for _ in range(n_hashes):
+            bits[index >> 3] |= 1 << (index & 7)
+            index += step
+            if index >= n_bits:
+                index -= n_bits
+        self.count += 1
+        return True
+
+    def __len__(self):
+        """The number of strings added (not counting false positives)."""
+        return self.count
+
+    @property
+    def nbytes(self):
+        """The size of the bit arrays, in bytes."""
+        return sum(len(bits) for bits, *_ in self._filters)
+
+
+class Frontier:
+    """
+    The urls a crawl has still to visit, with:
+        - url canonicalisation (see core.utils.canonicalise_url), so that the same page
+          is not queued twice under different spellings
+        - a compact seen-set (see BloomFilter), so that a url is only ever queued once
+        - a priority queue per domain (see core.utils.get_domain): lower priority values
+          are popped first
+        - politeness: urls are taken from the domains in turn, and a domain is not
+          visited again until delay seconds after it was last popped
+
+    Usage, e.g. collecting case links from list pages:
+
+        frontier = Frontier(delay=1)
+        frontier.add(url_list, priority=0)
+        while len(frontier):
+            item = frontier.pop()
+            page = PageCases.from_request(item.url)
+            frontier.add_all(page.get_case_links(), base=item.url, depth=item.depth + 1)
+
+    The frontier can be shared between threads.
+    """
+
+    def __init__(self, delay=0.0, seen=None, canonicalise=True, max_depth=None):
+        """
+        Initialise a Frontier instance.
+
+        Parameters
+        ----------
+            delay : float
+                the minimum number of seconds between urls popped from the same domain
+            seen : BloomFilter
+                the seen-set (default: a new BloomFilter); a set can be used for exact
+                (but larger) deduplication
+            canonicalise : bool
+                whether to canonicalise urls before deduplicating them
+            max_depth : int
+                the depth beyond which urls are not added (default: no limit)
+        """
+        self.delay = delay
+        self.seen = BloomFilter() if seen is None else seen
+        self.canonicalise = canonicalise
+        self.max_depth = max_depth
+        self._lock = threading.Lock()
+        # the heap of (priority, sequence, FrontierItem) for each domain
+        self._queues = {}
+        # domains ready to be popped from: (head priority, sequence, version, domain)
+        self._ready = []
+        # domains waiting for their delay: (time ready, version, domain)
+        self._waiting = []
+        # the time at which each domain may next be popped from (see delay)
+        self._available = {}
+        # the version of each domain's entry in _ready/_waiting; older entries are stale
+        self._versions = {}
+        self._sequence = 0
+        self._length = 0
+        self.n_added = 0
+        self.n_duplicates = 0
+
+    def _next_sequence(self):
+        """A counter which keeps heap entries in insertion order (hold the lock)."""
+        self._sequence += 1
+        return self._sequence
+
+    def _schedule(self, domain):
+        """
+        Enter a domain in _ready, or in _waiting if it is within its delay, replacing
+        any earlier entry (hold the lock).
+        """
+        version = self._versions.get(domain, 0) + 1
+        self._versions[domain] = version
+        when = self._available.get(domain, 0)
+        if when > time.monotonic():
+            heapq.heappush(self._waiting, (when, version, domain))
+        else:
+            priority = self._queues[domain][0][0]
+            heapq.heappush(
+                self._ready, (priority, self._next_sequence(), version, domain)
+            )
+
+    def add(self, url, priority=0, depth=0, data=None, base=None):
+        """
+        Add a url, unless it has been added before.
+
+        Parameters
+        ----------
+            url : str
+                the url
+            priority : float
+                lower priority urls are popped first
+            depth : int
+                the number of links followed to find the url
+            data :
+                anything to keep with the url (returned by pop)
+            base : str
+                the url of the page the url was found on, if it may be relative
+
+        Returns
+        ----------
+            output : bool
+                whether the url was added
+        """
+        if self.max_depth is not None and depth > self.max_depth:
+            return False
+        if self.canonicalise:
+            url = canonicalise_url(url, base=base)
+        domain = get_domain(url)
+        with self._lock:
+            if url in self.seen:
+                self.n_duplicates += 1
+                return False
+            self.seen.add(url)
+            self.n_added += 1
+            self._length += 1
+            queue = self._queues.setdefault(domain, [])
+            item = FrontierItem(url, priority, depth, data)
+            heapq.heappush(queue, (priority, self._next_sequence(), item))
+            # Schedule the domain if it was idle, or reschedule it if this url jumps
+            # its queue (a domain within its delay picks up its head when it is ready)
+            delayed = self._available.get(domain, 0) > time.monotonic()
+            if len(queue) == 1 or (queue[0][2] is item and not delayed):
+                self._schedule(domain)
+        return True
+
+    def add_all(self, urls, priority=0, depth=0, base=None):
+        """
+        Add urls, skipping those which have been added before.
+
+        Parameters
+        ----------
+            urls : iterable
+                the urls
+            priority : float
+                lower priority urls are popped first
+            depth : int
+                the number of links followed to find the urls
+            base : str
+                the url of the page the urls were found on, if they may be relative
+
+        Returns
+        ----------
+            output : int
+                the number of urls added
+        """
+        return sum(self.add(url, priority, depth, base=base) for url in urls)
+
+    def pop(self, block=True):
+        """
+        Take the next url: the best priority url of the domains which are not waiting
+        for their delay.
+
+        Parameters
+        ----------
+            block : bool
+                whether to sleep until a domain is ready, if all are waiting
+
+        Returns
+        ----------
+            item : FrontierItem
+                the url, its priority, depth and data; None if the frontier is empty
+                (or if all domains are waiting and block is False)
+        """
+        while True:
+            with self._lock:
+                if self._length == 0:
+                    return None
+                now = time.monotonic()
+                while self._waiting and self._waiting[0][0] <= now:
+                    _, version, domain = heapq.heappop(self._waiting)
+                    if self._versions.get(domain) == version:
+                        self._schedule(domain)
+                while self._ready:
+                    _, _, version, domain = heapq.heappop(self._ready)
+                    if self._versions.get(domain) != version:
+                        continue
+                    queue = self._queues[domain]
+                    item = heapq.heappop(queue)[2]
+                    self._length -= 1
+                    if self.delay:
+                        self._available[domain] = now + self.delay
+                    if queue:
+                        self._schedule(domain)
+                    else:
+                        del self._queues[domain]
+                        del self._versions[domain]
+                    return item
+                wait = self._waiting[0][0] - now if self._waiting else 0
+            if not block:
+                return None
+            time.sleep(max(wait, 0.001))
+
+    def __len__(self):
+        """The number of urls still to be popped."""
+        return self._length
+
+    def stats(self):
+        """
+        Get the frontier statistics.
+
+        Returns
+        ----------
+            output : dict
+                the number of urls queued and domains, the number of urls added and
+                of duplicates skipped, and the size of the seen-set in bytes
+        """
+        with self._lock:
+            return {
+                "queued": self._length,
+                "domains": len(self._queues),
+                "added": self.n_added,
+                "duplicates": self.n_duplicates,
+                "seen_bytes": getattr(self.seen, "nbytes", None),
+            }
@@ -1,3 +1,6 @@
+from selene.core.logger import log_message
+
+
 class Element:
     """
     A parent Element class. Both ElementSelene and ElementSoup inherit this class.
@@ -17,25 +20,20 @@ class Element:
         self.element = element
         self.logger = logger
 
-    def log(self, message, level="DEBUG"):
+    def log(self, message, level="DEBUG", *args):
         """
         Output a log message, with the appropriate loglevel (default=DEBUG).
 
+        The message is only formatted if the loglevel is enabled, so pass any values to
+        include in it as args, e.g. self.log("find: %s", "DEBUG", identifier).
+
         Parameters
         ----------
             message : str
                 the message to log
             level : str
                 the loglevel of the message
+            args :
+                arguments for the message (see core.logger.log_message)
         """
-        if self.logger is None:
-            return
-        message = f"{message}"
-        if level == "DEBUG":
-            self.logger.debug(message)
-        elif level == "INFO":
-            self.logger.info(message)
-        elif level == "WARNING":
-            self.logger.warning(message)
-        elif level == "EXCEPTION":
-            self.logger.exception(message)
+        log_message(self.logger, message, level, args)
@@ -1,6 +1,165 @@
 import os
 import sys
+import json
+import atexit
 import logging
+import threading
+import logging.handlers
+from queue import SimpleQueue
+
+# The loglevels accepted by the log methods of Page, Element and Crawler
+LOG_LEVELS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "WARNING": logging.WARNING,
+    "EXCEPTION": logging.ERROR,
+}
+LOG_METHODS = {
+    "DEBUG": logging.Logger.debug,
+    "INFO": logging.Logger.info,
+    "WARNING": logging.Logger.warning,
+    "EXCEPTION": logging.Logger.exception,
+}
+
+_silent = False
+
+
+def set_silent(silent=True):
+    """
+    Turn all selene logging off (or back on), whatever the loggers' levels.
+
+    This is the fastest path for tight extraction loops: every log call then returns after a
+    single check, without formatting its message.
+
+    Parameters
+    ----------
+        silent : bool
+            whether to silence logging
+    """
+    global _silent
+    _silent = silent
+
+
+def log_enabled(logger, level=logging.DEBUG):
+    """
+    Check whether a message at a loglevel would be output, so that building the message
+    can be skipped if it would not.
+
+    Usage:
+
+        if log_enabled(logger):
+            logger.debug(f"find: {expensive()}")
+
+    Parameters
+    ----------
+        logger : logging.Logger
+            a logger instance, or None
+        level : int
+            the loglevel (default: logging.DEBUG)
+
+    Returns
+    ----------
+        output : bool
+            True if the message would be output, False otherwise
+    """
+    return not _silent and logger is not None and logger.isEnabledFor(level)
+
+
+def log_message(logger, message, level="DEBUG", args=(), prefix=None):
+    """
+    Output a log message, if its loglevel is enabled. The message is only formatted (with
+    "%" and args, as usual for logging) once a handler outputs it.
+
+    Parameters
+    ----------
+        logger : logging.Logger
+            a logger instance, or None
+        message : str
+            the message to log
+        level : str
+            the loglevel of the message: DEBUG, INFO, WARNING or EXCEPTION
+        args : tuple
+            arguments for the message
+        prefix : str
+            a prefix for the message, e.g. the id of a page ("prefix: message")
+    """
+    if not log_enabled(logger, LOG_LEVELS[level]):
+        return
+    if prefix is None:
+        LOG_METHODS[level](logger, message, *args)
+    elif args:
+        LOG_METHODS[level](logger, f"{prefix}: {message}", *args)
+    else:
+        LOG_METHODS[level](logger, "%s: %s", prefix, message)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format log records as JSON lines, one object per record, e.g.
+
+        {"time": "2024-01-31T12:00:00.123", "level": "INFO", "logger": "log",
+         "thread": "MainThread", "message": "WORKER-01: find: div"}
+
+    Exceptions are included as an "exception" string.
+    """
+
+    def format(self, record):
+        """Format a record as a line of JSON."""
+        output = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S")
+            + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            output["exception"] = record.exc_text
+        return json.dumps(output, default=str)
+
+
+# The QueueListener of each logger started with queue=True, by name
+_listeners = {}
+# The arguments each logger was configured with by get_logger, by name
+_configs = {}
+# Guards _listeners and _configs, and (re)configuring loggers
+_lock = threading.RLock()
+
+
+def close_logger(name="log"):
+    """
+    Stop a logger's QueueListener (if it has one), flushing any queued records, and close
+    its handlers.
+
+    Parameters
+    ----------
+        name : str
+            the name of the logger
+    """
+    with _lock:
+        _configs.pop(name, None)
+        logger = logging.getLogger(name)
+        handlers, logger.handlers = logger.handlers, []
+        _stop_handlers(_listeners.pop(name, None), handlers)
+
+
+def _stop_handlers(listener, handlers):
+    """Stop a QueueListener (flushing its queue), if there is one, and close handlers."""
+    if listener is not None:
+        listener.stop()
+        handlers = list(handlers) + list(listener.handlers)
+    for handler in handlers:
+        handler.close()
+
+
+@atexit.register
+def _close_loggers():
+    """Flush the queues of all queued loggers when the interpreter exits."""
+    with _lock:
+        for name in list(_listeners):
+            close_logger(name)
 
 
 def get_logger(
@@ -11,10 +170,19 @@ def get_logger(
     overwrite=False,
     dirpath="/notebooks/selene_logger",
     filename="log.log",
+    queue=False,
+    max_bytes=None,
+    backup_count=5,
+    json_lines=False,
 ):
     """
     Initialise a logger instance to print, either to file or to a notebook.
 
+    Calling get_logger again with the same arguments returns the same logger, as it is.
+    With different arguments, the logger is reconfigured: the new handlers are installed
+    before the old ones (and any queue listener) are stopped, so other threads can keep
+    logging throughout.
+
     Parameters
     ----------
         name : str
@@ -31,25 +199,77 @@ def get_logger(
             the path to a directory to save the log (if to_file is True)
         filename : str
             the path to a file to save the log (if to_file is True)
+        queue : bool
+            whether to write the log from a background thread: messages are put on a queue
+            and a logging.handlers.QueueListener does the console and file I/O, so logging
+            does not block the (e.g. scraping) threads. Call close_logger to flush the queue
+            (this is also done when the interpreter exits).
+        max_bytes : int
+            if given, the log file is rotated when it reaches this size
+        backup_count : int
+            the number of rotated log files to keep (if max_bytes is given)
+        json_lines : bool
+            whether to write each record as a line of JSON (see JsonFormatter)
 
     Returns
     ----------
         logger : logging.Logger
             the logger instance
     """
-    # Get logger
+    config = (
+        level,
+        to_console,
+        to_file,
+        overwrite,
+        dirpath,
+        filename,
+        queue,
+        max_bytes,
+        backup_count,
+        json_lines,
+    )
     logger = logging.getLogger(name)
-    logger.handlers = []
+    with _lock:
+        # An already configured logger is returned as it is
+        if _configs.get(name) == config:
+            return logger
+        listener_old, handlers_old = _listeners.pop(name, None), logger.handlers
+        _configure_logger(logger, config)
+        _configs[name] = config
+        # Only now stop the previous configuration's listener and handlers
+        _stop_handlers(listener_old, handlers_old)
+    logger.info("Logger started")
+    return logger
+
+
+def _configure_logger(logger, config):
+    """Create a logger's handlers (and queue listener), and install them (see get_logger)."""
+    (
+        level,
+        to_console,
+        to_file,
+        overwrite,
+        dirpath,
+        filename,
+        queue,
+        max_bytes,
+        backup_count,
+        json_lines,
+    ) = config
     # Set the loglevel and format
     logger.setLevel(level)
-    formatter = logging.Formatter(
-        fmt="%(asctime)s %(levelname)-8s %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
-    )
+    if json_lines:
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            fmt="%(asctime)s %(levelname)-8s %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+        )
+    handlers = []
     if to_console:
         # Add the stream handler to print to console/notebook
         stream_handler = logging.StreamHandler(stream=sys.stderr)
         stream_handler.setFormatter(formatter)
-        logger.addHandler(stream_handler)
+        handlers.append(stream_handler)
     if to_file:
         # Create the directory
         if not os.path.exists(dirpath):
@@ -60,11 +280,26 @@ def get_logger(
         # Create the file
         if os.path.exists(filepath) and overwrite:
             print("File exists; overwriting: {}".format(filepath))
-            file_handler = logging.FileHandler(filepath, mode="w")
+            mode = "w"
         elif os.path.exists(dirpath):
             print("File exists; appending: {}".format(filepath))
-            file_handler = logging.FileHandler(filepath, mode="a")
+            mode = "a"
+        if max_bytes:
+            file_handler = logging.handlers.RotatingFileHandler(
+                filepath, mode=mode, maxBytes=max_bytes, backupCount=backup_count
+            )
+        else:
+            file_handler = logging.FileHandler(filepath, mode=mode)
         file_handler.setFormatter(formatter)
-        logger.addHandler(file_handler)
-    logger.info("Logger started")
-    return logger
+        handlers.append(file_handler)
+    if queue and handlers:
+        # Hand the records to a background thread, which writes them to the handlers
+        records = SimpleQueue()
+        listener = logging.handlers.QueueListener(
+            records, *handlers, respect_handler_level=True
+        )
+        listener.start()
+        _listeners[logger.name] = listener
+        handlers = [logging.handlers.QueueHandler(records)]
+    # Replace the handlers in one assignment, so other threads never see none
+    logger.handlers = handlers
@@ -1,4 +1,5 @@
 from .utils import *
+from .logger import log_message
 
 
 class Page:
@@ -24,25 +25,20 @@ class Page:
         self.domain = get_domain(url)
         self.id = f"WORKER-{id_page:02}"
 
-    def log(self, message, level="DEBUG"):
+    def log(self, message, level="DEBUG", *args):
         """
         Output a log message, with the appropriate loglevel (default=DEBUG).
 
+        The message is only formatted if the loglevel is enabled, so pass any values to
+        include in it as args, e.g. self.log("find: %s", "DEBUG", identifier).
+
         Parameters
         ----------
             message : str
                 the message to log
             level : str
                 the loglevel of the message
+            args :
+                arguments for the message (see core.logger.log_message)
         """
-        if self.logger is None:
-            return
-        message = f"{self.id}: {message}"
-        if level == "DEBUG":
-            self.logger.debug(message)
-        elif level == "INFO":
-            self.logger.info(message)
-        elif level == "WARNING":
-            self.logger.warning(message)
-        elif level == "EXCEPTION":
-            self.logger.exception(message)
+        log_message(self.logger, message, level, args, prefix=self.id)
@@ -0,0 +1,262 @@
+import functools
+from collections import namedtuple
+
+import soupsieve
+from lxml import etree
+
+from selene.core.soup.backends import MULTI_VALUED_ATTRIBUTES, BackendLxml
+
+# Extract every field of a schema in one call (see Schema.extract_selenium)
+SCRIPT_EXTRACT_SCHEMA = """
+var fields = arguments[0];
+var output = {};
+for (var i = 0; i < fields.length; i++) {
+    var name = fields[i][0], css = fields[i][1], attr = fields[i][2], many = fields[i][3];
+    var elements = many ? document.querySelectorAll(css) : [document.querySelector(css)];
+    var values = [];
+    for (var j = 0; j < elements.length; j++) {
+        var element = elements[j];
+        if (element === null) continue;
+        var value = attr === null ? element.textContent : element.getAttribute(attr);
+        if (value !== null) values.push(value);
+    }
+    output[name] = values;
+}
+return output;
+"""
+
+
+class Field:
+    """
+    One field of an extraction schema: where to find a value on a page, and how to read it.
+
+    Usage:
+
+        class PageCountry(PageSoup):
+            schema = {
+                "name": Field("h3.country-name"),
+                "capital": Field("span.country-capital"),
+                "population": Field("span.country-population", post=int),
+                "links": Field("a", attr="href", many=True),
+            }
+
+        record = PageCountry.from_request(url).extract()
+    """
+
+    def __init__(self, css, attr=None, post=None, many=False, default=None):
+        """
+        Initialise a Field instance.
+
+        Parameters
+        ----------
+            css : str
+                a CSS selector for the element(s) holding the value
+            attr : str
+                the attribute to read (default: the element's text, stripped)
+            post : function
+                a post-processor applied to each value found, e.g. int
+            many : bool
+                whether to read all matching elements (a list), or only the first
+            default :
+                the value if no element is found (default: None, or [] if many)
+        """
+        self.css = css
+        self.attr = attr
+        self.post = post
+        self.many = many
+        self.default = [] if many and default is None else default
+
+    def __repr__(self):
+        """Show the field's settings."""
+        return f"Field({self.css!r}, attr={self.attr!r}, many={self.many})"
+
+
+class Schema:
+    """
+    An extraction schema, compiled once per page class (see get_schema).
+
+    All of the fields are extracted together, with selectors compiled only once:
+        - from bs4 soup, with each field's selector precompiled by soupsieve (single fields
+          stop at their first match)
+        - from lxml trees, with each field's selector precompiled to XPath, which lxml
+          evaluates in C (this requires the cssselect package)
+        - with selenium, in a single execute_script call, rather than one round-trip
+          per field
+    """
+
+    def __init__(self, fields, name="Record"):
+        """
+        Initialise a Schema instance.
+
+        Parameters
+        ----------
+            fields : dict
+                the fields, by name
+            name : str
+                the name of the record type (see extract)
+        """
+        self.fields = dict(fields)
+        self.name = name
+        self._script_args = [
+            [name, field.css, field.attr, field.many]
+            for name, field in self.fields.items()
+        ]
+
+    @functools.cached_property
+    def record(self):
+        """
+        The record type (a namedtuple) returned by extract with as_record=True, built on
+        first use. Field names which are not identifiers (e.g. "product-title") are
+        renamed by position (_0, _1, ...).
+        """
+        return namedtuple(self.name, self.fields, rename=True)
+
+    @functools.cached_property
+    def _selectors(self):
+        """The fields' selectors, compiled with soupsieve."""
+        return [
+            (name, field, soupsieve.compile(field.css))
+            for name, field in self.fields.items()
+        ]
+
+    @functools.cached_property
+    def _xpaths(self):
+        """The fields' selectors, compiled to XPath."""
+        try:
+            from lxml.cssselect import CSSSelector
+        except ImportError as e:
+            raise ImportError(
+                "Extracting a schema from lxml trees requires cssselect: pip install selene[lxml]"
+            ) from e
+        xpaths = []
+        for name, field in self.fields.items():
+            path = CSSSelector(field.css).path
+            xpaths.append(
+                (name, field, etree.XPath(path if field.many else f"({path})[1]"))
+            )
+        return xpaths
+
+    def extract(self, soup, as_record=False):
+        """
+        Extract every field from a parsed (bs4 or lxml) tree.
+
+        Parameters
+        ----------
+            soup :
+                a BeautifulSoup or lxml tree
+            as_record : bool
+                whether to return a namedtuple, rather than a dict
+
+        Returns
+        ----------
+            output : dict or namedtuple
+                the value of each field
+        """
+        if isinstance(soup, etree._Element):
+            found = self._extract_lxml(soup)
+        else:
+            found = self._extract_bs4(soup)
+        return self._output(found, as_record)
+
+    def extract_selenium(self, driver, as_record=False):
+        """
+        Extract every field from the driver's current page, in one execute_script call.
+
+        Parameters
+        ----------
+            driver : selenium.webdriver
+                a selenium webdriver instance
+            as_record : bool
+                whether to return a namedtuple, rather than a dict
+
+        Returns
+        ----------
+            output : dict or namedtuple
+                the value of each field
+        """
+        found = driver.execute_script(SCRIPT_EXTRACT_SCHEMA, self._script_args)
+        for name, field in self.fields.items():
+            found[name] = [self._read_value(field, value) for value in found[name]]
+        return self._output(found, as_record)
+
+    def _extract_bs4(self, soup):
+        """Evaluate every field's compiled selector against a bs4 tree."""
+        found = {}
+        for name, field, selector in self._selectors:
+            if field.many:
+                elements = selector.select(soup)
+            else:
+                # select_one stops at the first match
+                element = selector.select_one(soup)
+                elements = [] if element is None else [element]
+            found[name] = [
+                self._read(field, element.get_text, element.get) for element in elements
+            ]
+        return found
+
+    def _extract_lxml(self, root):
+        """Evaluate every field's compiled XPath against an lxml tree."""
+        found = {}
+        for name, field, xpath in self._xpaths:
+            found[name] = [
+                self._read(
+                    field,
+                    element.text_content,
+                    lambda attr, element=element: BackendLxml.get(element, attr),
+                )
+                for element in xpath(root)
+            ]
+        return found
+
+    @staticmethod
+    def _read(field, text, get):
+        """Read a field's value from an element (its text, or an attribute)."""
+        if field.attr is None:
+            return text().strip()
+        return get(field.attr)
+
+    @staticmethod
+    def _read_value(field, value):
+        """Normalise a value read by JavaScript to match the soup backends."""
+        if field.attr is None:
+            return value.strip()
+        if field.attr in MULTI_VALUED_ATTRIBUTES:
+            return value.split()
+        return value
+
+    def _output(self, found, as_record):
+        """Apply the post-processors and defaults, and build the output."""
+        output = {}
+        for name, field in self.fields.items():
+            values = [value for value in found[name] if value is not None]
+            if field.post is not None:
+                values = [field.post(value) for value in values]
+            if field.many:
+                output[name] = values or field.default
+            else:
+                output[name] = values[0] if values else field.default
+        return self.record(*output.values()) if as_record else output
+
+
+def get_schema(cls):
+    """
+    Get the compiled Schema of a page class, from its schema class attribute
+    (a dict of Field instances, by name). The schema is compiled once per class.
+
+    Parameters
+    ----------
+        cls : type
+            a PageSoup or PageSelene subclass
+
+    Returns
+    ----------
+        schema : Schema
+            the compiled schema
+    """
+    compiled = cls.__dict__.get("_compiled_schema")
+    if compiled is None or compiled[0] is not cls.schema:
+        if not cls.schema:
+            raise ValueError(f"{cls.__name__} has no schema")
+        compiled = (cls.schema, Schema(cls.schema, name=f"{cls.__name__}Record"))
+        cls._compiled_schema = compiled
+    return compiled[1]
@@ -1,14 +1,106 @@
+import time
 from selenium import webdriver
 from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.wait import WebDriverWait
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
 from selene.core.config import *
+from selene.core.logger import log_enabled
+from selene.core.selenium.instrument import (
+    instrumented,
+    instrumentation_enabled,
+    record_wait,
+)
 from selene.core.selenium.scripts import *
 
 
-def bool_url_changed(driver, wait, logger, url, message="URL has not changed."):
+@instrumented
+def wait_until(
+    driver, wait, method, message="", observer=None, until_not=False, policy=None
+):
+    """
+    Wait a specified number of seconds until either:
+        - method(driver) returns a truthy value (or a falsy value, if until_not is True)
+        - A TimeoutException is raised
+
+    This is the wait engine behind the bool_* functions, configured by a
+    core.config.WaitPolicy. By default it polls, starting with short intervals which back off
+    exponentially. A wait of WAIT_TINY or less checks the condition once, without sleeping.
+
+    If the policy's engine is "observer" and an observer condition is given, it instead blocks
+    in a single asynchronous script until the browser reports that the condition is met
+    (see core.selenium.scripts.script_wait_for). If that script cannot complete, e.g. because the
+    page navigated away, it falls back to polling for the rest of the wait.
+
+    Parameters
+    ----------
+        driver : EITHER selenium.webdriver OR selenium.webdriver.remote.webelement.WebElement
+            a selenium webdriver instance, or the element to search within
+        wait : int
+            a number of seconds to wait before raising a TimeoutException
+        method : function
+            the condition to poll, given the driver
+        message : str
+            the message of the TimeoutException
+        observer : tuple
+            the equivalent (condition, args) for script_wait_for, if there is one
+        until_not : bool
+            whether to wait until method returns a falsy value
+        policy : core.config.WaitPolicy
+            how to wait (default: see core.config.get_wait_policy)
+
+    Returns
+    ----------
+        output :
+            the value returned by method (True if the observer engine was used)
+    """
+    policy = get_wait_policy(policy)
+    start = time.monotonic()
+    polls = 0
+    try:
+        if (
+            wait > WAIT_TINY
+            and observer is not None
+            and policy.get_engine() == "observer"
+        ):
+            browser = driver.parent if isinstance(driver, WebElement) else driver
+            result = script_wait_for(browser, *observer, wait)
+            if result:
+                return True
+            if result is False:
+                raise TimeoutException(message)
+        end = start + wait
+        intervals = policy.intervals()
+        while True:
+            polls += 1
+            try:
+                value = method(driver)
+                if until_not and not value:
+                    return True
+                if not until_not and value:
+                    return value
+            except NoSuchElementException:
+                if until_not:
+                    return True
+            remaining = end - time.monotonic()
+            if remaining <= 0 or wait <= WAIT_TINY:
+                raise TimeoutException(message)
+            time.sleep(min(next(intervals), remaining))
+    finally:
+        if instrumentation_enabled():
+            record_wait(time.monotonic() - start, polls)
+
+
+def _web_element(element):
+    """Get the WebElement wrapped by an ElementSelene (or the WebElement itself)."""
+    return getattr(element, "element", element)
+
+
+@instrumented
+def bool_url_changed(
+    driver, wait, logger, url, message="URL has not changed.", policy=None
+):
     """
     Wait a specified number of seconds until either:
         - The browser's url changes.
@@ -26,16 +118,25 @@ def bool_url_changed(driver, wait, logger, url, message="URL has not changed."):
             the original url
         message : str
             log message (default: "URL has not changed.")
+        policy : core.config.WaitPolicy
+            how to wait (default: see core.config.get_wait_policy)
 
     Returns
     ----------
         output : bool
             True if the url changes, False otherwise
     """
-    if logger:
-        logger.debug(f"bool_url_changed: {url}")
+    if log_enabled(logger):
+        logger.debug("bool_url_changed: %s", url)
     try:
-        WebDriverWait(driver, wait).until(method=EC.url_changes(url), message=message)
+        wait_until(
+            driver,
+            wait,
+            EC.url_changes(url),
+            message,
+            observer=("url_changed", [url]),
+            policy=policy,
+        )
         return True
     except TimeoutException as e:
         if logger:
@@ -43,7 +144,10 @@ def bool_url_changed(driver, wait, logger, url, message="URL has not changed."):
         return False
 
 
-def bool_url_expected(driver, wait, logger, url, message="URL is not the expected URL."):
+@instrumented
+def bool_url_expected(
+    driver, wait, logger, url, message="URL is not the expected URL.", policy=None
+):
     """
     Wait a specified number of seconds until either:
         - The browser's url matches the expected url.
@@ -61,16 +165,25 @@ def bool_url_expected(driver, wait, logger, url, message="URL is not the expecte
             the expected url
         message : str
             log message (default: "URL is not the expected URL.")
+        policy : core.config.WaitPolicy
+            how to wait (default: see core.config.get_wait_policy)
 
     Returns
     ----------
         output : bool
             True if the url is the expected url, False otherwise
     """
-    if logger:
-        logger.debug(f"bool_url_expected: {url}")
+    if log_enabled(logger):
+        logger.debug("bool_url_expected: %s", url)
     try:
-        WebDriverWait(driver, wait).until(method=EC.url_to_be(url), message=message)
+        wait_until(
+            driver,
+            wait,
+            EC.url_to_be(url),
+            message,
+            observer=("url_to_be", [url]),
+            policy=policy,
+        )
         return True
     except TimeoutException as e:
         if logger:
@@ -78,7 +191,10 @@ def bool_url_expected(driver, wait, logger, url, message="URL is not the expecte
         return False
 
 
-def bool_url_unexpected(driver, wait, logger, url, message="URL is the unexpected URL."):
+@instrumented
+def bool_url_unexpected(
+    driver, wait, logger, url, message="URL is the unexpected URL.", policy=None
+):
     """
     Wait a specified number of seconds until either:
         - The browser's url matches the UNexpected url.
@@ -96,16 +212,26 @@ def bool_url_unexpected(driver, wait, logger, url, message="URL is the unexpecte
             the unexpected url
         message : str
             log message (default: "URL is the unexpected URL.")
+        policy : core.config.WaitPolicy
+            how to wait (default: see core.config.get_wait_policy)
 
     Returns
     ----------
         output : bool
             True if the url is the unexpected url, False otherwise
     """
-    if logger:
-        logger.debug(f"bool_url_unexpected: {url}")
+    if log_enabled(logger):
+        logger.debug("bool_url_unexpected: %s", url)
     try:
-        WebDriverWait(driver, wait).until_not(method=EC.url_to_be(url), message=message)
+        wait_until(
+            driver,
+            wait,
+            EC.url_to_be(url),
+            message,
+            observer=("url_not_to_be", [url]),
+            until_not=True,
+            policy=policy,
+        )
         return True
     except TimeoutException as e:
         if logger:
@@ -113,12 +239,14 @@ def bool_url_unexpected(driver, wait, logger, url, message="URL is the unexpecte
         return False
 
 
+@instrumented
 def bool_url_contains(
     driver,
     wait,
     logger,
     string,
     message="URL does not contain the specified string.",
+    policy=None,
 ):
     """
     Wait a specified number of seconds until either:
@@ -135,18 +263,27 @@ def bool_url_contains(
             a logger instance (see core.logger.py)
         message : str
             log message (default: "URL does not contain the specified string.")
+        policy : core.config.WaitPolicy
+            how to wait (default: see core.config.get_wait_policy)
 
     Returns
     ----------
         output : bool
             True if the url contains the specified string, False otherwise
     """
-    if logger:
-        logger.debug(f"bool_url_contains: {string}")
+    if log_enabled(logger):
+        logger.debug("bool_url_contains: %s", string)
     if string == "":
         return False
     try:
-        WebDriverWait(driver, wait).until(method=EC.url_contains(string), message=message)
+        wait_until(
+            driver,
+            wait,
+            EC.url_contains(string),
+            message,
+            observer=("url_contains", [string]),
+            policy=policy,
+        )
         return True
     except TimeoutException as e:
         if logger:
@@ -154,8 +291,14 @@ def bool_url_contains(
         return False
 
 
+@instrumented
 def bool_url_does_not_contain(
-    driver, wait, logger, string, message="URL contains the specified string."
+    driver,
+    wait,
+    logger,
+    string,
+    message="URL contains the specified string.",
+    policy=None,
 ):
     """
     Wait a specified number of seconds until either:
@@ -172,19 +315,27 @@ def bool_url_does_not_contain(
             a logger instance (see core.logger.py)
         message : str
             log message (default: "URL contains the specified string.")
+        policy : core.config.WaitPolicy
+            how to wait (default: see core.config.get_wait_policy)
 
     Returns
     ----------
         output : bool
             True if the url does not contain the specified string, False otherwise
     """
-    if logger:
-        logger.debug(f"bool_url_does_not_contain: {string}")
+    if log_enabled(logger):
+        logger.debug("bool_url_does_not_contain: %s", string)
     if string == "":
         return False
     try:
-        WebDriverWait(driver, wait).until_not(
-            method=EC.url_contains(string), message=message
+        wait_until(
+            driver,
+            wait,
+            EC.url_contains(string),
+            message,
+            observer=("url_does_not_contain", [string]),
+            until_not=True,
+            policy=policy,
         )
         return True
     except TimeoutException as e:
@@ -193,7 +344,8 @@ def bool_url_does_not_contain(
         return False
 
 
-def bool_visible(driver, by, identifier, wait=WAIT_NORMAL, logger=None):
+@instrumented
+def bool_visible(driver, by, identifier, wait=WAIT_NORMAL, logger=None, policy=None):
     """
     Wait a specified number of seconds until either:
         - A found element is visible
@@ -211,18 +363,24 @@ def bool_visible(driver, by, identifier, wait=WAIT_NORMAL, logger=None):
             a number of seconds to wait before raising a TimeoutException
         logger : logging.Logger
             a logger instance (see core.logger.py)
+        policy : core.config.WaitPolicy
+            how to wait (default: see core.config.get_wait_policy)
 
     Returns
     ----------
         output : bool
             True if the element is visible, False otherwise
     """
-    if logger:
-        logger.debug(f"bool_visible: {identifier}")
+    if log_enabled(logger):
+        logger.debug("bool_visible: %s", identifier)
     try:
-        WebDriverWait(driver, wait).until(
+        wait_until(
+            driver,
+            wait,
             EC.visibility_of_element_located((by, identifier)),
-            message=f"Element not visible: {identifier}.",
+            f"Element not visible: {identifier}.",
+            observer=("visible", [by, identifier]),
+            policy=policy,
         )
         return True
     except TimeoutException as e:
@@ -231,7 +389,8 @@ def bool_visible(driver, by, identifier, wait=WAIT_NORMAL, logger=None):
         return False
 
 
-def bool_invisible(driver, by, identifier, wait=WAIT_NORMAL, logger=None):
+@instrumented
+def bool_invisible(driver, by, identifier, wait=WAIT_NORMAL, logger=None, policy=None):
     """
     Wait a specified number of seconds until either:
         - A found element is NOT visible
@@ -249,18 +408,24 @@ def bool_invisible(driver, by, identifier, wait=WAIT_NORMAL, logger=None):
             a number of seconds to wait before raising a TimeoutException
         logger : logging.Logger
             a logger instance (see core.logger.py)
+        policy : core.config.WaitPolicy
+            how to wait (default: see core.config.get_wait_policy)
 
     Returns
     ----------
         output : bool
             True if the element is invisible, False otherwise
     """
-    if logger:
-        logger.debug(f"bool_invisible: {identifier}")
+    if log_enabled(logger):
+        logger.debug("bool_invisible: %s", identifier)
     try:
-        WebDriverWait(driver, wait).until(
+        wait_until(
+            driver,
+            wait,
             EC.invisibility_of_element((by, identifier)),
-            message=f"Element visible: {identifier}.",
+            f"Element visible: {identifier}.",
+            observer=("invisible", [by, identifier]),
+            policy=policy,
         )
         return True
     except TimeoutException as e:
@@ -269,7 +434,8 @@ def bool_invisible(driver, by, identifier, wait=WAIT_NORMAL, logger=None):
         return False
 
 
-def bool_clickable(driver, by, identifier, wait=WAIT_NORMAL, logger=None):
+@instrumented
+def bool_clickable(driver, by, identifier, wait=WAIT_NORMAL, logger=None, policy=None):
     """
     Wait a specified number of seconds until either:
         - A found element is clickable
@@ -287,18 +453,24 @@ def bool_clickable(driver, by, identifier, wait=WAIT_NORMAL, logger=None):
             a number of seconds to wait before raising a TimeoutException
         logger : logging.Logger
             a logger instance (see core.logger.py)
+        policy : core.config.WaitPolicy
+            how to wait (default: see core.config.get_wait_policy)
 
     Returns
     ----------
         output : bool
             True if the element is clickable, False otherwise
     """
-    if logger:
-        logger.debug(f"bool_clickable: {identifier}")
+    if log_enabled(logger):
+        logger.debug("bool_clickable: %s", identifier)
     try:
-        WebDriverWait(driver, wait).until(
+        wait_until(
+            driver,
+            wait,
             EC.element_to_be_clickable((by, identifier)),
-            message=f"Element not clickable: {identifier}",
+            f"Element not clickable: {identifier}",
+            observer=("clickable", [by, identifier]),
+            policy=policy,
         )
         return True
     except TimeoutException as e:
@@ -307,8 +479,9 @@ def bool_clickable(driver, by, identifier, wait=WAIT_NORMAL, logger=None):
         return False
 
 
+@instrumented
 def bool_yoffset_changed(
-    driver, wait, logger, yoffset, message="Y-offset did not change."
+    driver, wait, logger, yoffset, message="Y-offset did not change.", policy=None
 ):
     """
     Wait a specified number of seconds until either:
@@ -327,19 +500,24 @@ def bool_yoffset_changed(
             the original y-offset value
         message : str
             log message (default: "Y-offset did not change.")
+        policy : core.config.WaitPolicy
+            how to wait (default: see core.config.get_wait_policy)
 
     Returns
     ----------
         output : bool
             True if the y-offset has changed, False otherwise
     """
-    if logger:
-        logger.debug(f"bool_yoffset_changed: {yoffset}")
+    if log_enabled(logger):
+        logger.debug("bool_yoffset_changed: %s", yoffset)
     try:
-        WebDriverWait(driver, wait).until(
-            method=lambda wd: yoffset
-            != driver.execute_script("return window.pageYOffset"),
-            message=message,
+        wait_until(
+            driver,
+            wait,
+            lambda wd: yoffset != driver.execute_script("return window.pageYOffset"),
+            message,
+            observer=("yoffset_changed", [yoffset]),
+            policy=policy,
         )
         return True
     except TimeoutException as e:
@@ -348,8 +526,15 @@ def bool_yoffset_changed(
         return False
 
 
+@instrumented
 def bool_scroll_position_changed(
-    driver, element, wait, logger, position, message="Scroll position did not change."
+    driver,
+    element,
+    wait,
+    logger,
+    position,
+    message="Scroll position did not change.",
+    policy=None,
 ):
     """
     Wait a specified number of seconds until either:
@@ -371,18 +556,24 @@ def bool_scroll_position_changed(
             the original scroll position value
         message : str
             log message (default: "Scroll position did not change.")
+        policy : core.config.WaitPolicy
+            how to wait (default: see core.config.get_wait_policy)
 
     Returns
     ----------
         output : bool
             True if the element's scroll position has changed, False otherwise
     """
-    if logger:
-        logger.debug(f"bool_scroll_position_changed: {position}")
+    if log_enabled(logger):
+        logger.debug("bool_scroll_position_changed: %s", position)
     try:
-        WebDriverWait(driver, wait).until(
-            method=lambda wd: position != script_get_scroll_position(driver, element),
-            message=message,
+        wait_until(
+            driver,
+            wait,
+            lambda wd: position != script_get_scroll_position(driver, element),
+            message,
+            observer=("scroll_position_changed", [position, _web_element(element)]),
+            policy=policy,
         )
         return True
     except TimeoutException as e:
@@ -391,8 +582,15 @@ def bool_scroll_position_changed(
         return False
 
 
+@instrumented
 def bool_scroll_height_changed(
-    driver, wait, logger, height, element=None, message="Scroll height did not change."
+    driver,
+    wait,
+    logger,
+    height,
+    element=None,
+    message="Scroll height did not change.",
+    policy=None,
 ):
     """
     Wait a specified number of seconds until either:
@@ -414,18 +612,24 @@ def bool_scroll_height_changed(
             the scrollable element. If None, then the page itself is the element.
         message : str
             log message (default: "Scroll height did not change.")
+        policy : core.config.WaitPolicy
+            how to wait (default: see core.config.get_wait_policy)
 
     Returns
     ----------
         output : bool
             True if the scroll height has changed, False otherwise
     """
-    if logger:
-        logger.debug(f"bool_scroll_height_changed: {height}")
+    if log_enabled(logger):
+        logger.debug("bool_scroll_height_changed: %s", height)
     try:
-        WebDriverWait(driver, wait).until(
-            method=lambda wd: height != script_get_scroll_height(driver, element),
-            message=message,
+        wait_until(
+            driver,
+            wait,
+            lambda wd: height != script_get_scroll_height(driver, element),
+            message,
+            observer=("scroll_height_changed", [height, _web_element(element)]),
+            policy=policy,
         )
         return True
     except TimeoutException as e:
@@ -434,8 +638,15 @@ def bool_scroll_height_changed(
         return False
 
 
+@instrumented
 def bool_element_class_contains(
-    driver, element, wait, logger, string, message="Element class does not contain"
+    driver,
+    element,
+    wait,
+    logger,
+    string,
+    message="Element class does not contain",
+    policy=None,
 ):
     """
     Wait a specified number of seconds until either:
@@ -459,18 +670,24 @@ def bool_element_class_contains(
             the string to be found
         message : str
             log message (default: "Element class does not contain {string}")
+        policy : core.config.WaitPolicy
+            how to wait (default: see core.config.get_wait_policy)
 
     Returns
     ----------
         output : bool
             True if the element's class contains the string, False otherwise
     """
-    if logger:
-        logger.debug(f"bool_element_class_contains: {string}")
+    if log_enabled(logger):
+        logger.debug("bool_element_class_contains: %s", string)
     try:
-        WebDriverWait(driver, wait).until(
-            method=lambda wd: string in element.get_attribute("class"),
-            message=f"{message} {string}.",
+        wait_until(
+            driver,
+            wait,
+            lambda wd: string in element.get_attribute("class"),
+            f"{message} {string}.",
+            observer=("class_contains", [_web_element(element), string]),
+            policy=policy,
         )
         return True
     except TimeoutException as e:
@@ -479,8 +696,9 @@ def bool_element_class_contains(
         return False
 
 
+@instrumented
 def bool_element_class_does_not_contain(
-    driver, element, wait, logger, string, message="Element class contains"
+    driver, element, wait, logger, string, message="Element class contains", policy=None
 ):
     """
     Wait a specified number of seconds until either:
@@ -501,18 +719,24 @@ def bool_element_class_does_not_contain(
             the string to be found
         message : str
             log message (default: "Element class contains {string}.")
+        policy : core.config.WaitPolicy
+            how to wait (default: see core.config.get_wait_policy)
 
     Returns
     ----------
         output : bool
             True if the element's class contains the string, False otherwise
     """
-    if logger:
-        logger.debug(f"bool_element_class_does_not_contain: {string}")
+    if log_enabled(logger):
+        logger.debug("bool_element_class_does_not_contain: %s", string)
     try:
-        WebDriverWait(driver, wait).until(
-            method=lambda wd: string not in element.get_attribute("class"),
-            message=f"{message} {string}.",
+        wait_until(
+            driver,
+            wait,
+            lambda wd: string not in element.get_attribute("class"),
+            f"{message} {string}.",
+            observer=("class_does_not_contain", [_web_element(element), string]),
+            policy=policy,
         )
         return True
     except TimeoutException as e:
@@ -521,8 +745,15 @@ def bool_element_class_does_not_contain(
         return False
 
 
+@instrumented
 def bool_element_text_contains(
-    driver, element, wait, logger, string, message="Element text does not contain"
+    driver,
+    element,
+    wait,
+    logger,
+    string,
+    message="Element text does not contain",
+    policy=None,
 ):
     """
     Wait a specified number of seconds until either:
@@ -543,17 +774,24 @@ def bool_element_text_contains(
             the string to be found
         message : str
             log message (default: "Element text does not contain {string}.")
+        policy : core.config.WaitPolicy
+            how to wait (default: see core.config.get_wait_policy)
 
     Returns
     ----------
         output : bool
             True if the element's text contains the string, False otherwise
     """
-    if logger:
-        logger.debug(f"bool_element_text_contains: {string}")
+    if log_enabled(logger):
+        logger.debug("bool_element_text_contains: %s", string)
     try:
-        WebDriverWait(driver, wait).until(
-            method=lambda wd: string in element.text, message=f"{message} {string}."
+        wait_until(
+            driver,
+            wait,
+            lambda wd: string in _web_element(element).text,
+            f"{message} {string}.",
+            observer=("text_contains", [_web_element(element), string]),
+            policy=policy,
         )
         return True
     except TimeoutException as e:
@@ -562,8 +800,9 @@ def bool_element_text_contains(
         return False
 
 
+@instrumented
 def bool_element_text_does_not_contain(
-    driver, element, wait, logger, string, message="Element text contains"
+    driver, element, wait, logger, string, message="Element text contains", policy=None
 ):
     """
     Wait a specified number of seconds until either:
@@ -584,17 +823,24 @@ def bool_element_text_does_not_contain(
             the string to be found
         message : str
             log message (default: "Element text contains {string}.")
+        policy : core.config.WaitPolicy
+            how to wait (default: see core.config.get_wait_policy)
 
     Returns
     ----------
         output : bool
             True if the element's text does not contain the string, False otherwise
     """
-    if logger:
-        logger.debug(f"bool_element_text_does_not_contain: {string}")
+    if log_enabled(logger):
+        logger.debug("bool_element_text_does_not_contain: %s", string)
     try:
-        WebDriverWait(driver, wait).until(
-            method=lambda wd: string not in element.text, message=f"{message} {string}."
+        wait_until(
+            driver,
+            wait,
+            lambda wd: string not in _web_element(element).text,
+            f"{message} {string}.",
+            observer=("text_does_not_contain", [_web_element(element), string]),
+            policy=policy,
         )
         return True
     except TimeoutException as e:
@@ -603,7 +849,10 @@ def bool_element_text_does_not_contain(
         return False
 
 
-def bool_new_handle(driver, n_handles_old, wait, logger, message="No new handles found."):
+@instrumented
+def bool_new_handle(
+    driver, n_handles_old, wait, logger, message="No new handles found.", policy=None
+):
     """
     Wait a specified number of seconds until either:
         - The number of window handles (i.e. the number of tabs open) has increased by one
@@ -623,18 +872,23 @@ def bool_new_handle(driver, n_handles_old, wait, logger, message="No new handles
             a logger instance (see core.logger.py)
         message : str
             log message (default: "No new handles found.")
+        policy : core.config.WaitPolicy
+            how to wait (default: see core.config.get_wait_policy)
 
     Returns
     ----------
         output : bool
             True if the number of handles has increased by one, False otherwise
     """
-    if logger:
-        logger.debug(f"bool_new_handle")
+    if log_enabled(logger):
+        logger.debug("bool_new_handle")
     try:
-        WebDriverWait(driver, wait).until(
-            method=lambda wd: len(driver.window_handles) == n_handles_old + 1,
-            message=f"{message}.",
+        wait_until(
+            driver,
+            wait,
+            lambda wd: len(driver.window_handles) == n_handles_old + 1,
+            f"{message}.",
+            policy=policy,
         )
         return True
     except TimeoutException as e:
@@ -643,7 +897,10 @@ def bool_new_handle(driver, n_handles_old, wait, logger, message="No new handles
         return False
 
 
-def bool_correct_handle(driver, handle, wait, logger, message="Incorrect handle."):
+@instrumented
+def bool_correct_handle(
+    driver, handle, wait, logger, message="Incorrect handle.", policy=None
+):
     """
     Wait a specified number of seconds until either:
         - The active handle i.e. tab) is the expected one
@@ -663,21 +920,75 @@ def bool_correct_handle(driver, handle, wait, logger, message="Incorrect handle.
             a logger instance (see core.logger.py)
         message : str
             log message (default: "Incorrect handle.")
+        policy : core.config.WaitPolicy
+            how to wait (default: see core.config.get_wait_policy)
 
     Returns
     ----------
         output : bool
             True if the active handle is the same as the expected handle, False otherwise
     """
-    if logger:
-        logger.debug(f"bool_correct_handle")
+    if log_enabled(logger):
+        logger.debug("bool_correct_handle")
     try:
-        WebDriverWait(driver, wait).until(
-            method=lambda wd: driver.current_window_handle == handle,
-            message=f"{message}.",
+        wait_until(
+            driver,
+            wait,
+            lambda wd: driver.current_window_handle == handle,
+            f"{message}.",
+            policy=policy,
         )
         return True
     except TimeoutException as e:
         if logger:
             logger.exception(e)
         return False
+
+
+@instrumented
+def bool_condition(
+    driver, wait, logger, condition, message="Condition not met.", policy=None
+):
+    """
+    Wait a specified number of seconds until either:
+        - A condition is met
+        - A TimeoutException is raised
+
+    This is useful for a page's own readiness condition (see core.selenium.page.PageSelene).
+
+    Parameters
+    ----------
+        driver : selenium.webdriver
+            a selenium webdriver instance
+        wait : int
+            a number of seconds to wait before raising a TimeoutException
+        logger : logging.Logger
+            a logger instance (see core.logger.py)
+        condition : EITHER tuple OR function
+            a (by, identifier) tuple, met when a matching element is present,
+            or a function which is given the driver, met when it returns a truthy value
+        message : str
+            log message (default: "Condition not met.")
+        policy : core.config.WaitPolicy
+            how to wait (default: see core.config.get_wait_policy)
+
+    Returns
+    ----------
+        output : bool
+            True if the condition is met, False otherwise
+    """
+    if log_enabled(logger):
+        logger.debug("bool_condition")
+    if callable(condition):
+        method, observer = condition, None
+    else:
+        by, identifier = condition
+        method = EC.presence_of_element_located((by, identifier))
+        observer = ("present", [by, identifier, None])
+    try:
+        wait_until(driver, wait, method, message, observer=observer, policy=policy)
+        return True
+    except TimeoutException as e:
+        if logger:
+            logger.exception(e)
+        return False
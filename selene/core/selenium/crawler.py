@@ -1,9 +1,151 @@
+import time
+import queue
+import threading
+from collections import namedtuple
+
+from selenium.common.exceptions import WebDriverException
+from urllib3.exceptions import HTTPError
+
+from selene.core.config import *
 from selene.core.crawler import Crawler
+from selene.core.selenium.driver import get_driver, stop_driver
+
+# The outcome of one task run by CrawlerSelene.run
+CrawlResult = namedtuple("CrawlResult", ["index", "worker", "result", "error", "seconds"])
+# The errors which mean a driver has crashed: selenium's own, and the connection
+# errors raised when chromedriver itself has died
+DRIVER_CRASHES = (WebDriverException, HTTPError, ConnectionError)
 
 
 class CrawlerSelene(Crawler):
     """
     A crawler class to assist any workflow which requires selenium webdriver.
 
+    Tasks can be run in parallel, each worker owning its own driver (see run):
+
+        def scrape(driver, id_page):
+            page = PageSelene.from_url(driver, url, id_page=id_page)
+            return page.find_all_soup("div", {"class": "country"})
+
+        crawler = CrawlerSelene()
+        for result in crawler.run([scrape, ...], workers=4):
+            ...
+
     Inherits selene.core.crawler.Crawler
     """
+
+    def run(self, tasks, workers=2, recycle_after=None, **kwargs):
+        """
+        Run tasks in parallel, yielding their results as they finish.
+
+        Each task is a callable taking (driver, id_page): the driver of the worker
+        running it, and the worker's number, which can be passed on to a Page so that
+        its log messages show the real worker (WORKER-xx). Workers pull tasks from a
+        shared queue, so a slow page only holds up its own worker.
+
+        A worker's driver is stopped and replaced after every recycle_after tasks, and
+        whenever a task raises one of DRIVER_CRASHES (e.g. the browser or chromedriver
+        crashed). Drivers are always stopped with stop_driver (or quit, if the browser
+        is dead), including when the caller stops iterating early (remaining tasks are
+        then skipped).
+
+        Parameters
+        ----------
+            tasks : iterable
+                callables taking (driver, id_page)
+            workers : int
+                the number of workers (and so drivers) to run
+            recycle_after : int
+                the number of tasks after which a worker's driver is replaced (default: never)
+            kwargs :
+                passed through to get_driver
+
+        Returns
+        ----------
+            output : generator
+                a CrawlResult (index, worker, result, error, seconds) for each task,
+                in the order they finish
+        """
+        work = queue.Queue()
+        n_tasks = 0
+        for index, task in enumerate(tasks):
+            work.put((index, task))
+            n_tasks += 1
+        if n_tasks == 0:
+            return
+        results = queue.Queue()
+        stopping = threading.Event()
+        threads = [
+            threading.Thread(
+                target=self._work,
+                args=(id_worker, work, results, stopping, recycle_after, kwargs),
+                daemon=True,
+            )
+            for id_worker in range(1, min(workers, n_tasks) + 1)
+        ]
+        self.log("run: %s tasks on %s workers", "INFO", n_tasks, len(threads))
+        for thread in threads:
+            thread.start()
+        try:
+            for _ in range(n_tasks):
+                yield results.get()
+        finally:
+            stopping.set()
+            for thread in threads:
+                thread.join()
+
+    def _work(self, id_worker, work, results, stopping, recycle_after, kwargs):
+        """Run tasks from the work queue on one driver, until the queue is empty."""
+        driver = None
+        n_pages = 0
+        with use_wait_policy(self.wait_policy):
+            try:
+                while not stopping.is_set():
+                    try:
+                        index, task = work.get_nowait()
+                    except queue.Empty:
+                        return
+                    if driver is None:
+                        try:
+                            driver = get_driver(**kwargs)
+                        except Exception as e:
+                            self.log(
+                                "WORKER-%02d: get_driver failed", "EXCEPTION", id_worker
+                            )
+                            results.put(CrawlResult(index, id_worker, None, e, 0.0))
+                            continue
+                        n_pages = 0
+                    start = time.perf_counter()
+                    try:
+                        result, error = task(driver, id_worker), None
+                    except Exception as e:
+                        self.log(
+                            "WORKER-%02d: task %s failed", "EXCEPTION", id_worker, index
+                        )
+                        result, error = None, e
+                    seconds = time.perf_counter() - start
+                    n_pages += 1
+                    results.put(CrawlResult(index, id_worker, result, error, seconds))
+                    crashed = isinstance(error, DRIVER_CRASHES)
+                    if crashed or (recycle_after and n_pages >= recycle_after):
+                        self.log("WORKER-%02d: recycling driver", "DEBUG", id_worker)
+                        self._stop_driver(driver)
+                        driver = None
+            finally:
+                if driver is not None:
+                    self._stop_driver(driver)
+
+    def _stop_driver(self, driver):
+        """
+        Stop a driver with stop_driver, falling back to quit (stop_driver's close
+        fails on a crashed browser, which would leave chromedriver running), and
+        logging (rather than raising) any failure.
+        """
+        try:
+            stop_driver(driver)
+        except Exception as e:
+            self.log("stop_driver failed: %s", "WARNING", e)
+            try:
+                driver.quit()
+            except Exception as e:
+                self.log("quit failed: %s", "WARNING", e)
@@ -1,6 +1,10 @@
 import os
+import json
 import time
+import queue
+import threading
 import numpy as np
+from contextlib import contextmanager
 from selenium import webdriver
 from pyvirtualdisplay import Display
 from selene.core.config import *
@@ -13,6 +17,9 @@ def get_driver(
     incognito=False,
     disable_gpu=False,
     use_display=False,
+    block=None,
+    page_load_strategy="normal",
+    network_stats=False,
 ):
     """
     Get an instance of selenium.webdriver and start browser
@@ -34,6 +41,19 @@ def get_driver(
             whether or not to disable GPU
         use_display: bool
             whether or not to use a virtual display
+        block : list
+            requests to block: names from core.config.BLOCK_PATTERNS (e.g. "image", "font",
+            "media", "ads", "analytics") and/or URL patterns (see get_block_patterns)
+        page_load_strategy : str
+            when navigation (driver.get) returns:
+                "normal": after the load event, when all resources have loaded
+                "eager": after DOMContentLoaded, without waiting for images etc.
+                "none": as soon as the navigation has started
+            (with "eager" or "none", use PageSelene.ready_condition to wait for the data needed)
+        network_stats : bool
+            whether to log network events, so that the requests made and blocked can be
+            counted with get_network_stats (which must then be called regularly, to
+            drain the log)
 
     Returns
     ----------
@@ -44,6 +64,7 @@ def get_driver(
     options.add_argument("--headless")
     options.add_argument("--no-sandbox")
     options.add_argument("--disable-dev-shm-usage")
+    options.page_load_strategy = page_load_strategy
     if incognito:
         options.add_argument("--incognito")
     if disable_gpu:
@@ -57,12 +78,27 @@ def get_driver(
     elif user_agent:
         options.add_argument(f"--user-agent={user_agent}")
 
-    # enable browser logging
-    options.set_capability("goog:loggingPrefs", {"browser": "ALL"})
+    # enable browser logging (and, if asked for, network logging for get_network_stats)
+    logging_prefs = {"browser": "ALL"}
+    if network_stats:
+        logging_prefs["performance"] = "ALL"
+    if block:
+        if "image" in block:
+            # also block images which are not recognisable by their url
+            options.add_experimental_option(
+                "prefs", {"profile.managed_default_content_settings.images": 2}
+            )
+    options.set_capability("goog:loggingPrefs", logging_prefs)
 
     driver = webdriver.Chrome(options=options)
     driver.set_window_rect(x=0, y=0, width=width, height=height)
 
+    if block:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd(
+            "Network.setBlockedURLs", {"urls": get_block_patterns(block)}
+        )
+
     if use_display:
         display = Display(visible=False, size=(width, height))
         display.start()
@@ -71,6 +107,69 @@ def get_driver(
     return driver
 
 
+def get_block_patterns(block):
+    """
+    Get the URL patterns to block, for get_driver(block=...).
+
+    Parameters
+    ----------
+        block : list
+            names from core.config.BLOCK_PATTERNS, and/or URL patterns (where "*"
+            matches any characters, and the whole URL must match, e.g.
+            "*.example.com/tracker*")
+
+    Returns
+    ----------
+        patterns : list
+            the URL patterns
+    """
+    if isinstance(block, str):
+        block = [block]
+    patterns = []
+    for item in block:
+        for pattern in BLOCK_PATTERNS.get(item, [item]):
+            if pattern not in patterns:
+                patterns.append(pattern)
+    return patterns
+
+
+def get_network_stats(driver):
+    """
+    Count the requests made and blocked by a driver started with
+    get_driver(network_stats=True) (and block=...), since the previous call (reading the performance log empties it, so calling this once
+    per page gives per-page statistics).
+
+    Blocked requests are never sent, so their size cannot be known; compare "bytes" with
+    the same page loaded without blocking to measure the bandwidth saved.
+
+    Parameters
+    ----------
+        driver : selenium.webdriver
+            a selenium webdriver instance started with block
+
+    Returns
+    ----------
+        output : dict
+            the number of requests sent ("requests"), the bytes received ("bytes"), the
+            number of requests blocked ("blocked") and their urls ("blocked_urls")
+    """
+    urls = {}
+    stats = {"requests": 0, "bytes": 0, "blocked": 0, "blocked_urls": []}
+    for entry in driver.get_log("performance"):
+        message = json.loads(entry["message"])["message"]
+        method = message.get("method")
+        params = message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            urls[params["requestId"]] = params["request"]["url"]
+        elif method == "Network.loadingFinished":
+            stats["requests"] += 1
+            stats["bytes"] += int(params.get("encodedDataLength", 0))
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            stats["blocked"] += 1
+            stats["blocked_urls"].append(urls.get(params["requestId"]))
+    return stats
+
+
 def stop_driver(driver, display=None):
     """
     Stop and close the selenium.webdriver instance
@@ -108,6 +207,240 @@ def restart_driver(driver, wait=WAIT_BIG):
     return get_driver()
 
 
+class DriverPool:
+    """
+    A pool of pre-launched selenium.webdriver instances.
+
+    Starting Chrome is slow, so the pool keeps a number of drivers ready to be
+    handed out. When a driver is given back it is health-checked and reset
+    (cookies cleared, extra tabs closed, navigated to about:blank). A driver
+    that fails the check is stopped and replaced in a background thread.
+
+    Usage:
+
+        pool = DriverPool(size=2)
+        with pool.driver() as driver:
+            page = PageSelene.from_url(driver, url)
+        pool.close()
+    """
+
+    def __init__(self, size=2, logger=None, **kwargs):
+        """
+        Initialise a DriverPool instance and start launching its drivers.
+
+        Parameters
+        ----------
+            size : int
+                the number of drivers to keep ready
+            logger : logging.Logger
+                a logger instance (see core.logger.py)
+            kwargs :
+                passed through to get_driver (use_display is not supported)
+        """
+        if kwargs.get("use_display"):
+            raise ValueError("DriverPool does not support use_display")
+        self.size = size
+        self.logger = logger
+        self.kwargs = kwargs
+        self.hits = 0
+        self.misses = 0
+        self.launch_times = []
+        self._ready = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._launching = 0
+        for _ in range(size):
+            self._launch_in_background()
+
+    def _launch(self):
+        """Launch a new driver, recording how long it took."""
+        start = time.perf_counter()
+        driver = get_driver(**self.kwargs)
+        with self._lock:
+            self.launch_times.append(time.perf_counter() - start)
+        return driver
+
+    def _launch_into_pool(self):
+        """Launch a new driver and add it to the pool of ready drivers."""
+        try:
+            driver = self._launch()
+        except Exception as e:
+            if self.logger:
+                self.logger.exception(f"DriverPool: launch failed: {e}")
+            return
+        finally:
+            with self._lock:
+                self._launching -= 1
+        if not self._put(driver):
+            self._stop_quietly(driver)
+
+    def _put(self, driver):
+        """
+        Add a driver to the ready drivers, unless the pool is closed or already has
+        size drivers ready. The check and the put are made under the pool lock, so
+        close() cannot drain the pool in between.
+
+        Returns
+        ----------
+            output : bool
+                True if the driver was added, False if the caller should stop it
+        """
+        with self._lock:
+            if self._closed or self._ready.qsize() >= self.size:
+                return False
+            self._ready.put(driver)
+            return True
+
+    def _launch_in_background(self):
+        """
+        Launch a new driver in a daemon thread, unless the pool is closed or the ready
+        drivers and those already launching would fill it.
+        """
+        with self._lock:
+            if self._closed or self._ready.qsize() + self._launching >= self.size:
+                return
+            self._launching += 1
+        thread = threading.Thread(target=self._launch_into_pool, daemon=True)
+        thread.start()
+
+    def acquire(self):
+        """
+        Take a driver from the pool. If no driver is ready, a new one is launched
+        (counted as a miss).
+
+        Returns
+        ----------
+            driver : selenium.webdriver
+                selenium.webdriver instance
+        """
+        if self._closed:
+            raise RuntimeError("DriverPool is closed")
+        try:
+            driver = self._ready.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                self.misses += 1
+            return self._launch()
+        with self._lock:
+            self.hits += 1
+        return driver
+
+    def release(self, driver):
+        """
+        Give a driver back to the pool. The driver is reset; if it is dead, it is
+        stopped and a replacement is launched in the background (unless the pool is
+        already full). If size drivers are already ready (e.g. after misses), it is
+        stopped.
+
+        Parameters
+        ----------
+            driver : selenium.webdriver
+                a driver previously taken with acquire()
+        """
+        if self._closed:
+            self._stop_quietly(driver)
+            return
+        if self._reset(driver):
+            # Drivers launched on a miss make the pool overfull: stop the extras
+            if not self._put(driver):
+                self._stop_quietly(driver)
+            return
+        if self.logger:
+            self.logger.debug("DriverPool: driver failed health check; replacing")
+        self._stop_quietly(driver)
+        self._launch_in_background()
+
+    @contextmanager
+    def driver(self):
+        """
+        Context manager which takes a driver from the pool and gives it back on exit.
+
+        Returns
+        ----------
+            driver : selenium.webdriver
+                selenium.webdriver instance
+        """
+        driver = self.acquire()
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    @staticmethod
+    def _reset(driver):
+        """
+        Health-check a driver and reset it to a blank state.
+
+        Returns
+        ----------
+            output : bool
+                True if the driver is alive and was reset, False otherwise
+        """
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+            return driver.current_url == "about:blank"
+        except Exception:
+            return False
+
+    @staticmethod
+    def _stop_quietly(driver):
+        """Stop a driver, ignoring any errors from an already-dead browser."""
+        try:
+            stop_driver(driver)
+        except Exception:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def stats(self):
+        """
+        Get the pool statistics.
+
+        Returns
+        ----------
+            output : dict
+                hits, misses, the number of ready drivers and launch latency (seconds)
+        """
+        with self._lock:
+            launch_times = list(self.launch_times)
+            hits, misses = self.hits, self.misses
+        return {
+            "size": self.size,
+            "ready": self._ready.qsize(),
+            "hits": hits,
+            "misses": misses,
+            "launches": len(launch_times),
+            "launch_mean": float(np.mean(launch_times)) if launch_times else None,
+            "launch_max": max(launch_times) if launch_times else None,
+        }
+
+    def close(self):
+        """Stop every ready driver. Drivers launched after this are stopped immediately."""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                driver = self._ready.get_nowait()
+            except queue.Empty:
+                return
+            self._stop_quietly(driver)
+
+    def __enter__(self):
+        """Use the pool itself as a context manager; close() is called on exit."""
+        return self
+
+    def __exit__(self, *args):
+        """Close the pool."""
+        self.close()
+
+
 def get_user_agent(i):
     """
     Get a specific user agent string from core.config.USER_AGENTS
@@ -1,4 +1,7 @@
+from selenium.common.exceptions import StaleElementReferenceException
+
 from selene.core.element import Element
+from selene.core.selenium.instrument import instrumented
 from selene.core.selenium.tasks import *
 from selene.core.selenium.scripts import *
 from selene.core.selenium.conditions import *
@@ -27,10 +30,78 @@ class ElementSelene(Element):
                 a logger instance (see core.logger.py)
         """
         Element.__init__(self, element, logger)
-        self.location = element.location
-        self.size = element.size
-        self.text = element.text
+        self._location = None
+        self._size = None
+        self._text = None
+
+    @property
+    @instrumented
+    def location(self):
+        """The element's location, fetched from the webdriver on first access."""
+        if self._location is None:
+            self._location = self.element.location
+        return self._location
+
+    @location.setter
+    def location(self, value):
+        """Set the cached location."""
+        self._location = value
+
+    @property
+    @instrumented
+    def size(self):
+        """The element's size, fetched from the webdriver on first access."""
+        if self._size is None:
+            self._size = self.element.size
+        return self._size
+
+    @size.setter
+    def size(self, value):
+        """Set the cached size."""
+        self._size = value
+
+    @property
+    @instrumented
+    def text(self):
+        """The element's text, fetched from the webdriver on first access."""
+        if self._text is None:
+            self._text = self.element.text
+        return self._text
 
+    @text.setter
+    def text(self, value):
+        """Set the cached text."""
+        self._text = value
+
+    @staticmethod
+    @instrumented
+    def prefetch(driver, elements):
+        """
+        Fill the location, size and text of a list of ElementSelene objects using
+        a single JavaScript call, rather than three webdriver calls per element.
+
+        Parameters
+        ----------
+            driver : selenium.webdriver
+                a selenium webdriver instance
+            elements : list
+                the ElementSelene objects to fill
+
+        Returns
+        ----------
+            elements : list
+                the same ElementSelene objects
+        """
+        if not elements:
+            return elements
+        properties = script_get_element_properties(driver, elements)
+        for element, prop in zip(elements, properties):
+            element.location = prop["location"]
+            element.size = prop["size"]
+            element.text = prop["text"]
+        return elements
+
+    @instrumented
     def get_text(self):
         """
         Get the element's text
@@ -43,6 +114,7 @@ class ElementSelene(Element):
         """
         return self.text
 
+    @instrumented
     def get_parent(self, driver):
         """
         Get the element's parent
@@ -53,6 +125,7 @@ class ElementSelene(Element):
         """
         return ElementSelene(script_get_parent(driver, self))
 
+    @instrumented
     def find(self, by, identifier, wait=WAIT_NORMAL, log=True):
         """
         This:
@@ -76,14 +149,11 @@ class ElementSelene(Element):
         logger = self.logger if log else None
         element = task_find(self.element, by, identifier, wait=wait, logger=logger)
         if element is not None:
-            try:
-                return ElementSelene(element, logger)
-            except StaleElementReferenceException as e:
-                self.log(f"{e}", "EXCEPTION")
-                return self.find(by, identifier, wait, log)
+            return ElementSelene(element, logger)
         return None
 
-    def find_all(self, by, identifier, wait=WAIT_NORMAL, log=True):
+    @instrumented
+    def find_all(self, by, identifier, wait=WAIT_NORMAL, log=True, prefetch=False):
         """
         This:
             - wraps core.selenium.tasks.task_find_all
@@ -97,6 +167,8 @@ class ElementSelene(Element):
                 see https://selenium-python.readthedocs.io/locating-elements.html
             wait : int
                 a number of seconds to wait before raising a TimeoutException
+            prefetch : bool
+                whether to fetch the location, size and text of all elements in one call
 
         Returns
         ----------
@@ -105,13 +177,16 @@ class ElementSelene(Element):
         """
         logger = self.logger if log else None
         elements = task_find_all(self.element, by, identifier, wait=wait, logger=logger)
-        try:
-            elements = [ElementSelene(el, logger) for el in elements]
-        except StaleElementReferenceException as e:
-            self.log(f"{e}", "EXCEPTION")
-            return self.find_all(by, identifier, wait, log)
+        elements = [ElementSelene(el, logger) for el in elements]
+        if prefetch:
+            try:
+                ElementSelene.prefetch(self.element.parent, elements)
+            except StaleElementReferenceException as e:
+                self.log(e, "EXCEPTION")
+                return self.find_all(by, identifier, wait, log, prefetch)
         return elements
 
+    @instrumented
     def get_attribute(self, *args, **kwargs):
         """
         Gets an attribute from the element. E.g. self.get_attribute('href') would
@@ -124,6 +199,7 @@ class ElementSelene(Element):
         """
         return self.element.get_attribute(*args, **kwargs)
 
+    @instrumented
     def has_attribute(self, *args, **kwargs):
         """
         Check whether the element contains a specified attribute.
@@ -135,6 +211,7 @@ class ElementSelene(Element):
         """
         return self.element.get_attribute(*args, **kwargs) is not None
 
+    @instrumented
     def click(self, driver):
         """
         Click the element.
@@ -146,6 +223,7 @@ class ElementSelene(Element):
         """
         return script_click_element(driver, self)
 
+    @instrumented
     def scroll_down(self, driver, wait=WAIT_NORMAL):
         """
         Scroll down the element IF the element has a scrollbar.
@@ -170,6 +248,7 @@ class ElementSelene(Element):
         script_scroll_to(driver, position_new, self)
         return bool_scroll_position_changed(driver, self, wait, self.logger, position)
 
+    @instrumented
     def scroll_to(self, driver, position_new, wait=WAIT_NORMAL):
         """
         Scroll to a new position on the element IF the element has a scrollbar.
@@ -190,6 +269,7 @@ class ElementSelene(Element):
         script_scroll_to(driver, position_new, self)
         return bool_scroll_position_changed(driver, self, wait, self.logger, position)
 
+    @instrumented
     def scroll_to_bottom(self, driver, wait=WAIT_NORMAL):
         """
         Scroll to the bottom of the element IF the element has a scrollbar.
@@ -0,0 +1,350 @@
+import json
+import time
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from selene.core.page import Page
+
+# Whether instrumented functions record their calls (see enable_instrumentation)
+_enabled = False
+# The instrumented call currently running in this thread/context (see _Frame)
+_frame = contextvars.ContextVar("selene_instrument_frame", default=None)
+# The recorded statistics, by (page class, method)
+_stats = {}
+_stats_lock = threading.Lock()
+# WebDriver.execute before it was patched by enable_instrumentation
+_execute = None
+
+# The statistics recorded per (page class, method), in order
+STAT_NAMES = (
+    "calls",
+    "errors",
+    "seconds",
+    "commands",
+    "command_seconds",
+    "wait_seconds",
+    "polls",
+)
+# The page class recorded for calls made outside of any PageSelene method
+NO_PAGE = "-"
+
+
+class _Frame:
+    """
+    One running instrumented call. Commands, waits and polls are added to the frame and
+    to all of its parents, so the statistics of a method include those of the functions
+    it calls.
+    """
+
+    __slots__ = ("page", "parent", "commands", "command_seconds", "wait_seconds", "polls")
+
+    def __init__(self, page, parent):
+        """Start a frame for a call from a page class, within a parent frame (or None)."""
+        self.page = page
+        self.parent = parent
+        self.commands = 0
+        self.command_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.polls = 0
+
+
+def _get_page(args, parent):
+    """
+    Get the page class to record a call under: the class of a PageSelene method's self
+    (or cls), else the page class of the calling frame.
+    """
+    if args:
+        owner = args[0]
+        if isinstance(owner, Page):
+            return type(owner).__name__
+        if isinstance(owner, type) and issubclass(owner, Page):
+            return owner.__name__
+    return parent.page if parent is not None else NO_PAGE
+
+
+def _get_stats(page, method):
+    """Get the statistics of a (page class, method), adding them if new (hold the lock)."""
+    stats = _stats.get((page, method))
+    if stats is None:
+        stats = _stats[(page, method)] = [0, 0, 0.0, 0, 0.0, 0.0, 0]
+    return stats
+
+
+def _record(page, method, error, seconds, frame):
+    """Add one finished call to the statistics."""
+    with _stats_lock:
+        stats = _get_stats(page, method)
+        stats[0] += 1
+        stats[1] += error
+        stats[2] += seconds
+        stats[3] += frame.commands
+        stats[4] += frame.command_seconds
+        stats[5] += frame.wait_seconds
+        stats[6] += frame.polls
+
+
+def instrumented(func):
+    """
+    Decorate a function (or method) so that, while instrumentation is enabled, its calls,
+    errors, wall time, WebDriver commands and wait/poll time are recorded under its
+    page class and name. When instrumentation is disabled the function is called directly.
+
+    Parameters
+    ----------
+        func : function
+            the function to instrument
+
+    Returns
+    ----------
+        wrapper : function
+            the instrumented function
+    """
+    method = func.__qualname__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        """Call func, recording its calls, commands and waits if instrumentation is on."""
+        if not _enabled:
+            return func(*args, **kwargs)
+        parent = _frame.get()
+        frame = _Frame(_get_page(args, parent), parent)
+        token = _frame.set(frame)
+        error = False
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        except BaseException:
+            error = True
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            _frame.reset(token)
+            _record(frame.page, method, error, seconds, frame)
+
+    return wrapper
+
+
+def record_wait(seconds, polls):
+    """
+    Add the time spent in a wait, and the number of times its condition was polled,
+    to the running instrumented calls (see conditions.wait_until).
+
+    Parameters
+    ----------
+        seconds : float
+            the time spent waiting
+        polls : int
+            the number of times the condition was evaluated
+    """
+    frame = _frame.get()
+    while frame is not None:
+        frame.wait_seconds += seconds
+        frame.polls += polls
+        frame = frame.parent
+
+
+def _instrumented_execute(self, driver_command, params=None):
+    """WebDriver.execute, counting each command and its round-trip time."""
+    start = time.perf_counter()
+    try:
+        return _execute(self, driver_command, params)
+    finally:
+        seconds = time.perf_counter() - start
+        frame = _frame.get()
+        if frame is None:
+            # A command sent outside of any instrumented function
+            with _stats_lock:
+                stats = _get_stats(NO_PAGE, "WebDriver.execute")
+                stats[0] += 1
+                stats[2] += seconds
+                stats[3] += 1
+                stats[4] += seconds
+        while frame is not None:
+            frame.commands += 1
+            frame.command_seconds += seconds
+            frame = frame.parent
+
+
+def instrumentation_enabled():
+    """
+    Returns
+    ----------
+        output : bool
+            whether instrumentation is enabled
+    """
+    return _enabled
+
+
+def enable_instrumentation():
+    """
+    Start recording the task_*, bool_* and script_* functions, the PageSelene and
+    ElementSelene methods, and every WebDriver command sent (by patching
+    WebDriver.execute). The statistics are kept until reset_instrumentation is called.
+    """
+    global _enabled, _execute
+    if _execute is None:
+        _execute = WebDriver.execute
+        WebDriver.execute = _instrumented_execute
+    _enabled = True
+
+
+def disable_instrumentation():
+    """Stop recording, and restore WebDriver.execute. The statistics are kept."""
+    global _enabled, _execute
+    _enabled = False
+    if _execute is not None:
+        WebDriver.execute = _execute
+        _execute = None
+
+
+def reset_instrumentation():
+    """Clear the recorded statistics."""
+    with _stats_lock:
+        _stats.clear()
+
+
+@contextmanager
+def instrumentation(reset=True):
+    """
+    Record within a with block:
+
+        with instrumentation():
+            page = PageCountry.from_url(driver, url)
+            elements = page.find_all(driver, By.CLASS_NAME, "country")
+        print(get_instrumentation_summary())
+
+    Parameters
+    ----------
+        reset : bool
+            whether to clear the statistics recorded before the block
+    """
+    if reset:
+        reset_instrumentation()
+    enable_instrumentation()
+    try:
+        yield
+    finally:
+        disable_instrumentation()
+
+
+def get_instrumentation_stats():
+    """
+    Get the recorded statistics, slowest first. Times are inclusive: a method's seconds,
+    commands and waits include those of the functions it calls.
+
+    Returns
+    ----------
+        output : list
+            a dict per (page class, method) with its calls, errors, seconds (wall time),
+            commands (WebDriver commands sent), command_seconds (time in WebDriver
+            round-trips), wait_seconds (time in waits) and polls (wait conditions
+            evaluated)
+    """
+    with _stats_lock:
+        items = [(key, list(stats)) for key, stats in _stats.items()]
+    output = [
+        dict(page=page, method=method, **dict(zip(STAT_NAMES, stats)))
+        for (page, method), stats in items
+    ]
+    return sorted(output, key=lambda stats: stats["seconds"], reverse=True)
+
+
+def get_instrumentation_summary(limit=None):
+    """
+    Get the recorded statistics as a table, slowest first.
+
+    Parameters
+    ----------
+        limit : int
+            the number of rows to show (default: all)
+
+    Returns
+    ----------
+        output : str
+            the table
+    """
+    stats = get_instrumentation_stats()[:limit]
+    width_page = max([len("page")] + [len(row["page"]) for row in stats])
+    width_method = max([len("method")] + [len(row["method"]) for row in stats])
+    lines = [
+        f"{'page':<{width_page}}  {'method':<{width_method}}"
+        f"{'calls':>8}{'errors':>8}{'seconds':>10}{'mean ms':>10}"
+        f"{'commands':>10}{'cmd s':>9}{'wait s':>9}{'polls':>8}"
+    ]
+    for row in stats:
+        mean = row["seconds"] / row["calls"] * 1000 if row["calls"] else 0.0
+        lines.append(
+            f"{row['page']:<{width_page}}  {row['method']:<{width_method}}"
+            f"{row['calls']:>8}{row['errors']:>8}{row['seconds']:>10.3f}{mean:>10.2f}"
+            f"{row['commands']:>10}{row['command_seconds']:>9.3f}"
+            f"{row['wait_seconds']:>9.3f}{row['polls']:>8}"
+        )
+    return "\n".join(lines)
+
+
+def get_instrumentation_json(**kwargs):
+    """
+    Get the recorded statistics as JSON.
+
+    Parameters
+    ----------
+        kwargs :
+            passed through to json.dumps
+
+    Returns
+    ----------
+        output : str
+            a JSON list, as get_instrumentation_stats
+    """
+    return json.dumps(get_instrumentation_stats(), **kwargs)
+
+
+def get_instrumentation_prometheus(prefix="selene"):
+    """
+    Get the recorded statistics in the Prometheus text exposition format, e.g.
+
+        # TYPE selene_calls_total counter
+        selene_calls_total{page="PageCountry",method="task_find"} 12
+
+    Parameters
+    ----------
+        prefix : str
+            the prefix of the metric names
+
+    Returns
+    ----------
+        output : str
+            the metrics
+    """
+    metrics = {
+        "calls": ("calls_total", "Number of calls"),
+        "errors": ("errors_total", "Number of calls which raised an exception"),
+        "seconds": ("seconds_total", "Wall time spent in calls"),
+        "commands": ("webdriver_commands_total", "Number of WebDriver commands sent"),
+        "command_seconds": (
+            "webdriver_seconds_total",
+            "Time spent in WebDriver round-trips",
+        ),
+        "wait_seconds": ("wait_seconds_total", "Time spent in waits"),
+        "polls": ("polls_total", "Number of wait conditions evaluated"),
+    }
+    stats = get_instrumentation_stats()
+    lines = []
+    for stat, (name, description) in metrics.items():
+        lines.append(f"# HELP {prefix}_{name} {description}, by page class and method.")
+        lines.append(f"# TYPE {prefix}_{name} counter")
+        for row in stats:
+            labels = 'page="{}",method="{}"'.format(
+                _escape_label(row["page"]), _escape_label(row["method"])
+            )
+            lines.append(f"{prefix}_{name}{{{labels}}} {row[stat]}")
+    return "\n".join(lines) + "\n"
+
+
+def _escape_label(value):
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -5,17 +5,24 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.wait import WebDriverWait
-from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+from selenium.common.exceptions import (
+    TimeoutException,
+    StaleElementReferenceException,
+    WebDriverException,
+)
 
 from selene.core.page import *
 from selene.core.config import *
+from selene.core.utils import canonicalise_url, get_rate_limiter
 from selene.core.selenium.tasks import *
 from selene.core.selenium.driver import *
 from selene.core.selenium.scripts import *
 from selene.core.selenium.element import *
 from selene.core.selenium.conditions import *
+from selene.core.selenium.instrument import instrumented
 
 from selene.core.soup.page import PageSoup
+from selene.core.schema import get_schema
 
 
 class PageSelene(Page):
@@ -32,11 +39,38 @@ class PageSelene(Page):
 
     NOTE 2: Any PageSelene object will also contain a PageSoup object (see core.soup.page).
     This is an attempt to allow both the use of Selenium (for dynamic elements)
-    and BeautifulSoup (for static elements) when scraping.
+    and BeautifulSoup (for static elements) when scraping. The PageSoup object is only
+    built (from the driver's page source) when it is first used, e.g. by find_soup.
+
+    NOTE 3: Subclasses can choose the parser backend of the PageSoup object by setting the
+    soup_backend class attribute to "bs4" or "lxml" (see core.soup.backends), and can restrict
+    the PageSoup object to part of the page by setting the parse_only class attribute
+    (see core.soup.page.PageSoup).
+
+    NOTE 4: Subclasses can choose how the page waits for its elements and urls by setting the
+    wait_policy class attribute to a core.config.WaitPolicy (e.g. polling less often for slow
+    pages).
+
+    NOTE 5: Subclasses can declare when the page is ready by setting the ready_condition class
+    attribute to either a (by, identifier) tuple (ready when a matching element is present) or
+    a function of the driver (ready when it returns a truthy value). from_url waits for it after
+    navigating. With a driver started with page_load_strategy="eager" or "none"
+    (see core.selenium.driver.get_driver), navigation then returns as soon as the data needed
+    is in the DOM, rather than after every image and third-party script has loaded.
+
+    NOTE 6: Subclasses can declare the data to extract from a page by setting the schema class
+    attribute to a dict of core.schema.Field instances, by name; extract then reads every field
+    in a single JavaScript call.
 
     Inherits selene.core.page.Page
     """
 
+    soup_backend = None
+    parse_only = None
+    wait_policy = None
+    ready_condition = None
+    schema = None
+
     def __init__(self, driver, url, logger=None, *args, **kwargs):
         """
         Initialise a PageSelene instance.
@@ -51,10 +85,67 @@ class PageSelene(Page):
                 a logger instance (see core.logger.py)
         """
         Page.__init__(self, url, logger, *args, **kwargs)
-        # Get the PageSoup object
-        self.page_soup = self.get_page_soup(driver)
+        # The PageSoup object is built lazily (see page_soup), but only while the
+        # driver is still on the page's url (or _driver_url, if it was redirected)
+        self._driver = driver
+        self._driver_url = None
+        self._page_soup = None
+
+    @property
+    def page_soup(self):
+        """
+        The PageSoup object (see core.soup.page) of the page's html.
+
+        It is built from the driver's page source the first time it is accessed, and
+        then kept until invalidate_soup() or snapshot() is called. If the driver is
+        not on the page's url (or the url it was on when last invalidated), a
+        RuntimeError is raised rather than parsing the wrong page: call snapshot() on
+        the page's url first, or use snapshot(driver) to parse the current page.
+        """
+        if self._page_soup is None:
+            page_url = self._driver_url or self.url
+            driver_url = self._driver.current_url
+            if canonicalise_url(driver_url) != canonicalise_url(page_url):
+                raise RuntimeError(
+                    f"The driver has moved on from {page_url} to {driver_url}: "
+                    "use snapshot(driver) to parse the current page"
+                )
+            self._page_soup = self.get_page_soup(self._driver)
+        return self._page_soup
+
+    @page_soup.setter
+    def page_soup(self, page_soup):
+        """Set the PageSoup object."""
+        self._page_soup = page_soup
+
+    def invalidate_soup(self):
+        """
+        Discard the PageSoup object, e.g. after the page has changed. A new one will
+        be built (from the driver's current url) the next time it is used.
+        """
+        self._page_soup = None
+        self._driver_url = self._driver.current_url
+
+    @instrumented
+    def snapshot(self, driver=None):
+        """
+        Rebuild the PageSoup object from the current page source straight away.
+
+        Parameters
+        ----------
+            driver : selenium.webdriver
+                the initialised webdriver instance (default: the page's driver)
+
+        Returns
+        ----------
+            output : PageSoup
+                PageSoup object initialised using the page's current source html code.
+        """
+        self._page_soup = self.get_page_soup(driver or self._driver)
+        return self._page_soup
 
     @classmethod
+    @instrumented
     def from_url(cls, driver, url, string="", logger=None, *args, **kwargs):
         """
         Initialise a PageSelene instance and navigate to the instance's specified url
@@ -75,11 +166,32 @@ class PageSelene(Page):
                 a logger instance (see core.logger.py)
         """
         if logger:
-            logger.debug(f"navigate to: {url}")
-        task_navigate_to_url(driver, url, string=string, wait=WAIT_NORMAL, logger=logger)
-        return cls(driver, url, logger, *args, **kwargs)
+            logger.debug("navigate to: %s", url)
+        navigated = task_navigate_to_url(
+            driver,
+            url,
+            string=string,
+            wait=WAIT_NORMAL,
+            logger=logger,
+            policy=cls.wait_policy,
+        )
+        if cls.ready_condition is not None:
+            bool_condition(
+                driver,
+                WAIT_NORMAL,
+                logger,
+                cls.ready_condition,
+                f"Page not ready: {url}",
+                policy=cls.wait_policy,
+            )
+        page = cls(driver, url, logger, *args, **kwargs)
+        if string or not navigated:
+            # The driver may not be on the exact url (e.g. it was redirected)
+            page._driver_url = driver.current_url
+        return page
 
     @classmethod
+    @instrumented
     def new_tab(cls, driver, url, string="", logger=None):
         """
         Initialise a PageSelene instance and navigate to the instance's specified url in a new tab
@@ -100,12 +212,186 @@ class PageSelene(Page):
                 a logger instance (see core.logger.py)
         """
         if logger:
-            logger.debug(f"navigate to: {url} in new tab")
+            logger.debug("navigate to: %s in new tab", url)
         task_navigate_to_url_in_new_tab(
-            driver, url, string=string, wait=WAIT_NORMAL, logger=logger
+            driver,
+            url,
+            string=string,
+            wait=WAIT_NORMAL,
+            logger=logger,
+            policy=cls.wait_policy,
         )
         return cls.from_url(driver=driver, url=url, string=string, logger=None)
 
+    @classmethod
+    def from_urls_in_tabs(
+        cls, driver, urls, tabs=4, wait=WAIT_NORMAL, logger=None, limiter=None
+    ):
+        """
+        Load many urls in one driver, keeping several tabs loading at once, and yield
+        a PageSelene instance for each url as soon as its tab has finished loading.
+
+        Tabs are opened without switching to them (see core.selenium.scripts.script_open_tab),
+        so the network latency of up to `tabs` pages overlaps within a single browser.
+        A tab is ready when its document has loaded, or, if the class has a ready_condition,
+        when that is met (see is_ready). When a page is yielded, the driver is switched to
+        its tab; the tab is closed (and the next url opened) when the next page is
+        requested, so each page can only be used until then. Pages which do not finish
+        loading within `wait` seconds are skipped and logged.
+        On exit, any remaining tabs are closed and the driver is switched back to its
+        original tab.
+
+        If there is a rate limiter, each tab waits for it before its url is opened, and
+        reports its load time (and status) to it once ready, as task_navigate_to_url
+        does. The tabs are opened from one thread, so they share an
+        AdaptiveController's concurrency slot for each domain, but not its rate.
+
+        Usage:
+
+            for page in PageSelene.from_urls_in_tabs(driver, urls, tabs=4):
+                rows = page.find_all_soup("tr")
+
+        Parameters
+        ----------
+            driver : selenium.webdriver
+                the initialised webdriver instance
+            urls : iterable
+                the urls to load
+            tabs : int
+                the maximum number of tabs to load at once
+            wait : int
+                a number of seconds to wait for each page to load
+            logger : logging.Logger
+                a logger instance (see core.logger.py)
+            limiter : core.utils.RateLimiter
+                the rate limiter (or core.utils.AdaptiveController) to wait for before
+                opening each url (default: the shared one, see
+                core.utils.get_rate_limiter)
+
+        Returns
+        ----------
+            output : generator
+                PageSelene instances, in the order the pages finish loading
+        """
+        handle_home = driver.current_window_handle
+        urls = iter(urls)
+        loading = {}
+        limiter = limiter or get_rate_limiter()
+
+        def open_next():
+            """Open the next url in a new tab, returning False if there are none left."""
+            url = next(urls, None)
+            if url is None:
+                return False
+            if limiter is not None:
+                limiter.acquire(url)
+            start = time.monotonic()
+            opened = False
+            try:
+                handles_prev = set(driver.window_handles)
+                script_open_tab(driver, url)
+                handles_new = [h for h in driver.window_handles if h not in handles_prev]
+                if not handles_new:
+                    if logger:
+                        logger.warning("from_urls_in_tabs: could not open tab: %s", url)
+                    return True
+                loading[handles_new[0]] = (url, start)
+                opened = True
+            finally:
+                # A tab which opened is released once it is ready, or times out
+                if limiter is not None and not opened:
+                    limiter.release(url, error=True)
+            return True
+
+        def release(handle, **feedback):
+            """Report a tab's load to the rate limiter, with its load time."""
+            if limiter is None:
+                return
+            url, start = loading[handle]
+            limiter.release(url, latency=time.monotonic() - start, **feedback)
+
+        def close(handle):
+            """
+            Close a tab, and switch back to the original tab, so that the driver is
+            never left on a closed window when the next tab is opened or polled.
+            """
+            del loading[handle]
+            try:
+                driver.switch_to.window(handle)
+                driver.close()
+            except WebDriverException as e:
+                if logger:
+                    logger.exception(e)
+            finally:
+                driver.switch_to.window(handle_home)
+
+        try:
+            while len(loading) < tabs and open_next():
+                pass
+            intervals = get_wait_policy(cls.wait_policy).intervals()
+            while loading:
+                ready = None
+                for handle, (url, start) in list(loading.items()):
+                    driver.switch_to.window(handle)
+                    if cls.is_ready(driver):
+                        ready = handle
+                        break
+                    if time.monotonic() - start > wait:
+                        if logger:
+                            logger.warning("from_urls_in_tabs: timed out: %s", url)
+                        release(handle, error=True)
+                        close(handle)
+                        open_next()
+                if ready is None:
+                    time.sleep(next(intervals))
+                    continue
+                url, _ = loading[ready]
+                if logger:
+                    logger.debug("from_urls_in_tabs: loaded: %s", url)
+                status = None
+                if limiter is not None and limiter.uses_feedback:
+                    try:
+                        status = script_get_response_status(driver)
+                    except WebDriverException:
+                        pass
+                release(ready, status=status)
+                # Released: the tab is no longer counted when it is closed below
+                loading[ready] = (url, None)
+                yield cls(driver, url, logger)
+                close(ready)
+                open_next()
+                intervals = get_wait_policy(cls.wait_policy).intervals()
+        finally:
+            for handle, (url, start) in list(loading.items()):
+                if start is not None:
+                    release(handle)
+                close(handle)
+            driver.switch_to.window(handle_home)
+
+    @classmethod
+    @instrumented
+    def is_ready(cls, driver):
+        """
+        Check, without waiting, whether the driver's current page is ready: when the class
+        has a ready_condition, whether it is met, otherwise whether the document has loaded.
+
+        Parameters
+        ----------
+            driver : selenium.webdriver
+                the initialised webdriver instance
+
+        Returns
+        ----------
+            output : bool
+                True if the page is ready, False otherwise
+        """
+        if cls.ready_condition is None:
+            return script_get_ready_state(driver) == "complete"
+        return bool_condition(
+            driver, WAIT_TINY, None, cls.ready_condition, policy=cls.wait_policy
+        )
+
+    @instrumented
     def get_page_soup(self, driver):
         """
         Get a PageSoup object (see core.soup.page) with the current source html code
@@ -121,8 +407,15 @@ class PageSelene(Page):
             output : PageSoup
                 PageSoup object initialised using the page's source html code.
         """
-        return PageSoup.from_html(self.url, driver.page_source, self.logger)
+        return PageSoup.from_html(
+            self.url,
+            driver.page_source,
+            self.logger,
+            backend=self.soup_backend,
+            parse_only=self.parse_only,
+        )
 
+    @instrumented
     def refresh(self, driver, wait=0):
         """
         Refresh the page by refreshing the driver and re-initialising the PageSelene object.
@@ -139,12 +432,13 @@ class PageSelene(Page):
             output : PageSelene
                 re-initialised PageSelene object
         """
-        self.log(f"refreshing driver: {self.url}")
+        self.log("refreshing driver: %s", "DEBUG", self.url)
         driver.refresh()
-        self.log(f"waiting {wait} seconds")
+        self.log("waiting %s seconds", "DEBUG", wait)
         time.sleep(wait)
         return self.from_url(driver, self.url, logger=self.logger)
 
+    @instrumented
     def refresh_until_true(self, driver, func, message, attempts, *args, **kwargs):
         """
         This wraps other functions such as self.find.
@@ -176,17 +470,20 @@ class PageSelene(Page):
         kwargs["driver"] = driver
         for attempt in range(attempts):
             if func(*args, **kwargs):
-                self.log(f"function {func.__name__} succeeded; returning True")
+                self.log("function %s succeeded; returning True", "DEBUG", func.__name__)
                 return True
-            self.log(f"{message}: {self.url}", "EXCEPTION")
+            self.log("%s: %s", "EXCEPTION", message, self.url)
             self.screenshot_to_notebook(driver)
             if attempt < attempts:
-                self.log(f"attempting refresh: attempts: {attempt+1}")
+                self.log("attempting refresh: attempts: %s", "DEBUG", attempt + 1)
                 self.refresh(driver, wait=(attempt + 1) * 30)
             else:
-                self.log(f"function {func.__name__} failed; returning False", "EXCEPTION")
+                self.log(
+                    "function %s failed; returning False", "EXCEPTION", func.__name__
+                )
                 return False
 
+    @instrumented
     def navigate_to_url(
         self,
         driver,
@@ -213,9 +510,12 @@ class PageSelene(Page):
             output : bool
                 True if the operation was successful, False otherwise
         """
-        self.log(f'navigate_to_url: {"; ".join([url, string])}')
-        task_navigate_to_url(driver, url, string, wait, logger=self.logger)
+        self.log("navigate_to_url: %s; %s", "DEBUG", url, string)
+        task_navigate_to_url(
+            driver, url, string, wait, logger=self.logger, policy=self.wait_policy
+        )
 
+    @instrumented
     def find(self, driver, by, identifier, wait=WAIT_NORMAL, log=True):
         """
         This:
@@ -240,16 +540,17 @@ class PageSelene(Page):
                 returns the element if an element is found, None otherwise
         """
         logger = self.logger if log else None
-        element = task_find(driver, by, identifier, wait=wait, logger=logger)
+        element = task_find(
+            driver, by, identifier, wait=wait, logger=logger, policy=self.wait_policy
+        )
         if element is not None:
-            try:
-                return ElementSelene(element, logger)
-            except StaleElementReferenceException as e:
-                self.log(f"{e}", "EXCEPTION")
-                return self.find(driver, by, identifier, wait, log)
+            return ElementSelene(element, logger)
         return None
 
-    def find_all(self, driver, by, identifier, wait=WAIT_NORMAL, log=True):
+    @instrumented
+    def find_all(
+        self, driver, by, identifier, wait=WAIT_NORMAL, log=True, prefetch=False
+    ):
         """
         This:
             - wraps core.selenium.tasks.task_find_all
@@ -266,6 +567,8 @@ class PageSelene(Page):
                 see https://selenium-python.readthedocs.io/locating-elements.html
             wait : int
                 a number of seconds to wait before raising a TimeoutException
+            prefetch : bool
+                whether to fetch the location, size and text of all elements in one call
 
         Returns
         ----------
@@ -273,14 +576,78 @@ class PageSelene(Page):
                 returns the elements if one or more element is found, an empty list otherwise
         """
         logger = self.logger if log else None
-        elements = task_find_all(driver, by, identifier, wait=wait, logger=logger)
-        try:
-            elements = [ElementSelene(el, logger) for el in elements]
-        except StaleElementReferenceException as e:
-            self.log(f"{e}", "EXCEPTION")
-            return self.find_all(driver, by, identifier, wait, log)
+        elements = task_find_all(
+            driver, by, identifier, wait=wait, logger=logger, policy=self.wait_policy
+        )
+        elements = [ElementSelene(el, logger) for el in elements]
+        if prefetch:
+            try:
+                ElementSelene.prefetch(driver, elements)
+            except StaleElementReferenceException as e:
+                self.log(e, "EXCEPTION")
+                return self.find_all(driver, by, identifier, wait, log, prefetch)
         return elements
 
+    @instrumented
+    def extract_all(
+        self, driver, by, identifier, fields=("text",), wait=WAIT_NORMAL, log=True
+    ):
+        """
+        Find all elements matching a By. selector and an identifier, and extract
+        fields from them, using a single JavaScript call
+        (see core.selenium.scripts.script_extract_all).
+
+        This is much quicker than find_all followed by a get_attribute loop, and
+        it cannot fail part-way through if the page changes.
+
+        Parameters
+        ----------
+            driver : selenium.webdriver
+                a selenium webdriver instance
+            by : selenium.webdriver.common.by.By
+                see https://selenium-python.readthedocs.io/locating-elements.html
+            identifier : str
+                see https://selenium-python.readthedocs.io/locating-elements.html
+            fields : list
+                the fields to extract: "text", "html", "rect", "attrs" or an attribute name
+            wait : int
+                a number of seconds to wait for the first element before raising a TimeoutException
+
+        Returns
+        ----------
+            output : list
+                one dict per element found (an empty list if none are found)
+        """
+        logger = self.logger if log else None
+        element = task_find(
+            driver, by, identifier, wait=wait, logger=logger, policy=self.wait_policy
+        )
+        if element is None:
+            return []
+        return script_extract_all(driver, by, identifier, fields)
+
+    @instrumented
+    def extract(self, driver, as_record=False):
+        """
+        Extract every field of the class's schema from the page, in a single JavaScript call
+        (see core.schema.Schema).
+
+        Parameters
+        ----------
+            driver : selenium.webdriver
+                a selenium webdriver instance
+            as_record : bool
+                whether to return a namedtuple, rather than a dict
+
+        Returns
+        ----------
+            output : dict or namedtuple
+                the value of each field
+        """
+        self.log("extract")
+        return get_schema(type(self)).extract_selenium(driver, as_record)
+
+    @instrumented
     def find_soup(self, *args, **kwargs):
         """
         Each PageSelene object contains a PageSoup object.
@@ -294,6 +661,7 @@ class PageSelene(Page):
         """
         return self.page_soup.find(*args, **kwargs)
 
+    @instrumented
     def find_all_soup(self, *args, **kwargs):
         """
         Each PageSelene object contains a PageSoup object.
@@ -307,6 +675,7 @@ class PageSelene(Page):
         """
         return self.page_soup.find_all(*args, **kwargs)
 
+    @instrumented
     def click(self, driver, by, identifier, wait=WAIT_NORMAL):
         """
         Find and click an element on the page.
@@ -327,11 +696,14 @@ class PageSelene(Page):
             output : bool
                 True if the operation was successful, False otherwise
         """
-        if not bool_clickable(driver, by, identifier, wait=wait, logger=self.logger):
+        if not bool_clickable(
+            driver, by, identifier, wait=wait, logger=self.logger, policy=self.wait_policy
+        ):
             return False
         element = self.find(driver, by, identifier, wait=wait)
         return element.click(driver)
 
+    @instrumented
     def scroll_down(self, driver, wait=WAIT_NORMAL):
         """
         Scroll down the page.
@@ -348,15 +720,18 @@ class PageSelene(Page):
             output : bool
                 True if the operation was successful, False otherwise
         """
-        self.log(f"scroll_down")
+        self.log("scroll_down")
         height_window = driver.get_window_size()["height"]
         height = script_get_scroll_height(driver)
         position = script_get_scroll_position(driver)
         position_new = position + int(0.5 * height_window)
         position_new = min(position_new, height)
         script_scroll_to(driver, position_new)
-        return bool_yoffset_changed(driver, wait, self.logger, position)
+        return bool_yoffset_changed(
+            driver, wait, self.logger, position, policy=self.wait_policy
+        )
 
+    @instrumented
     def scroll_to(self, driver, position_new, wait=WAIT_NORMAL):
         """
         Scroll to a new position on the page.
@@ -375,11 +750,14 @@ class PageSelene(Page):
             output : bool
                 True if the operation was successful, False otherwise
         """
-        self.log(f"scroll_to")
+        self.log("scroll_to")
         position = script_get_scroll_position(driver)
         script_scroll_to(driver, position_new)
-        return bool_yoffset_changed(driver, wait, self.logger, position)
+        return bool_yoffset_changed(
+            driver, wait, self.logger, position, policy=self.wait_policy
+        )
 
+    @instrumented
     def scroll_to_bottom(self, driver, wait=WAIT_NORMAL):
         """
         Scroll to the bottom of the page.
@@ -396,12 +774,15 @@ class PageSelene(Page):
             output : bool
                 True if the operation was successful, False otherwise
         """
-        self.log(f"scroll_to_bottom")
+        self.log("scroll_to_bottom")
         position = script_get_scroll_position(driver)
         height = script_get_scroll_height(driver)
         script_scroll_to(driver, height)
-        return bool_yoffset_changed(driver, wait, self.logger, position)
+        return bool_yoffset_changed(
+            driver, wait, self.logger, position, policy=self.wait_policy
+        )
 
+    @instrumented
     def expand_scroll_height(self, driver, wait=WAIT_SMALL):
         """
         Keep scrolling to the bottom of the page, as the page dynamically
@@ -419,14 +800,17 @@ class PageSelene(Page):
             output : bool
                 True if the operation was successful, False otherwise
         """
-        self.log(f"expand_scroll_height")
+        self.log("expand_scroll_height")
         while True:
             height = script_get_scroll_height(driver)
             script_scroll_to(driver, height)
-            if not bool_scroll_height_changed(driver, wait, self.logger, height):
+            if not bool_scroll_height_changed(
+                driver, wait, self.logger, height, policy=self.wait_policy
+            ):
                 return
 
     @staticmethod
+    @instrumented
     def screenshot_to_notebook(driver, width=600, height=400, logger=None):
         """
         This wraps core.selenium.tasks.task_screenshot_to_notebook
@@ -447,6 +831,7 @@ class PageSelene(Page):
         task_screenshot_to_notebook(driver, width=width, height=height, logger=logger)
 
     @staticmethod
+    @instrumented
     def screenshot_to_local(driver, dirpath, filestem, logger=None):
         """
         This wraps core.selenium.tasks.screenshot_to_local
@@ -467,6 +852,7 @@ class PageSelene(Page):
         task_screenshot_to_local(driver, dirpath, filestem, logger=logger)
 
     @staticmethod
+    @instrumented
     def close_all_tabs_except_specified_tab(driver, handle_keep, attempts=3):
         """
         Closes all open tabs EXCEPT for the tab given by the specified handle.
@@ -0,0 +1,396 @@
+import json
+import time
+import base64
+import hashlib
+import zipfile
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webelement import WebElement
+
+# The version of the archive format written by RecordingDriver
+ARCHIVE_VERSION = 1
+# The url of a new browser tab, before any navigation
+URL_BLANK = "data:,"
+
+
+class ReplayError(WebDriverException):
+    """Raised by ReplayDriver when asked for something which was not recorded."""
+
+
+def _script_key(script, args):
+    """Identify an executed script by a hash of its source and its arguments."""
+    digest = hashlib.sha1(script.encode()).hexdigest()[:16]
+    return f"{digest}:{json.dumps(_serialise(list(args)), sort_keys=True)}"
+
+
+def _serialise(value):
+    """
+    Convert a script argument or result to JSON: WebElements (which only exist in
+    the live browser) are replaced by a marker, and replay as None.
+    """
+    if isinstance(value, WebElement):
+        return {"__element__": True}
+    if isinstance(value, (list, tuple)):
+        return [_serialise(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _serialise(item) for key, item in value.items()}
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return repr(value)
+
+
+def _deserialise(value):
+    """Convert a recorded script result back, replacing element markers by None."""
+    if isinstance(value, list):
+        return [_deserialise(item) for item in value]
+    if isinstance(value, dict):
+        if value.get("__element__") is True and len(value) == 1:
+            return None
+        return {key: _deserialise(item) for key, item in value.items()}
+    return value
+
+
+class RecordingDriver:
+    """
+    Wrap a live selenium webdriver, recording the session to a compact zip archive
+    which ReplayDriver can replay without a browser:
+        - the page source and url after each navigation (driver.get), and whenever
+          page_source is read
+        - the url whenever it changes (e.g. after a click)
+        - the result of each execute_script/execute_async_script call
+        - a screenshot after each navigation (if screenshots is True), and any
+          screenshots taken
+
+    Page sources are stored once each, compressed. Everything else is passed through
+    to the wrapped driver, so a RecordingDriver can be used wherever a driver is:
+
+        driver = RecordingDriver(get_driver(), "countries.zip")
+        page = PageCountry.from_url(driver, url)
+        records = page.find_all_soup("div", {"class": "country"})
+        stop_driver(driver)  # saves the archive
+    """
+
+    def __init__(self, driver, path, screenshots=False):
+        """
+        Initialise a RecordingDriver instance.
+
+        Parameters
+        ----------
+            driver : selenium.webdriver
+                the live webdriver instance to record
+            path : str
+                the path of the archive to write (see save)
+            screenshots : bool
+                whether to take a screenshot after each navigation
+        """
+        self.driver = driver
+        self.path = path
+        self.screenshots = screenshots
+        self.events = []
+        self._files = {}
+        self._url = None
+        self._start = time.monotonic()
+
+    def __getattr__(self, name):
+        """Pass anything which is not recorded through to the wrapped driver."""
+        return getattr(self.driver, name)
+
+    def _add(self, event):
+        """Add an event to the recording, with the time since the recording started."""
+        event["seconds"] = round(time.monotonic() - self._start, 3)
+        self.events.append(event)
+
+    def _add_file(self, folder, content, extension):
+        """Add a file to the archive once, named by the hash of its content."""
+        name = f"{folder}/{hashlib.sha1(content).hexdigest()}.{extension}"
+        self._files[name] = content
+        return name
+
+    def _record_url(self, url):
+        """Record the url, if it has changed since it was last recorded."""
+        if url != self._url:
+            self._url = url
+            self._add({"type": "url", "url": url})
+
+    def get(self, url):
+        """Navigate to a url, and record the resulting page."""
+        self.driver.get(url)
+        self._url = self.driver.current_url
+        source = self.driver.page_source
+        event = {
+            "type": "navigate",
+            "request": url,
+            "url": self._url,
+            "source": self._add_file("pages", source.encode(), "html"),
+        }
+        if self.screenshots:
+            png = self.driver.get_screenshot_as_png()
+            event["screenshot"] = self._add_file("screenshots", png, "png")
+        self._add(event)
+
+    @property
+    def current_url(self):
+        """The current url, recorded if it has changed."""
+        url = self.driver.current_url
+        self._record_url(url)
+        return url
+
+    @property
+    def page_source(self):
+        """The current page source, recorded."""
+        source = self.driver.page_source
+        self._record_url(self.driver.current_url)
+        self._add(
+            {"type": "source", "source": self._add_file("pages", source.encode(), "html")}
+        )
+        return source
+
+    def execute_script(self, script, *args):
+        """Execute a script, and record its result."""
+        result = self.driver.execute_script(script, *args)
+        self._add(
+            {
+                "type": "script",
+                "key": _script_key(script, args),
+                "result": _serialise(result),
+            }
+        )
+        return result
+
+    def execute_async_script(self, script, *args):
+        """Execute an asynchronous script, and record its result."""
+        result = self.driver.execute_async_script(script, *args)
+        self._add(
+            {
+                "type": "script",
+                "key": _script_key(script, args),
+                "result": _serialise(result),
+            }
+        )
+        return result
+
+    def get_screenshot_as_png(self):
+        """Take a screenshot, and record it."""
+        png = self.driver.get_screenshot_as_png()
+        self._add(
+            {
+                "type": "screenshot",
+                "screenshot": self._add_file("screenshots", png, "png"),
+            }
+        )
+        return png
+
+    def get_screenshot_as_base64(self):
+        """Take a screenshot, and record it."""
+        return base64.b64encode(self.get_screenshot_as_png()).decode()
+
+    def save_screenshot(self, filename):
+        """Take a screenshot, record it, and save it to a file."""
+        with open(filename, "wb") as f:
+            f.write(self.get_screenshot_as_png())
+        return True
+
+    def save(self, path=None):
+        """
+        Write the recording to a zip archive.
+
+        Parameters
+        ----------
+            path : str
+                the path of the archive (default: the path given when recording started)
+        """
+        manifest = {"version": ARCHIVE_VERSION, "events": self.events}
+        with zipfile.ZipFile(path or self.path, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("session.json", json.dumps(manifest))
+            for name, content in self._files.items():
+                compression = zipfile.ZIP_STORED if name.endswith(".png") else None
+                archive.writestr(name, content, compress_type=compression)
+
+    def quit(self):
+        """Save the recording, and quit the wrapped driver."""
+        self.save()
+        self.driver.quit()
+
+    def __enter__(self):
+        """Record within a with block; the recording is saved on exit."""
+        return self
+
+    def __exit__(self, *args):
+        """Save the recording."""
+        self.save()
+
+
+class ReplayDriver:
+    """
+    Replay a session recorded by RecordingDriver, without a browser. It supports what
+    the soup-based workflow needs: navigation (get), current_url, page_source (so
+    PageSelene.from_url, get_page_soup, find_soup and find_all_soup work),
+    execute_script results and screenshots:
+
+        driver = ReplayDriver("countries.zip")
+        page = PageCountry.from_url(driver, url)
+        records = page.find_all_soup("div", {"class": "country"})
+
+    The recording is followed in order, but tolerantly, so that extraction code can
+    change between recording and replay:
+        - get(url) moves to the next navigation to that url (or the first, if there is
+          no later one)
+        - page_source and current_url return the next recorded value, if one was
+          recorded before the next script call, or else the latest value
+        - execute_script returns the result of the next matching recorded call
+
+    Elements cannot be found or interacted with (find_element raises a ReplayError):
+    use the soup methods on the recorded page source instead.
+    """
+
+    def __init__(self, path):
+        """
+        Initialise a ReplayDriver instance.
+
+        Parameters
+        ----------
+            path : str
+                the path of an archive written by RecordingDriver
+        """
+        self.path = path
+        with zipfile.ZipFile(path) as archive:
+            manifest = json.loads(archive.read("session.json"))
+            if manifest["version"] != ARCHIVE_VERSION:
+                raise ReplayError(f"Unsupported archive version: {manifest['version']}")
+            self._files = {
+                name: archive.read(name)
+                for name in archive.namelist()
+                if name != "session.json"
+            }
+        self.events = manifest["events"]
+        self._cursor = 0
+        self._url = URL_BLANK
+        self._source = "<html><head></head><body></body></html>"
+        self._screenshot = None
+        self.current_window_handle = "replay"
+        self.window_handles = ["replay"]
+
+    @property
+    def urls(self):
+        """The urls navigated to in the recording, in order."""
+        return [event["request"] for event in self.events if event["type"] == "navigate"]
+
+    def _next(self, types):
+        """
+        Get the index of the next event of one of types, before the next navigation or
+        script call (None if there is none).
+        """
+        for index in range(self._cursor, len(self.events)):
+            event_type = self.events[index]["type"]
+            if event_type in types:
+                return index
+            if event_type in ("navigate", "script"):
+                return None
+        return None
+
+    def _consume(self, index):
+        """Move past an event, updating the page state from it."""
+        event = self.events[index]
+        if "url" in event:
+            self._url = event["url"]
+        if "source" in event:
+            self._source = self._files[event["source"]].decode()
+        if "screenshot" in event:
+            self._screenshot = self._files[event["screenshot"]]
+        self._cursor = index + 1
+        return event
+
+    def get(self, url):
+        """Move to the next recorded navigation to a url."""
+        navigations = [
+            index
+            for index, event in enumerate(self.events)
+            if event["type"] == "navigate" and event["request"] == url
+        ]
+        if not navigations:
+            raise ReplayError(f"Navigation not recorded: {url}")
+        later = [index for index in navigations if index >= self._cursor]
+        index = later[0] if later else navigations[0]
+        self._screenshot = None
+        # Apply any url/source changes recorded just before the navigation
+        self._consume(index)
+
+    @property
+    def current_url(self):
+        """The recorded url."""
+        index = self._next(("url",))
+        if index is not None:
+            self._consume(index)
+        return self._url
+
+    @property
+    def page_source(self):
+        """The recorded page source."""
+        index = self._next(("source",))
+        if index is not None:
+            self._consume(index)
+        return self._source
+
+    def _segment(self):
+        """Get the range of event indexes of the current navigation."""
+        start = self._cursor
+        while start > 0 and self.events[start - 1]["type"] != "navigate":
+            start -= 1
+        end = self._cursor
+        while end < len(self.events) and self.events[end]["type"] != "navigate":
+            end += 1
+        return max(start - 1, 0), end
+
+    def execute_script(self, script, *args):
+        """Get the result of the next matching recorded script call."""
+        key = _script_key(script, args)
+        start, end = self._segment()
+        for index in range(self._cursor, end):
+            event = self.events[index]
+            if event["type"] == "script" and event["key"] == key:
+                return _deserialise(self._consume(index)["result"])
+        # The script was already replayed (e.g. it is now called more often): repeat
+        # its latest result
+        for index in range(self._cursor - 1, start - 1, -1):
+            event = self.events[index]
+            if event["type"] == "script" and event["key"] == key:
+                return _deserialise(event["result"])
+        raise ReplayError(f"Script call not recorded on {self._url}: {script[:80]!r}")
+
+    execute_async_script = execute_script
+
+    def get_screenshot_as_png(self):
+        """The next recorded screenshot, or the one taken after the navigation."""
+        index = self._next(("screenshot",))
+        if index is not None:
+            self._consume(index)
+        if self._screenshot is None:
+            raise ReplayError(f"Screenshot not recorded on {self._url}")
+        return self._screenshot
+
+    def get_screenshot_as_base64(self):
+        """The recorded screenshot, base64 encoded."""
+        return base64.b64encode(self.get_screenshot_as_png()).decode()
+
+    def save_screenshot(self, filename):
+        """Save the recorded screenshot to a file."""
+        with open(filename, "wb") as f:
+            f.write(self.get_screenshot_as_png())
+        return True
+
+    def find_element(self, *args, **kwargs):
+        """Elements cannot be found in a replay."""
+        raise ReplayError(
+            "Elements cannot be found in a replay: use find_soup/find_all_soup"
+        )
+
+    find_elements = find_element
+
+    def refresh(self):
+        """Replay a refresh: the page stays as recorded."""
+
+    def close(self):
+        """Close the replay (nothing to close)."""
+
+    def quit(self):
+        """Quit the replay (nothing to quit)."""
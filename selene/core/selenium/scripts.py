@@ -1,3 +1,132 @@
+from selenium.common.exceptions import WebDriverException
+
+from selene.core.config import *
+from selene.core.selenium.instrument import instrumented
+
+# JavaScript function which finds all elements matching a selenium By. locator.
+# It is prepended to scripts which need to locate elements in the browser.
+SCRIPT_FIND_ALL = """
+function seleneFindAll(by, identifier, root) {
+    root = root || document;
+    if (by == 'xpath') {
+        let snapshot = document.evaluate(
+            identifier, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+        );
+        let elements = [];
+        for (let i = 0; i < snapshot.snapshotLength; i++) {
+            elements.push(snapshot.snapshotItem(i));
+        }
+        return elements;
+    }
+    if (by == 'link text' || by == 'partial link text') {
+        return Array.from(root.querySelectorAll('a')).filter(function (element) {
+            let text = element.innerText.trim();
+            return by == 'link text' ? text == identifier : text.includes(identifier);
+        });
+    }
+    let selectors = {
+        'css selector': identifier,
+        'id': '[id="' + CSS.escape(identifier) + '"]',
+        'name': '[name="' + CSS.escape(identifier) + '"]',
+        'class name': '.' + CSS.escape(identifier),
+        'tag name': identifier
+    };
+    return Array.from(root.querySelectorAll(selectors[by]));
+}
+"""
+
+
+# JavaScript which waits (asynchronously) for a condition to become true.
+# The condition is checked straight away, then whenever the DOM mutates, the page or an element
+# scrolls, or the url's history changes, with a cheap in-page timer as a backstop for changes
+# that fire no event (e.g. history.pushState). See script_wait_for.
+SCRIPT_WAIT_FOR = """
+let condition = arguments[0];
+let args = arguments[1];
+let timeout = arguments[2];
+let done = arguments[arguments.length - 1];
+
+function isVisible(element) {
+    if (!element || !element.isConnected) {
+        return false;
+    }
+    let style = window.getComputedStyle(element);
+    if (style.visibility == 'hidden' || style.display == 'none' || style.opacity == '0') {
+        return false;
+    }
+    return element.getClientRects().length > 0;
+}
+
+function first(by, identifier, root) {
+    return seleneFindAll(by, identifier, root)[0];
+}
+
+let checks = {
+    present: (by, identifier, root) => first(by, identifier, root) !== undefined,
+    visible: (by, identifier) => isVisible(first(by, identifier)),
+    invisible: (by, identifier) => !isVisible(first(by, identifier)),
+    clickable: function (by, identifier) {
+        let element = first(by, identifier);
+        return isVisible(element) && !element.disabled;
+    },
+    class_contains: (element, string) => (element.getAttribute('class') || '').includes(string),
+    class_does_not_contain: (element, string) => !(element.getAttribute('class') || '').includes(string),
+    text_contains: (element, string) => (element.innerText || '').includes(string),
+    text_does_not_contain: (element, string) => !(element.innerText || '').includes(string),
+    yoffset_changed: (yoffset) => window.pageYOffset != yoffset,
+    scroll_height_changed: (height, element) => (element ? element.scrollHeight : document.body.scrollHeight) != height,
+    scroll_position_changed: (position, element) => (element ? element.scrollTop : window.pageYOffset) != position,
+    url_changed: (url) => document.URL != url,
+    url_to_be: (url) => document.URL == url,
+    url_not_to_be: (url) => document.URL != url,
+    url_contains: (string) => document.URL.includes(string),
+    url_does_not_contain: (string) => !document.URL.includes(string)
+};
+
+function check() {
+    try {
+        return checks[condition].apply(null, args);
+    } catch (e) {
+        return false;
+    }
+}
+
+if (check()) {
+    done(true);
+} else {
+    let finished = false;
+    let observer = new MutationObserver(onEvent);
+    let interval = setInterval(onEvent, 50);
+    let timer = setTimeout(function () { finish(false); }, timeout * 1000);
+    function finish(value) {
+        if (finished) {
+            return;
+        }
+        finished = true;
+        observer.disconnect();
+        clearInterval(interval);
+        clearTimeout(timer);
+        window.removeEventListener('scroll', onEvent, true);
+        window.removeEventListener('popstate', onEvent);
+        window.removeEventListener('hashchange', onEvent);
+        done(value);
+    }
+    function onEvent() {
+        if (check()) {
+            finish(true);
+        }
+    }
+    observer.observe(document.documentElement, {
+        childList: true, subtree: true, attributes: true, characterData: true
+    });
+    window.addEventListener('scroll', onEvent, true);
+    window.addEventListener('popstate', onEvent);
+    window.addEventListener('hashchange', onEvent);
+}
+"""
+
+
+@instrumented
 def script_get_scroll_height(driver, element=None):
     """
     Execute JavaScript to get the scroll height of either:
@@ -24,6 +153,7 @@ def script_get_scroll_height(driver, element=None):
     return driver.execute_script(script, element.element)
 
 
+@instrumented
 def script_get_scroll_position(driver, element=None):
     """
     Execute JavaScript to get the scroll position of either:
@@ -50,6 +180,7 @@ def script_get_scroll_position(driver, element=None):
     return driver.execute_script(script, element.element)
 
 
+@instrumented
 def script_scroll_to(driver, position, element=None):
     """
     Execute JavaScript to scroll to a position on either:
@@ -78,6 +209,7 @@ def script_scroll_to(driver, position, element=None):
     return driver.execute_script(script, element.element, position)
 
 
+@instrumented
 def script_click_element(driver, element):
     """
     Execute JavaScript to click an element
@@ -99,6 +231,7 @@ def script_click_element(driver, element):
     return driver.execute_script(script, element.element)
 
 
+@instrumented
 def script_get_parent(driver, element):
     """
     Execute JavaScript to get the parent of an element
@@ -120,6 +253,216 @@ def script_get_parent(driver, element):
     return driver.execute_script(script, element.element)
 
 
+@instrumented
+def script_open_tab(driver, url):
+    """
+    Execute JavaScript to open a url in a new tab, without switching to it
+    (the driver stays on the current tab).
+
+    Parameters
+    ----------
+        driver : selenium.webdriver
+            a selenium webdriver instance
+        url : str
+            the url to open
+    """
+    script = "window.open(arguments[0], '_blank');"
+    driver.execute_script(script, url)
+
+
+@instrumented
+def script_get_ready_state(driver):
+    """
+    Execute JavaScript to get the loading state of the current tab's document.
+
+    Parameters
+    ----------
+        driver : selenium.webdriver
+            a selenium webdriver instance
+
+    Returns
+    ----------
+        output : str
+            "loading", "interactive" or "complete"
+    """
+    script = "return document.readyState;"
+    return driver.execute_script(script)
+
+
+@instrumented
+def script_get_response_status(driver):
+    """
+    Execute JavaScript to get the http status of the current tab's document, from the
+    Navigation Timing API.
+
+    Parameters
+    ----------
+        driver : selenium.webdriver
+            a selenium webdriver instance
+
+    Returns
+    ----------
+        output : int
+            the status, or None if the browser does not report it
+    """
+    script = """
+    var entries = performance.getEntriesByType('navigation');
+    var status = entries.length ? entries[0].responseStatus : 0;
+    return status ? status : null;
+    """
+    return driver.execute_script(script)
+
+
+@instrumented
+def script_get_element_properties(driver, elements):
+    """
+    Execute JavaScript to get the location, size and text of a list of elements
+    in a single call.
+
+    The location and size are rounded in the same way as
+    selenium.webdriver.remote.webelement.WebElement.location and .size.
+
+    Parameters
+    ----------
+        driver : selenium.webdriver
+            a selenium webdriver instance
+        elements : list
+            a list of core.selenium.element.ElementSelene objects
+
+    Returns
+    ----------
+        output : list
+            one dict per element, with keys "location", "size" and "text"
+    """
+    script = """
+    return arguments[0].map(function (element) {
+        let rect = element.getBoundingClientRect();
+        return {
+            location: {
+                x: Math.round(rect.left + window.pageXOffset),
+                y: Math.round(rect.top + window.pageYOffset)
+            },
+            size: {height: Math.trunc(rect.height), width: Math.trunc(rect.width)},
+            text: (element.innerText || "").trim()
+        };
+    });
+    """
+    return driver.execute_script(script, [element.element for element in elements])
+
+
+@instrumented
+def script_extract_all(driver, by, identifier, fields):
+    """
+    Execute JavaScript to find all elements using a By. selector and an identifier,
+    and extract the requested fields from each of them, in a single call.
+
+    Each field is one of:
+        - "text": the element's visible text
+        - "html": the element's outerHTML
+        - "rect": the element's bounding rectangle (x and y relative to the document)
+        - "attrs": a dict of all the element's attributes
+        - anything else: the value of the attribute with that name (or None)
+
+    Parameters
+    ----------
+        driver : selenium.webdriver
+            a selenium webdriver instance
+        by : selenium.webdriver.common.by.By
+            see https://selenium-python.readthedocs.io/locating-elements.html
+        identifier : str
+            see https://selenium-python.readthedocs.io/locating-elements.html
+        fields : list
+            the fields to extract
+
+    Returns
+    ----------
+        output : list
+            one dict per element found, keyed by field
+    """
+    script = SCRIPT_FIND_ALL + """
+    let fields = arguments[2];
+    return seleneFindAll(arguments[0], arguments[1]).map(function (element) {
+        let record = {};
+        for (let field of fields) {
+            if (field == 'text') {
+                record[field] = (element.innerText || '').trim();
+            } else if (field == 'html') {
+                record[field] = element.outerHTML;
+            } else if (field == 'rect') {
+                let rect = element.getBoundingClientRect();
+                record[field] = {
+                    x: rect.left + window.pageXOffset,
+                    y: rect.top + window.pageYOffset,
+                    width: rect.width,
+                    height: rect.height
+                };
+            } else if (field == 'attrs') {
+                record[field] = {};
+                for (let attr of element.attributes) {
+                    record[field][attr.name] = attr.value;
+                }
+            } else {
+                record[field] = element.getAttribute(field);
+            }
+        }
+        return record;
+    });
+    """
+    return driver.execute_script(script, by, identifier, list(fields))
+
+
+@instrumented
+def script_wait_for(driver, condition, args, wait):
+    """
+    Execute asynchronous JavaScript which blocks, in a single webdriver call, until either:
+        - a condition is true
+        - a number of seconds has passed
+
+    Rather than polling from python, the condition is re-checked in the browser whenever
+    the page changes (see SCRIPT_WAIT_FOR for the supported conditions).
+    The driver's script timeout is left as it was.
+
+    Parameters
+    ----------
+        driver : selenium.webdriver
+            a selenium webdriver instance
+        condition : str
+            the name of the condition e.g. "visible", "url_contains"
+        args : list
+            the arguments of the condition (WebElements are passed through to JavaScript)
+        wait : int
+            a number of seconds to wait before giving up
+
+    Returns
+    ----------
+        output : bool or None
+            True if the condition became true, False if it timed out, and None if the
+            script could not run to completion (e.g. the page navigated away), in which
+            case the caller should fall back to polling.
+    """
+    timeout = max(wait + WAIT_SMALL, WAIT_NORMAL)
+    try:
+        # The script gives up after wait seconds itself; the driver's script timeout is
+        # only raised (for this call) if it would cut the script short
+        previous = driver.timeouts.script
+        if previous is not None and previous < timeout:
+            driver.set_script_timeout(timeout)
+        else:
+            previous = None
+        try:
+            return bool(
+                driver.execute_async_script(
+                    SCRIPT_FIND_ALL + SCRIPT_WAIT_FOR, condition, list(args), wait
+                )
+            )
+        finally:
+            if previous is not None:
+                driver.set_script_timeout(previous)
+    except WebDriverException:
+        return None
+
+
+@instrumented
 def script_expand_all_by_class_name(
     driver, identifier, attribute, indicator, clickable=None
 ):
@@ -1,5 +1,6 @@
 from IPython.display import Image, display
 import os
+import time
 from datetime import datetime
 
 from selenium import webdriver
@@ -8,15 +9,27 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.wait import WebDriverWait
 from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.remote.webelement import WebElement
 
 from selene.core.config import *
+from selene.core.logger import log_enabled
+from selene.core.utils import get_rate_limiter
+from selene.core.selenium.instrument import instrumented
 from selene.core.selenium.scripts import *
 from selene.core.selenium.conditions import *
 
 import random
 
 
-def task_navigate_to_url(driver, url, string="", wait=WAIT_NORMAL, logger=None):
+def _root(parent):
+    """Get the element to search within, for JavaScript (None for the whole page)."""
+    return parent if isinstance(parent, WebElement) else None
+
+
+@instrumented
+def task_navigate_to_url(
+    driver, url, string="", wait=WAIT_NORMAL, logger=None, policy=None, limiter=None
+):
     """
     Navigate to a new url and check that the url is correct.
 
@@ -36,38 +49,65 @@ def task_navigate_to_url(driver, url, string="", wait=WAIT_NORMAL, logger=None):
             a number of seconds to wait before raising a TimeoutException
         logger : logging.Logger
             a logger instance (see core.logger.py)
+        policy : core.config.WaitPolicy
+            how to wait (default: see core.config.get_wait_policy)
+        limiter : core.utils.RateLimiter
+            the rate limiter (or core.utils.AdaptiveController) to wait for before
+            navigating, and report the page's status and load time to (default: the
+            shared one, see core.utils.get_rate_limiter)
 
     Returns
     ----------
         output : bool
             True if the operation was successful, False otherwise
     """
-    if logger:
-        logger.debug(f'task_navigate_to_url: {"; ".join([url, string])}')
+    if log_enabled(logger):
+        logger.debug("task_navigate_to_url: %s; %s", url, string)
     # Get the original url
     url_prev = driver.current_url
     # If the original url is the same as the expected url, return True
-    if not bool_url_unexpected(driver, WAIT_TINY, logger, url):
+    if not bool_url_unexpected(driver, WAIT_TINY, logger, url, policy=policy):
         return True
+    # Wait for the domain's rate limit, if there is one
+    limiter = limiter or get_rate_limiter()
+    if limiter is not None:
+        limiter.acquire(url)
     # Navigate to new url, catching Webdriver failures
+    start = time.perf_counter()
+    latency, status = None, None
     try:
         driver.get(url)
+        latency = time.perf_counter() - start
+        if limiter is not None and limiter.uses_feedback:
+            try:
+                status = script_get_response_status(driver)
+            except WebDriverException:
+                pass
     except WebDriverException as e:
         if logger:
             logger.exception(f"{e}")
         return False
+    finally:
+        # Report the response to the rate limiter, so that it can adapt; always, so
+        # that a failed navigation (of any kind) does not hold the domain's slot
+        if limiter is not None:
+            error = latency is None
+            if error:
+                latency = time.perf_counter() - start
+            limiter.release(url, status=status, latency=latency, error=error)
     # Check that the url has changed
-    if not bool_url_changed(driver, wait, logger, url_prev):
+    if not bool_url_changed(driver, wait, logger, url_prev, policy=policy):
         return False
     # Check that the url is correct
     if string == "":
-        return bool_url_expected(driver, wait, logger, url)
+        return bool_url_expected(driver, wait, logger, url, policy=policy)
     else:
-        return bool_url_contains(driver, wait, logger, string)
+        return bool_url_contains(driver, wait, logger, string, policy=policy)
 
 
+@instrumented
 def task_navigate_to_url_in_new_tab(
-    driver, url, string="", wait=WAIT_NORMAL, logger=None
+    driver, url, string="", wait=WAIT_NORMAL, logger=None, policy=None
 ):
     """
     Navigate to a new url in a new tab, and check that the url is correct.
@@ -88,14 +128,16 @@ def task_navigate_to_url_in_new_tab(
             a number of seconds to wait before raising a TimeoutException
         logger : logging.Logger
             a logger instance (see core.logger.py)
+        policy : core.config.WaitPolicy
+            how to wait (default: see core.config.get_wait_policy)
 
     Returns
     ----------
         output : bool
             True if the operation was successful, False otherwise
     """
-    if logger:
-        logger.debug(f'task_navigate_to_url_in_new_tab: {"; ".join([url, string])}')
+    if log_enabled(logger):
+        logger.debug("task_navigate_to_url_in_new_tab: %s; %s", url, string)
     # Get the current number of handles
     handles_prev = driver.window_handles
     n_handles_prev = len(handles_prev)
@@ -107,7 +149,7 @@ def task_navigate_to_url_in_new_tab(
             logger.exception(f"{e}")
         return False
     # Check that new handle has been created
-    if not bool_new_handle(driver, n_handles_prev, WAIT_SMALL, logger):
+    if not bool_new_handle(driver, n_handles_prev, WAIT_SMALL, logger, policy=policy):
         return False
     # Switch to new tab
     handle_new = [x for x in driver.window_handles if x not in handles_prev][0]
@@ -118,17 +160,18 @@ def task_navigate_to_url_in_new_tab(
             logger.exception(f"{e}")
         return False
     # Check that the current handle is now changed
-    if not bool_correct_handle(driver, handle_new, WAIT_SMALL, logger):
+    if not bool_correct_handle(driver, handle_new, WAIT_SMALL, logger, policy=policy):
         return False
     # Check that the url is corrects
     if string == "":
-        return bool_url_expected(driver, wait, logger, url)
+        return bool_url_expected(driver, wait, logger, url, policy=policy)
     else:
-        return bool_url_contains(driver, wait, logger, string)
+        return bool_url_contains(driver, wait, logger, string, policy=policy)
 
 
+@instrumented
 def task_close_tab_return_to_url_and_handle(
-    driver, url, handle, string="", wait=WAIT_NORMAL, logger=None
+    driver, url, handle, string="", wait=WAIT_NORMAL, logger=None, policy=None
 ):
     """
     Close the current tab and check that the driver is back at the expected handle and url.
@@ -151,16 +194,16 @@ def task_close_tab_return_to_url_and_handle(
             a number of seconds to wait before raising a TimeoutException
         logger : logging.Logger
             a logger instance (see core.logger.py)
+        policy : core.config.WaitPolicy
+            how to wait (default: see core.config.get_wait_policy)
 
     Returns
     ----------
         output : bool
             True if the operation was successful, False otherwise
     """
-    if logger:
-        logger.debug(
-            f'task_close_tab_return_to_url_and_handle: {"; ".join([url, string])}'
-        )
+    if log_enabled(logger):
+        logger.debug("task_close_tab_return_to_url_and_handle: %s; %s", url, string)
     # Close tab
     try:
         driver.execute_script(f"window.close();")
@@ -176,16 +219,17 @@ def task_close_tab_return_to_url_and_handle(
             logger.exception(f"{e}")
         return False
     # Check that the handle is the expected one
-    if not bool_correct_handle(driver, handle, WAIT_SMALL, logger):
+    if not bool_correct_handle(driver, handle, WAIT_SMALL, logger, policy=policy):
         return False
     # Check that the url is the expected one
     if string == "":
-        return bool_url_expected(driver, wait, logger, url)
+        return bool_url_expected(driver, wait, logger, url, policy=policy)
     else:
-        return bool_url_contains(driver, wait, logger, string)
+        return bool_url_contains(driver, wait, logger, string, policy=policy)
 
 
-def task_find(parent, by, identifier, wait=WAIT_NORMAL, logger=None):
+@instrumented
+def task_find(parent, by, identifier, wait=WAIT_NORMAL, logger=None, policy=None):
     """
     Find an element using a By. selector and an identifier.
 
@@ -211,26 +255,37 @@ def task_find(parent, by, identifier, wait=WAIT_NORMAL, logger=None):
             a number of seconds to wait before raising a TimeoutException
         logger : logging.Logger
             a logger instance (see core.logger.py)
+        policy : core.config.WaitPolicy
+            how to wait (default: see core.config.get_wait_policy)
 
     Returns
     ----------
         output : [None, selenium.webdriver.remote.webelement.WebElement]
             returns the webelement if it is found; None otherwise
     """
-    if logger:
-        logger.debug(f"task_find: {identifier}")
+    if log_enabled(logger):
+        logger.debug("task_find: %s", identifier)
     try:
-        return WebDriverWait(parent, wait).until(
+        element = wait_until(
+            parent,
+            wait,
             EC.presence_of_element_located((by, identifier)),
-            message=f"Element not found: {identifier}",
+            f"Element not found: {identifier}",
+            observer=("present", [by, identifier, _root(parent)]),
+            policy=policy,
         )
     except TimeoutException as e:
         if logger:
             logger.exception(e)
         return None
+    if element is True:
+        # the observer engine only reports that the element is present
+        return parent.find_element(by, identifier)
+    return element
 
 
-def task_find_all(parent, by, identifier, wait=WAIT_NORMAL, logger=None):
+@instrumented
+def task_find_all(parent, by, identifier, wait=WAIT_NORMAL, logger=None, policy=None):
     """
     Find a list of elements using a By. selector and an identifier.
 
@@ -256,18 +311,24 @@ def task_find_all(parent, by, identifier, wait=WAIT_NORMAL, logger=None):
             a number of seconds to wait before raising a TimeoutException
         logger : logging.Logger
             a logger instance (see core.logger.py)
+        policy : core.config.WaitPolicy
+            how to wait (default: see core.config.get_wait_policy)
 
     Returns
     ----------
         output : list
             returns a list of webelements if one or more are found; an empty list otherwise
     """
-    if logger:
-        logger.debug(f"task_find_all: {identifier}")
+    if log_enabled(logger):
+        logger.debug("task_find_all: %s", identifier)
     try:
-        WebDriverWait(parent, wait).until(
+        wait_until(
+            parent,
+            wait,
             EC.presence_of_element_located((by, identifier)),
-            message=f"No elements found: {identifier}",
+            f"No elements found: {identifier}",
+            observer=("present", [by, identifier, _root(parent)]),
+            policy=policy,
         )
     except TimeoutException as e:
         if logger:
@@ -276,7 +337,8 @@ def task_find_all(parent, by, identifier, wait=WAIT_NORMAL, logger=None):
     return parent.find_elements(by, identifier)
 
 
-def task_click(driver, by, identifier, wait=WAIT_NORMAL, logger=None):
+@instrumented
+def task_click(driver, by, identifier, wait=WAIT_NORMAL, logger=None, policy=None):
     """
     Click an element using a By. selector and an identifier.
 
@@ -295,20 +357,25 @@ def task_click(driver, by, identifier, wait=WAIT_NORMAL, logger=None):
             a number of seconds to wait before raising a TimeoutException
         logger : logging.Logger
             a logger instance (see core.logger.py)
+        policy : core.config.WaitPolicy
+            how to wait (default: see core.config.get_wait_policy)
 
     Returns
     ----------
         output : bool
             True if the operation was successful, False otherwise
     """
-    if logger:
-        logger.debug(f"task_click: {identifier}")
-    if not bool_clickable(driver, by, identifier, wait=wait, logger=logger):
+    if log_enabled(logger):
+        logger.debug("task_click: %s", identifier)
+    if not bool_clickable(
+        driver, by, identifier, wait=wait, logger=logger, policy=policy
+    ):
         return False
-    element = task_find(driver, by, identifier, wait=wait, logger=logger)
+    element = task_find(driver, by, identifier, wait=wait, logger=logger, policy=policy)
     return script_click_element(driver, element)
 
 
+@instrumented
 def task_screenshot_to_notebook(driver, width, height, logger):
     """
     Display a browser screenshot in a Jupyter notebook.
@@ -324,12 +391,13 @@ def task_screenshot_to_notebook(driver, width, height, logger):
         logger : logging.Logger
             a logger instance (see core.logger.py)
     """
-    if logger:
-        logger.debug(f"screenshot_to_notebook")
+    if log_enabled(logger):
+        logger.debug("screenshot_to_notebook")
     image = Image(driver.get_screenshot_as_png(), width=width, height=height)
     display(image)
 
 
+@instrumented
 def task_screenshot_to_local(driver, dirpath, filestem, logger):
     """
     Save a browser screenshot to a local directory
@@ -345,8 +413,8 @@ def task_screenshot_to_local(driver, dirpath, filestem, logger):
         logger : logging.Logger
             a logger instance (see core.logger.py)
     """
-    if logger:
-        logger.debug(f'task_screenshot_to_local: {"; ".join([dirpath, filestem])}')
+    if log_enabled(logger):
+        logger.debug("task_screenshot_to_local: %s; %s", dirpath, filestem)
     if not os.path.exists(dirpath):
         os.makedirs(dirpath)
     str_datetime = datetime.now().strftime("%Y%m%d%H%M%S%f")
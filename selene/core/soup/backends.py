@@ -0,0 +1,581 @@
+import re
+import time
+import functools
+import threading
+from collections import OrderedDict
+import lxml.html
+from lxml import etree
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.filter import ElementFilter
+
+from selene.core.config import *
+
+# Attributes which BeautifulSoup splits into a list of values
+MULTI_VALUED_ATTRIBUTES = {
+    "class",
+    "rel",
+    "rev",
+    "accept-charset",
+    "headers",
+    "accesskey",
+}
+
+
+class SelectorCache:
+    """
+    A least-recently-used cache of compiled selectors, with per-selector statistics.
+
+    Each backend compiles the criteria of find and find_all (e.g. ("div", {"class": "x"}))
+    into a matcher: a SoupStrainer for bs4, or an XPath for lxml. The cache means repeated
+    queries, e.g. the same find on thousands of pages, compile their selector only once.
+    For profiling, it counts how often each selector was compiled and used, and the total
+    time spent searching with it (see get_selector_stats). A selector's statistics are
+    dropped when it is evicted, so they are bounded by maxsize too.
+
+    Compiling is locked, but the cache hit path is not, to keep it cheap: with several
+    threads, the statistics are approximate.
+    """
+
+    def __init__(self, maxsize=1024):
+        """
+        Initialise a SelectorCache instance.
+
+        Parameters
+        ----------
+            maxsize : int
+                the maximum number of compiled selectors to keep
+        """
+        self.maxsize = maxsize
+        self._cache = OrderedDict()
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, compile):
+        """
+        Get a compiled selector, compiling (and caching) it if needed.
+
+        Parameters
+        ----------
+            key : tuple
+                the selector's key (see selector_key), or None if it cannot be cached
+            compile : function
+                compiles the selector
+
+        Returns
+        ----------
+            output :
+                the compiled selector
+        """
+        if key is None:
+            return compile()
+        try:
+            compiled = self._cache[key]
+        except KeyError:
+            compiled = compile()
+            with self._lock:
+                self._cache[key] = compiled
+                self._stats.setdefault(key, [0, 0, 0.0])[0] += 1
+                while len(self._cache) > self.maxsize:
+                    evicted, _ = self._cache.popitem(last=False)
+                    self._stats.pop(evicted, None)
+            return compiled
+        try:
+            self._cache.move_to_end(key)
+        except KeyError:
+            # evicted by another thread
+            pass
+        return compiled
+
+    def record(self, key, seconds):
+        """Record a search with a selector, and how long it took."""
+        if key is None:
+            return
+        stats = self._stats.get(key)
+        if stats is None:
+            # evicted (or cleared) since it was compiled
+            return
+        stats[1] += 1
+        stats[2] += seconds
+
+    def stats(self):
+        """
+        Get the statistics of every selector used, slowest first.
+
+        Returns
+        ----------
+            output : list
+                a dict for each selector: its backend and criteria, the number of
+                compilations (cache misses) and cache hits, the number of searches and their
+                total time in seconds
+        """
+        with self._lock:
+            items = list(self._stats.items())
+        output = [
+            {
+                "backend": key[0],
+                "selector": key[1:],
+                "misses": misses,
+                "hits": max(calls - misses, 0),
+                "calls": calls,
+                "seconds": seconds,
+            }
+            for key, (misses, calls, seconds) in items
+        ]
+        return sorted(output, key=lambda stats: stats["seconds"], reverse=True)
+
+    def clear(self):
+        """Empty the cache and reset the statistics."""
+        with self._lock:
+            self._cache.clear()
+            self._stats.clear()
+
+    def __len__(self):
+        """The number of compiled selectors in the cache."""
+        return len(self._cache)
+
+
+# The cache shared by all backends
+SELECTOR_CACHE = SelectorCache()
+
+
+def _freeze(value):
+    """Make a filter value hashable (raising TypeError if it cannot be)."""
+    if isinstance(value, dict):
+        return tuple((key, _freeze(v)) for key, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    hash(value)
+    return value
+
+
+def selector_key(backend, *args):
+    """
+    Get the cache key of find/find_all criteria, or None if they are not hashable.
+
+    Parameters
+    ----------
+        backend : str
+            the backend's name
+        args :
+            the criteria
+
+    Returns
+    ----------
+        key : tuple
+            the key
+    """
+    key = (backend, *(tuple(arg.items()) if type(arg) is dict else arg for arg in args))
+    try:
+        hash(key)
+        return key
+    except TypeError:
+        pass
+    try:
+        return (backend, *(_freeze(arg) for arg in args))
+    except TypeError:
+        return None
+
+
+def get_selector_stats():
+    """
+    Get the statistics of every selector used by find and find_all (see SelectorCache.stats).
+
+    Returns
+    ----------
+        output : list
+            a dict for each selector, slowest first
+    """
+    return SELECTOR_CACHE.stats()
+
+
+class BackendSoup:
+    """
+    A parser backend which builds BeautifulSoup trees (using the lxml parser).
+
+    This is the default backend. find and find_all accept anything that
+    BeautifulSoup's find and find_all accept.
+    """
+
+    name = "bs4"
+
+    @staticmethod
+    def parse(html, parse_only=None):
+        """
+        Parse an html document.
+
+        If parse_only is given (see get_parse_only), only the matching elements
+        (and their descendants) are built into the tree.
+        """
+        if parse_only is None:
+            return BeautifulSoup(html, "lxml")
+        name, attrs = get_parse_only(parse_only)
+        attrs = {
+            key: _match_class(value) if key == "class" else value
+            for key, value in attrs.items()
+        }
+        return BeautifulSoup(html, "lxml", parse_only=SoupStrainer(name, attrs))
+
+    @staticmethod
+    def parse_fragment(html):
+        """Parse an html fragment, returning its (wrapping) body element."""
+        return BeautifulSoup(html, "lxml").body
+
+    @classmethod
+    def find(cls, node, name=None, attrs={}, recursive=True, **kwargs):
+        """Find the first element within node matching the criteria, or None."""
+        key, matcher = cls._matcher(name, attrs, kwargs)
+        start = time.perf_counter()
+        element = node.find(matcher, recursive=recursive)
+        SELECTOR_CACHE.record(key, time.perf_counter() - start)
+        return element
+
+    @classmethod
+    def find_all(cls, node, name=None, attrs={}, recursive=True, limit=None, **kwargs):
+        """Find all elements within node matching the criteria."""
+        key, matcher = cls._matcher(name, attrs, kwargs)
+        start = time.perf_counter()
+        elements = node.find_all(matcher, recursive=recursive, limit=limit)
+        SELECTOR_CACHE.record(key, time.perf_counter() - start)
+        return elements
+
+    @classmethod
+    def _matcher(cls, name, attrs, kwargs):
+        """
+        Get the (cached) SoupStrainer for find criteria. A tag name on its own is returned
+        as it is, since BeautifulSoup has a faster search for that (it is still cached,
+        so that its searches are counted in the statistics).
+        """
+        if isinstance(name, ElementFilter):
+            return None, name
+        key = selector_key(cls.name, name, attrs, kwargs)
+        if not attrs and not kwargs:
+            return key, SELECTOR_CACHE.get(key, lambda: name)
+        return key, SELECTOR_CACHE.get(key, lambda: SoupStrainer(name, attrs, **kwargs))
+
+    @staticmethod
+    def attrs(node):
+        """Get the attributes of an element (the element's own dict)."""
+        return node.attrs
+
+    @staticmethod
+    def text(node):
+        """Get the text of an element and all its descendants."""
+        return node.get_text()
+
+    @staticmethod
+    def has_attr(node, name):
+        """Check whether an element has an attribute."""
+        return node.has_attr(name)
+
+    @staticmethod
+    def get(node, name, default=None):
+        """Get the value of an element's attribute."""
+        return node.get(name, default)
+
+
+class BackendLxml:
+    """
+    A parser backend which builds raw lxml.html trees.
+
+    This is several times faster, and uses much less memory, than BeautifulSoup.
+    find and find_all accept the common BeautifulSoup filters, which are compiled
+    once to XPath expressions:
+        - name: a tag name, a list of tag names, or None/True for any tag
+        - attrs: a dict of attribute values (a str, a list of str, True to require
+          the attribute or None/False to forbid it), or a str to match the class
+        - class_ and other keyword arguments, treated as attributes
+        - recursive and limit
+
+    The "class" attribute is matched like BeautifulSoup: a single class name matches
+    any element with that class, and a value containing spaces must match the whole
+    attribute.
+    """
+
+    name = "lxml"
+
+    @staticmethod
+    def parse(html, parse_only=None):
+        """
+        Parse an html document.
+
+        If parse_only is given (see get_parse_only), only the matching elements
+        (and their descendants) are kept: they are moved into a new, small document,
+        and the rest of the tree is freed. lxml cannot skip building the rest of the
+        tree, so this saves memory rather than parse time.
+        """
+        if not html or not html.strip():
+            html = "<html></html>"
+        try:
+            root = lxml.html.document_fromstring(html)
+        except ValueError:
+            # str input with an xml encoding declaration must be parsed as bytes
+            root = lxml.html.document_fromstring(html.encode())
+        if parse_only is None:
+            return root
+        name, attrs = get_parse_only(parse_only)
+        elements = compile_xpath(name, attrs)(root)
+        kept = set(elements)
+        document = lxml.html.document_fromstring("<html><body></body></html>")
+        for element in elements:
+            if any(ancestor in kept for ancestor in element.iterancestors()):
+                continue
+            element.tail = None
+            document.body.append(element)
+        return document
+
+    @classmethod
+    def parse_fragment(cls, html):
+        """Parse an html fragment, returning its (wrapping) body element."""
+        return cls.parse(f"<html><body>{html}</body></html>").body
+
+    @classmethod
+    def find(cls, node, name=None, attrs={}, recursive=True, **kwargs):
+        """Find the first element within node matching the criteria, or None."""
+        key, xpath = cls._matcher(name, attrs, recursive, True, kwargs)
+        start = time.perf_counter()
+        elements = xpath(node)
+        SELECTOR_CACHE.record(key, time.perf_counter() - start)
+        return elements[0] if elements else None
+
+    @classmethod
+    def find_all(cls, node, name=None, attrs={}, recursive=True, limit=None, **kwargs):
+        """Find all elements within node matching the criteria."""
+        key, xpath = cls._matcher(name, attrs, recursive, False, kwargs)
+        start = time.perf_counter()
+        elements = xpath(node)
+        SELECTOR_CACHE.record(key, time.perf_counter() - start)
+        return elements[:limit] if limit else elements
+
+    @classmethod
+    def _matcher(cls, name, attrs, recursive, first, kwargs):
+        """Get the (cached) compiled XPath for find criteria."""
+        key = selector_key(cls.name, name, attrs, recursive, first, kwargs)
+        return key, SELECTOR_CACHE.get(
+            key, lambda: compile_xpath(name, attrs, recursive, first, **kwargs)
+        )
+
+    @classmethod
+    def attrs(cls, node):
+        """
+        Get the attributes of an element (as a new dict). As with BeautifulSoup,
+        multi-valued attributes such as "class" are split into lists.
+        """
+        return {name: cls._value(name, value) for name, value in node.attrib.items()}
+
+    @staticmethod
+    def text(node):
+        """Get the text of an element and all its descendants."""
+        return node.text_content()
+
+    @staticmethod
+    def has_attr(node, name):
+        """Check whether an element has an attribute."""
+        return name in node.attrib
+
+    @classmethod
+    def get(cls, node, name, default=None):
+        """Get the value of an element's attribute."""
+        value = node.get(name)
+        return default if value is None else cls._value(name, value)
+
+    @staticmethod
+    def _value(name, value):
+        """Split the value of a multi-valued attribute into a list."""
+        if name in MULTI_VALUED_ATTRIBUTES:
+            return value.split()
+        return value
+
+
+BACKENDS = {BackendSoup.name: BackendSoup, BackendLxml.name: BackendLxml}
+
+
+def get_backend(name=None):
+    """
+    Get a parser backend by name.
+
+    Parameters
+    ----------
+        name : str
+            "bs4" or "lxml" (default: core.config.SOUP_BACKEND)
+
+    Returns
+    ----------
+        backend : BackendSoup or BackendLxml
+            the backend
+    """
+    if name is None:
+        name = SOUP_BACKEND
+    try:
+        return BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown soup backend: {name}; expected one of {list(BACKENDS)}"
+        )
+
+
+def get_backend_for(node):
+    """
+    Get the parser backend which built a tree or element.
+
+    Parameters
+    ----------
+        node :
+            a BeautifulSoup or lxml element
+
+    Returns
+    ----------
+        backend : BackendSoup or BackendLxml
+            the backend
+    """
+    if isinstance(node, etree._Element):
+        return BackendLxml
+    return BackendSoup
+
+
+def get_parse_only(parse_only):
+    """
+    Unpack a parse_only target, which restricts parsing to matching elements.
+
+    A target is given in the same way as the arguments of find: either a tag name,
+    or a (name, attrs) tuple e.g. ("div", {"class": "country"}).
+
+    Parameters
+    ----------
+        parse_only : str or tuple
+            the parse_only target
+
+    Returns
+    ----------
+        output : tuple
+            the tag name and a dict of attributes
+    """
+    if isinstance(parse_only, (tuple, list)):
+        name, attrs = parse_only
+        return name, dict(attrs or {})
+    return parse_only, {}
+
+
+def _match_class(value):
+    """
+    Wrap a class filter for a SoupStrainer, so that it matches a single class name
+    in the same way as find (a SoupStrainer sees the unsplit class attribute).
+    """
+    if not isinstance(value, str) or " " in value.strip():
+        return value
+
+    def match(classes):
+        """Check whether an element's class attribute includes the class name."""
+        if classes is None:
+            return False
+        if isinstance(classes, str):
+            classes = classes.split()
+        return value in classes
+
+    return match
+
+
+# Element and attribute names which can be used in an XPath expression as they are
+XML_NAME = re.compile(r"[A-Za-z_][\w.-]*")
+
+
+def _xpath_literal(value):
+    """Quote a string for use in an XPath expression."""
+    if "'" not in value:
+        return f"'{value}'"
+    if '"' not in value:
+        return f'"{value}"'
+    parts = value.split("'")
+    return "concat(" + ', "\'", '.join(f"'{part}'" for part in parts) + ")"
+
+
+def _xpath_name(axis, name):
+    """
+    Build an XPath step matching an element or attribute name. Names which are not
+    plain XML names are compared as quoted strings, so they cannot change the query.
+    """
+    if XML_NAME.fullmatch(name):
+        return f"{axis}{name}"
+    return f"{axis}*[name()={_xpath_literal(name)}]"
+
+
+def _xpath_attribute(key, value):
+    """Build an XPath predicate matching one attribute filter."""
+    attribute = _xpath_name("@", key)
+    if value is True:
+        return attribute
+    if value is None or value is False:
+        return f"not({attribute})"
+    if isinstance(value, (list, tuple)):
+        return "(" + " or ".join(_xpath_attribute(key, v) for v in value) + ")"
+    if not isinstance(value, str):
+        raise TypeError(f"Unsupported filter for the lxml soup backend: {key}={value!r}")
+    if key == "class" and " " not in value.strip():
+        return f"contains(concat(' ', normalize-space(@class), ' '), {_xpath_literal(f' {value} ')})"
+    if key == "class":
+        return f"normalize-space(@class)={_xpath_literal(' '.join(value.split()))}"
+    return f"{attribute}={_xpath_literal(value)}"
+
+
+def build_xpath(name=None, attrs={}, recursive=True, **kwargs):
+    """
+    Build an XPath expression from BeautifulSoup-style find criteria.
+
+    Parameters
+    ----------
+        name : str or list
+            the tag name(s) to match (None or True to match any tag)
+        attrs : dict or str
+            the attributes to match (a str matches the class)
+        recursive : bool
+            whether to search all descendants, or only children
+        kwargs :
+            more attributes to match (class_ matches the class)
+
+    Returns
+    ----------
+        xpath : str
+            the XPath expression
+    """
+    unsupported = {"string", "text"} & set(kwargs)
+    if unsupported:
+        raise TypeError(f"Unsupported argument for the lxml soup backend: {unsupported}")
+    if isinstance(attrs, str):
+        attrs = {"class": attrs}
+    attrs = dict(attrs or {})
+    for key, value in kwargs.items():
+        attrs["class" if key == "class_" else key] = value
+    axis = "descendant::" if recursive else "child::"
+    if name is None or name is True:
+        xpath = f"{axis}*"
+    elif isinstance(name, str):
+        xpath = _xpath_name(axis, name)
+    else:
+        xpath = f"{axis}*[" + " or ".join(_xpath_name("self::", n) for n in name) + "]"
+    for key, value in attrs.items():
+        xpath += f"[{_xpath_attribute(key, value)}]"
+    return xpath
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_xpath(xpath):
+    """Compile an XPath expression, caching the result."""
+    return etree.XPath(xpath)
+
+
+def compile_xpath(name=None, attrs={}, recursive=True, first=False, **kwargs):
+    """
+    Get a compiled lxml.etree.XPath from BeautifulSoup-style find criteria
+    (see build_xpath). Compiled expressions are cached.
+
+    Parameters
+    ----------
+        first : bool
+            whether to match only the first element (so the search can stop early)
+
+    Returns
+    ----------
+        xpath : lxml.etree.XPath
+            the compiled XPath
+    """
+    xpath = build_xpath(name, attrs, recursive, **kwargs)
+    return _compile_xpath(f"{xpath}[1]" if first else xpath)
@@ -0,0 +1,391 @@
+import os
+import gzip
+import json
+import time
+import sqlite3
+import threading
+from collections import namedtuple
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# A cached response (see HttpCache.get): expires is a unix time, after which the
+# response must be revalidated with the server before it is used
+CacheEntry = namedtuple(
+    "CacheEntry", ["url", "status", "headers", "content", "expires", "size"]
+)
+
+# Headers which describe the body as it was sent, not as it is stored (decoded)
+HEADERS_NOT_STORED = ("content-encoding", "content-length", "transfer-encoding")
+# Headers which a 304 Not Modified response updates (RFC 9111 section 4.3.4)
+HEADERS_REVALIDATED = ("cache-control", "date", "etag", "expires", "last-modified")
+
+
+def parse_cache_control(value):
+    """
+    Parse a Cache-Control header.
+
+    Parameters
+    ----------
+        value : str
+            the header value, e.g. "public, max-age=3600"
+
+    Returns
+    ----------
+        output : dict
+            the directives, lowercase, with their values (None if they have none)
+    """
+    output = {}
+    for directive in value.split(","):
+        name, _, argument = directive.strip().partition("=")
+        if name:
+            output[name.lower()] = argument.strip('"') if argument else None
+    return output
+
+
+def get_expires(headers, now, default_ttl=0):
+    """
+    Get the time until which a response is fresh, from its Cache-Control and
+    Expires headers.
+
+    Parameters
+    ----------
+        headers : dict
+            the response headers
+        now : float
+            the time the response was received
+        default_ttl : float
+            the number of seconds a response without max-age or Expires is fresh for
+
+    Returns
+    ----------
+        expires : float
+            a unix time, or None if the response must not be stored (no-store)
+    """
+    cache_control = parse_cache_control(headers.get("Cache-Control", ""))
+    if "no-store" in cache_control:
+        return None
+    if "no-cache" in cache_control:
+        return now
+    if cache_control.get("max-age") is not None:
+        try:
+            return now + int(cache_control["max-age"])
+        except ValueError:
+            return now
+    if headers.get("Expires"):
+        try:
+            return parsedate_to_datetime(headers["Expires"]).timestamp()
+        except (TypeError, ValueError):
+            return now
+    return now + default_ttl
+
+
+class HttpCache:
+    """
+    A disk-backed cache of http responses, for HttpSession (see core.soup.session).
+
+    Responses are stored gzip-compressed in a sqlite database, keyed by url. A cached
+    response is used without a request while it is fresh (Cache-Control max-age or
+    Expires, else default_ttl), and otherwise revalidated with a conditional request
+    (If-None-Match/If-Modified-Since), so a page which has not changed costs a 304
+    rather than its body. Once the stored bodies exceed max_bytes, the least recently
+    used responses are evicted.
+
+    Usage:
+
+        session = HttpSession(cache=HttpCache("/notebooks/selene_cache"))
+        set_session(session)
+        page = PageSoup.from_request(url)
+
+    The cache can be shared between threads (and, through sqlite, between processes).
+    """
+
+    def __init__(self, dirpath, max_bytes=2**30, default_ttl=0, filename="cache.sqlite"):
+        """
+        Initialise an HttpCache instance.
+
+        Parameters
+        ----------
+            dirpath : str
+                the path to a directory to store the cache in (created if needed)
+            max_bytes : int
+                the maximum total size of the stored (compressed) bodies
+            default_ttl : float
+                the number of seconds for which responses without Cache-Control max-age
+                or Expires are used without revalidation (e.g. a day, for development
+                reruns). With the default 0 they are always revalidated.
+            filename : str
+                the name of the sqlite database file
+        """
+        os.makedirs(dirpath, exist_ok=True)
+        self.path = os.path.join(dirpath, filename)
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        with self._db:
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    url TEXT PRIMARY KEY,
+                    status INTEGER,
+                    headers TEXT,
+                    body BLOB,
+                    size INTEGER,
+                    expires REAL,
+                    accessed REAL
+                )
+                """)
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)"
+            )
+        self.n_hits = 0
+        self.n_misses = 0
+        self.n_stale = 0
+        self.n_revalidated = 0
+        self.n_evicted = 0
+
+    def get(self, url):
+        """
+        Get a cached response (see is_fresh), counting a hit, miss or stale lookup.
+
+        Parameters
+        ----------
+            url : str
+                the url of the response
+
+        Returns
+        ----------
+            entry : CacheEntry
+                the cached response, or None if the url is not cached
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, headers, body, expires, size FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                self.n_misses += 1
+                return None
+            now = time.time()
+            with self._db:
+                self._db.execute(
+                    "UPDATE responses SET accessed = ? WHERE url = ?", (now, url)
+                )
+            status, headers, body, expires, size = row
+            if expires > now:
+                self.n_hits += 1
+            else:
+                self.n_stale += 1
+        headers = CaseInsensitiveDict(json.loads(headers))
+        return CacheEntry(url, status, headers, gzip.decompress(body), expires, size)
+
+    def is_fresh(self, entry):
+        """
+        Parameters
+        ----------
+            entry : CacheEntry
+                a cached response
+
+        Returns
+        ----------
+            output : bool
+                whether the response can be used without revalidation
+        """
+        return entry.expires > time.time()
+
+    @staticmethod
+    def get_conditional_headers(entry):
+        """
+        Get the headers which revalidate a cached response.
+
+        Parameters
+        ----------
+            entry : CacheEntry
+                a cached response
+
+        Returns
+        ----------
+            headers : dict
+                If-None-Match and/or If-Modified-Since (empty if the response has no
+                ETag or Last-Modified)
+        """
+        headers = {}
+        if entry.headers.get("ETag"):
+            headers["If-None-Match"] = entry.headers["ETag"]
+        if entry.headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = entry.headers["Last-Modified"]
+        return headers
+
+    def store(self, url, response):
+        """
+        Store a response, if it is cacheable: a 200 response which is not no-store,
+        and which is either fresh for a while or can be revalidated.
+
+        Parameters
+        ----------
+            url : str
+                the url of the response
+            response : requests.Response
+                the response
+
+        Returns
+        ----------
+            output : bool
+                whether the response was stored
+        """
+        now = time.time()
+        expires = get_expires(response.headers, now, self.default_ttl)
+        if response.status_code != 200 or expires is None:
+            return False
+        if response.headers.get("Vary", "").strip() == "*":
+            return False
+        revalidatable = "ETag" in response.headers or "Last-Modified" in response.headers
+        if expires <= now and not revalidatable:
+            return False
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name.lower() not in HEADERS_NOT_STORED
+        }
+        body = gzip.compress(response.content, compresslevel=6)
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, 200, json.dumps(headers), body, len(body), expires, now),
+            )
+            self._evict()
+        return True
+
+    def revalidate(self, entry, response):
+        """
+        Update a cached response from a 304 Not Modified response to a conditional
+        request, and get the cached response.
+
+        Parameters
+        ----------
+            entry : CacheEntry
+                the cached response
+            response : requests.Response
+                the 304 response
+
+        Returns
+        ----------
+            response : requests.Response
+                the cached response, with its headers updated
+        """
+        headers = CaseInsensitiveDict(entry.headers)
+        for name in HEADERS_REVALIDATED:
+            if name in response.headers:
+                headers[name] = response.headers[name]
+        now = time.time()
+        expires = get_expires(headers, now, self.default_ttl)
+        with self._lock, self._db:
+            self._db.execute(
+                "UPDATE responses SET headers = ?, expires = ?, accessed = ? WHERE url = ?",
+                (json.dumps(dict(headers)), expires or now, now, entry.url),
+            )
+            self.n_revalidated += 1
+        entry = entry._replace(headers=headers, expires=expires or now)
+        return self.to_response(entry, response.elapsed)
+
+    def to_response(self, entry, elapsed=None):
+        """
+        Build a requests.Response from a cached response. Its from_cache attribute is True.
+
+        Parameters
+        ----------
+            entry : CacheEntry
+                the cached response
+            elapsed : datetime.timedelta
+                the time taken to revalidate the response, if it was
+
+        Returns
+        ----------
+            response : requests.Response
+                the response
+        """
+        response = requests.Response()
+        response.url = entry.url
+        response.status_code = entry.status
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response._content = entry.content
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.reason = "OK"
+        if elapsed is not None:
+            response.elapsed = elapsed
+        response.from_cache = True
+        return response
+
+    def _evict(self):
+        """Delete the least recently used responses until the cache fits in max_bytes."""
+        total = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute("SELECT url, size FROM responses ORDER BY accessed")
+        evict = []
+        for url, size in rows:
+            if total <= self.max_bytes:
+                break
+            evict.append((url,))
+            total -= size
+        self._db.executemany("DELETE FROM responses WHERE url = ?", evict)
+        self.n_evicted += len(evict)
+
+    def delete(self, url):
+        """
+        Delete a cached response.
+
+        Parameters
+        ----------
+            url : str
+                the url of the response
+        """
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM responses WHERE url = ?", (url,))
+
+    def clear(self):
+        """Delete all cached responses."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM responses")
+
+    def stats(self):
+        """
+        Get the cache statistics.
+
+        Returns
+        ----------
+            output : dict
+                the number of responses stored and their total (compressed) size, and
+                the number of lookups which found a fresh response (hits), no response
+                (misses) or a stale response (stale; revalidated if the server then
+                replied 304 Not Modified), and of evictions
+        """
+        with self._lock:
+            count, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+            return {
+                "responses": count,
+                "bytes": size,
+                "hits": self.n_hits,
+                "misses": self.n_misses,
+                "stale": self.n_stale,
+                "revalidated": self.n_revalidated,
+                "evicted": self.n_evicted,
+            }
+
+    def close(self):
+        """Close the database."""
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        """Use the cache as a context manager; close() is called on exit."""
+        return self
+
+    def __exit__(self, *args):
+        """Close the database."""
+        self.close()
@@ -1,12 +1,15 @@
-from bs4 import BeautifulSoup
-
 from selene.core.config import *
 from selene.core.element import Element
+from selene.core.logger import log_enabled
+from selene.core.soup.backends import get_backend, get_backend_for
 
 
 class ElementSoup(Element):
     """
     An element class to wrap beautiful soup functionality for finding and returning attributes from soup objects.
+
+    The element can come from either parser backend (see core.soup.backends):
+    a BeautifulSoup element or an lxml element.
     """
 
     def __init__(self, element, logger=None):
@@ -20,11 +23,28 @@ class ElementSoup(Element):
                 a logger instance (see core.logger.py)
         """
         Element.__init__(self, element, logger)
-        self.attrs = element.attrs
-        self.text = element.get_text()
+        self.backend = get_backend_for(element)
+        self.attrs = self.backend.attrs(element)
+        self.text = self.backend.text(element)
+
+    @classmethod
+    def from_found(cls, element, logger=None):
+        """
+        Initialise an ElementSoup instance from an element returned by a find or find_all,
+        making sure that its attributes contain "href" (None if the element has no href).
+
+        Parameters
+        ----------
+            element : html object
+            logger : logging.Logger
+                a logger instance (see core.logger.py)
+        """
+        element_soup = cls(element, logger)
+        element_soup.attrs.setdefault("href", None)
+        return element_soup
 
     @classmethod
-    def from_selene(cls, element_selene, logger=None):
+    def from_selene(cls, element_selene, logger=None, backend=None):
         """
         Initialise an ElementSoup instance from an ElementSelene object.
         Allow interchangeability between selenium-based on soup-based elements
@@ -34,10 +54,12 @@ class ElementSoup(Element):
             element_selene : selene.core.selenium.ElementSelene
             logger : logging.Logger
                 a logger instance (see core.logger.py)
+            backend : str
+                the parser backend, "bs4" or "lxml" (default: core.config.SOUP_BACKEND)
         """
         html = element_selene.element.get_attribute("innerHTML")
-        soup = BeautifulSoup(html, "lxml")
-        return cls(element=soup.body, logger=logger)
+        body = get_backend(backend).parse_fragment(html)
+        return cls(element=body, logger=logger)
 
     def find(self, *args, **kwargs):
         """
@@ -53,13 +75,12 @@ class ElementSoup(Element):
         ----------
             el : ElementSoup
         """
-        self.log(f'find: {"; ".join([str(arg) for arg in [*args]])}')
-        el = self.element.find(*args, **kwargs)
+        if log_enabled(self.logger):
+            self.log("find: %s", "DEBUG", "; ".join([str(arg) for arg in args]))
+        el = self.backend.find(self.element, *args, **kwargs)
         if el is None:
             return ElementSoupBlank()
-        if not el.has_attr("href"):
-            el.attrs["href"] = None
-        return ElementSoup(el, self.logger)
+        return ElementSoup.from_found(el, self.logger)
 
     def find_all(self, *args, **kwargs):
         """
@@ -76,13 +97,10 @@ class ElementSoup(Element):
             els : list
                 all  ElementSoup that meet criteria
         """
-        self.log(f'find_all: {"; ".join([str(arg) for arg in [*args]])}')
-        els = []
-        for el in self.element.find_all(*args, **kwargs):
-            if not el.has_attr("href"):
-                el.attrs["href"] = None
-            els.append(ElementSoup(el, self.logger))
-        return els
+        if log_enabled(self.logger):
+            self.log("find_all: %s", "DEBUG", "; ".join([str(arg) for arg in args]))
+        els = self.backend.find_all(self.element, *args, **kwargs)
+        return [ElementSoup.from_found(el, self.logger) for el in els]
 
     def get_text(self):
         """return text of object"""
@@ -90,11 +108,11 @@ class ElementSoup(Element):
 
     def has_attr(self, *args, **kwargs):
         """check whether element has a given attribute"""
-        return self.element.has_attr(*args, **kwargs)
+        return self.backend.has_attr(self.element, *args, **kwargs)
 
     def get(self, *args, **kwargs):
         """return a given attribute of the element"""
-        return self.element.get(*args, **kwargs)
+        return self.backend.get(self.element, *args, **kwargs)
 
 
 class ElementSoupBlank(ElementSoup):
@@ -105,6 +123,7 @@ class ElementSoupBlank(ElementSoup):
     def __init__(self):
         """Initialise a ElementSoupBlank object"""
         self.element = None
+        self.backend = None
         self.attrs = {"href": None, "id": None, "aria-label": None}
         self.find = lambda *x: ElementSoupBlank()
         self.find_all = lambda *x: []
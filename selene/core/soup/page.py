@@ -1,13 +1,33 @@
 import os
 import time
+import asyncio
+import itertools
 import requests
 from datetime import datetime
-from bs4 import BeautifulSoup
 
 from ..page import *
 from ..config import *
+from ..logger import log_enabled
 
 from .element import ElementSoup, ElementSoupBlank
+from .backends import get_backend, get_backend_for
+from .session import get_session
+from ..schema import get_schema
+
+
+def get_request_headers():
+    """
+    Get headers for an http request, with a random user agent from core.config.USER_AGENTS
+
+    Returns
+    ----------
+        headers : dict
+            the request headers
+    """
+    return {
+        "User-Agent": str(np.random.choice(USER_AGENTS)),
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
+    }
 
 
 class PageSoup(Page):
@@ -18,9 +38,25 @@ class PageSoup(Page):
     you can instantiate either a PageSoup or a PageSelene object, and the .find and .find_all function work in
     similar ways.
 
+    The html can be parsed with either parser backend (see core.soup.backends). Subclasses can
+    choose one by setting the soup_backend class attribute to "bs4" or "lxml" (default:
+    core.config.SOUP_BACKEND).
+
+    Subclasses which only read part of a page can set the parse_only class attribute to a
+    tag name or a (name, attrs) tuple, e.g. ("div", {"class": "country"}), so that only the
+    matching elements are kept when the html is parsed (see core.soup.backends.get_parse_only).
+
+    Subclasses can declare the data to extract from a page by setting the schema class
+    attribute to a dict of core.schema.Field instances, by name; extract then reads every
+    field in a single pass over the tree.
+
     Inherits selene.core.page.Page
     """
 
+    soup_backend = None
+    parse_only = None
+    schema = None
+
     def __init__(self, url, soup, logger=None):
         """
         Initialise a PageSoup instance from existing, parsed soup.
@@ -35,6 +71,7 @@ class PageSoup(Page):
         """
         Page.__init__(self, url, logger)
         self.soup = soup
+        self.backend = get_backend_for(soup)
 
     @classmethod
     def from_soup(cls, url, soup, logger=None):
@@ -52,7 +89,7 @@ class PageSoup(Page):
         return cls(url, soup, logger)
 
     @classmethod
-    def from_html(cls, url, html, logger=None):
+    def from_html(cls, url, html, logger=None, backend=None, parse_only=None):
         """
         Initialise a PageSoup instance from existing html source code.
 
@@ -64,12 +101,18 @@ class PageSoup(Page):
                 the html code to parse
             logger : logging.Logger
                 a logger instance (see core.logger.py)
+            backend : str
+                the parser backend, "bs4" or "lxml" (default: the soup_backend class attribute)
+            parse_only : str or tuple
+                only keep the matching elements (default: the parse_only class attribute)
         """
-        soup = BeautifulSoup(html, "lxml")
+        if parse_only is None:
+            parse_only = cls.parse_only
+        soup = get_backend(backend or cls.soup_backend).parse(html, parse_only)
         return cls(url, soup, logger)
 
     @classmethod
-    def from_request(cls, url, logger=None):
+    def from_request(cls, url, logger=None, session=None, timeout=None):
         """
         Initialise a PageSoup instance by parsing a request to a web url.
 
@@ -79,16 +122,116 @@ class PageSoup(Page):
                 the url of the page
             logger : logging.Logger
                 a logger instance (see core.logger.py)
+            session : core.soup.session.HttpSession
+                the session to send the request with (default: the shared session,
+                see core.soup.session.get_session)
+            timeout : tuple
+                the (connect, read) timeouts in seconds (default: the session's timeout)
+        """
+        if session is None:
+            session = get_session()
+        response = session.get(url, headers=get_request_headers(), timeout=timeout)
+        page = response.content.decode()
+        return cls.from_html(url, page, logger)
+
+    @classmethod
+    async def from_requests_async(
+        cls, urls, concurrency=100, per_host_limit=8, logger=None
+    ):
+        """
+        Initialise PageSoup instances by requesting many web urls concurrently.
+
+        This is an asynchronous generator which yields pages in the order in which
+        their requests complete (not the order of urls). Connections are pooled and
+        kept alive, so each host only pays for a handshake once per connection.
+        Urls which fail to load are logged and skipped.
+
+        Requires aiohttp (pip install selene[async]).
+
+        Usage:
+
+            async for page in PageSoup.from_requests_async(urls):
+                ...
+
+        Parameters
+        ----------
+            urls : iterable
+                the urls of the pages (consumed as requests complete)
+            concurrency : int
+                the maximum number of requests in flight (and of pending tasks)
+            per_host_limit : int
+                the maximum number of requests in flight to any one host
+            logger : logging.Logger
+                a logger instance (see core.logger.py)
+        """
+        try:
+            import aiohttp
+        except ImportError as e:
+            raise ImportError(
+                "from_requests_async requires aiohttp: pip install selene[async]"
+            ) from e
+
+        timeout = aiohttp.ClientTimeout(
+            sock_connect=TIMEOUT_CONNECT, sock_read=TIMEOUT_READ
+        )
+        connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=per_host_limit)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+
+            async def fetch(url):
+                """Request a url, returning (url, html), or (url, None) if it failed."""
+                try:
+                    async with session.get(
+                        url, headers=get_request_headers()
+                    ) as response:
+                        response.raise_for_status()
+                        # Decode with the response's charset (or a detected one)
+                        return url, await response.text(errors="replace")
+                except (
+                    aiohttp.ClientError,
+                    asyncio.TimeoutError,
+                    LookupError,
+                    UnicodeDecodeError,
+                ) as e:
+                    if logger:
+                        logger.exception(f"from_requests_async: {url}: {e!r}")
+                    return url, None
+
+            # Keep at most concurrency requests pending, taking urls as they finish,
+            # rather than creating a task for every url at once
+            urls = iter(urls)
+            pending = set()
+            try:
+                while True:
+                    for url in itertools.islice(urls, concurrency - len(pending)):
+                        pending.add(asyncio.ensure_future(fetch(url)))
+                    if not pending:
+                        return
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        url, html = task.result()
+                        if html is not None:
+                            yield cls.from_html(url, html, logger)
+            finally:
+                for task in pending:
+                    task.cancel()
+
+    def extract(self, as_record=False):
+        """
+        Extract every field of the class's schema from the page (see core.schema.Schema).
+
+        Parameters
+        ----------
+            as_record : bool
+                whether to return a namedtuple, rather than a dict
+
+        Returns
+        ----------
+            output : dict or namedtuple
+                the value of each field
         """
-        user_agent = str(np.random.choice(USER_AGENTS))
-        headers = {
-            "User-Agent": user_agent,
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
-        }
-        with requests.Session() as session:
-            page = session.get(url, headers=headers).content.decode()
-            soup = BeautifulSoup(page, "lxml")
-            return cls(url, soup, logger)
+        return get_schema(type(self)).extract(self.soup, as_record)
 
     def find(self, *args, **kwargs):
         """
@@ -104,13 +247,12 @@ class PageSoup(Page):
         ----------
             el : ElementSoup
         """
-        self.log(f'find: {"; ".join([str(arg) for arg in [*args]])}')
-        el = self.soup.find(*args, **kwargs)
+        if log_enabled(self.logger):
+            self.log("find: %s", "DEBUG", "; ".join([str(arg) for arg in args]))
+        el = self.backend.find(self.soup, *args, **kwargs)
         if el is None:
             return ElementSoupBlank()
-        if not el.has_attr("href"):
-            el.attrs["href"] = None
-        return ElementSoup(el, self.logger)
+        return ElementSoup.from_found(el, self.logger)
 
     def find_all(self, *args, **kwargs):
         """
@@ -127,10 +269,7 @@ class PageSoup(Page):
             els : list
                 all  ElementSoup that meet criteria
         """
-        self.log(f'find_all: {"; ".join([str(arg) for arg in [*args]])}')
-        els = []
-        for el in self.soup.find_all(*args, **kwargs):
-            if not el.has_attr("href"):
-                el.attrs["href"] = None
-            els.append(ElementSoup(el, self.logger))
-        return els
+        if log_enabled(self.logger):
+            self.log("find_all: %s", "DEBUG", "; ".join([str(arg) for arg in args]))
+        els = self.backend.find_all(self.soup, *args, **kwargs)
+        return [ElementSoup.from_found(el, self.logger) for el in els]
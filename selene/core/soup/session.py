@@ -0,0 +1,290 @@
+import time
+import threading
+import requests
+from importlib.util import find_spec
+from requests.models import PreparedRequest
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from selene.core.config import *
+from selene.core.logger import log_enabled
+from selene.core.utils import get_rate_limiter, parse_retry_after
+
+# urllib3 only decodes brotli-compressed responses if a brotli package is installed
+if any(find_spec(name) is not None for name in ("brotli", "brotlicffi")):
+    ACCEPT_ENCODING = "gzip, deflate, br"
+else:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+
+class HttpSession:
+    """
+    A long-lived http session for PageSoup.from_request.
+
+    Wraps a requests.Session with:
+        - a connection pool per host, so connections are kept alive and reused
+        - connect and read timeouts, so a slow host cannot hang a worker forever
+        - retries with exponential backoff (honouring Retry-After) on connection
+          errors and 429/5xx responses
+        - gzip/deflate (and brotli, if installed) decoding
+        - request and connection pool statistics
+        - optionally, a disk-backed response cache with conditional revalidation
+          (see core.soup.cache.HttpCache)
+        - optionally, per-domain rate limiting (see core.utils.RateLimiter)
+
+    Retries are made by urllib3 within a single get, after waiting for the rate
+    limiter once: they are spaced by the backoff (and Retry-After), but not limited,
+    so one get can send up to retries + 1 requests. Set retries=0 to have every
+    request limited (e.g. to retry through an AdaptiveController instead).
+
+    The session can be shared between threads: the underlying urllib3 connection
+    pools are thread-safe.
+    """
+
+    def __init__(
+        self,
+        pool_connections=10,
+        pool_maxsize=10,
+        retries=3,
+        backoff_factor=0.5,
+        timeout=(TIMEOUT_CONNECT, TIMEOUT_READ),
+        logger=None,
+        cache=None,
+        limiter=None,
+    ):
+        """
+        Initialise an HttpSession instance.
+
+        Parameters
+        ----------
+            pool_connections : int
+                the number of hosts to keep connection pools for
+            pool_maxsize : int
+                the maximum number of connections to keep alive per host
+            retries : int
+                the number of times to retry a failed request
+            backoff_factor : float
+                the exponential backoff factor between retries, in seconds
+            timeout : tuple
+                the (connect, read) timeouts in seconds
+            logger : logging.Logger
+                a logger instance (see core.logger.py)
+            cache : core.soup.cache.HttpCache
+                a cache to serve GET responses from, and store them in (default: none)
+            limiter : core.utils.RateLimiter
+                the rate limiter (or core.utils.AdaptiveController) to wait for before
+                each request (default: the shared one, see core.utils.get_rate_limiter)
+        """
+        self.timeout = timeout
+        self.logger = logger
+        self.cache = cache
+        self.limiter = limiter
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=("GET", "HEAD"),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+        self.session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+        self._lock = threading.Lock()
+        self.n_requests = 0
+        self.n_errors = 0
+        self.n_retries = 0
+        self.n_bytes = 0
+        self.n_cached = 0
+        self.seconds = 0.0
+
+    def get(self, url, headers=None, timeout=None, **kwargs):
+        """
+        Send a GET request.
+
+        If the session has a cache, a fresh cached response is returned without a
+        request, and a stale one is revalidated with a conditional request. Responses
+        served from the cache have a from_cache attribute set to True. Requests (but
+        not responses served from the cache) wait for the rate limiter, if there is one,
+        and report their status, latency and any Retry-After header to it (see
+        core.utils.AdaptiveController).
+
+        Parameters
+        ----------
+            url : str
+                the url to request
+            headers : dict
+                extra headers for this request
+            timeout : tuple
+                the (connect, read) timeouts in seconds (default: the session's timeout)
+            kwargs :
+                passed through to requests.Session.get
+
+        Returns
+        ----------
+            response : requests.Response
+                the response
+        """
+        if log_enabled(self.logger):
+            self.logger.debug("HttpSession.get: %s", url)
+        entry = None
+        if self.cache is not None:
+            key = get_cache_key(url, kwargs.get("params"))
+            entry = self.cache.get(key)
+            if entry is not None and self.cache.is_fresh(entry):
+                with self._lock:
+                    self.n_cached += 1
+                return self.cache.to_response(entry)
+            if entry is not None:
+                headers = {**(headers or {}), **self.cache.get_conditional_headers(entry)}
+        limiter = self.limiter or get_rate_limiter()
+        if limiter is not None:
+            limiter.acquire(url)
+        start = time.perf_counter()
+        # What to report to the rate limiter: a failure, unless the request completes
+        feedback = {"error": True}
+        try:
+            response = self.session.get(
+                url, headers=headers, timeout=timeout or self.timeout, **kwargs
+            )
+        except requests.RequestException:
+            with self._lock:
+                self.n_requests += 1
+                self.n_errors += 1
+                self.seconds += time.perf_counter() - start
+            raise
+        else:
+            retries = response.raw.retries if response.raw is not None else None
+            with self._lock:
+                self.n_requests += 1
+                self.n_retries += len(retries.history) if retries else 0
+                self.n_bytes += len(response.content)
+                self.seconds += time.perf_counter() - start
+            # A throttled request which succeeded on retry still reports the throttling
+            statuses = [r.status for r in retries.history if r.status] if retries else []
+            feedback = {
+                "status": statuses[0] if statuses else response.status_code,
+                "latency": response.elapsed.total_seconds(),
+                "retry_after": parse_retry_after(response.headers.get("Retry-After")),
+            }
+        finally:
+            # Always release, so that a failed request does not hold the domain's slot
+            if limiter is not None:
+                feedback.setdefault("latency", time.perf_counter() - start)
+                limiter.release(url, **feedback)
+        if self.cache is not None:
+            if response.status_code == 304 and entry is not None:
+                response = self.cache.revalidate(entry, response)
+            else:
+                self.cache.store(key, response)
+        return response
+
+    def stats(self):
+        """
+        Get the request and connection pool statistics.
+
+        Returns
+        ----------
+            output : dict
+                request counts and timings, the number of responses served from the
+                cache without a request (see also HttpCache.stats), and for each host:
+                the number of connections opened and requests sent, and the pool's
+                maximum size
+        """
+        pools = {}
+        container = self.adapter.poolmanager.pools
+        for key in container.keys():
+            pool = container.get(key)
+            if pool is None:
+                continue
+            pools[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                "connections": pool.num_connections,
+                "requests": pool.num_requests,
+                "maxsize": pool.pool.maxsize if pool.pool is not None else None,
+            }
+        with self._lock:
+            return {
+                "requests": self.n_requests,
+                "errors": self.n_errors,
+                "retries": self.n_retries,
+                "bytes": self.n_bytes,
+                "cached": self.n_cached,
+                "seconds": self.seconds,
+                "pools": pools,
+            }
+
+    def close(self):
+        """Close the session and all of its pooled connections."""
+        self.session.close()
+
+    def __enter__(self):
+        """Use the session as a context manager; close() is called on exit."""
+        return self
+
+    def __exit__(self, *args):
+        """Close the session."""
+        self.close()
+
+
+def get_cache_key(url, params=None):
+    """
+    Get the key of a GET request in the response cache: its full url.
+
+    Parameters
+    ----------
+        url : str
+            the url to request
+        params : dict
+            the query parameters of the request, if any
+
+    Returns
+    ----------
+        key : str
+            the url, with the query parameters
+    """
+    if not params:
+        return url
+    request = PreparedRequest()
+    request.prepare_url(url, params)
+    return request.url
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Get the shared HttpSession used by PageSoup.from_request, creating it if needed.
+
+    Returns
+    ----------
+        session : HttpSession
+            the shared session
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = HttpSession()
+        return _session
+
+
+def set_session(session):
+    """
+    Replace the shared HttpSession used by PageSoup.from_request
+    (e.g. to change its pool size or timeouts).
+
+    Parameters
+    ----------
+        session : HttpSession
+            the new shared session
+    """
+    global _session
+    with _session_lock:
+        _session = session
@@ -1,12 +1,24 @@
 import re
+import json
 import time
 import functools
+import threading
 import numpy as np
+from email.utils import parsedate_to_datetime
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode, quote
+
+from selene.core.logger import log_enabled
+
+# File locking, to share RateLimiter state between processes (not available on Windows)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
 
 
 def get_domain(url):
     """
-    Get the domain of a web url. Pretty rudimentary - there might be edge cases.
+    Get the domain of a web url: its network location (host, and port if given).
 
     Parameters
     ----------
@@ -16,12 +28,99 @@ def get_domain(url):
     Returns
     ----------
         domain : str
-            the domain
+            the domain, or "" if the url has none (e.g. about:blank or data: urls)
     """
-    if "https" in url:
-        return url.split("https://")[1].split("/")[0]
-    else:
-        return url.split("http://")[1].split("/")[0]
+    return urlsplit(url).netloc
+
+
+# Query parameters which only track where a visitor came from (see canonicalise_url)
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|gclid|fbclid|msclkid|mc_cid|mc_eid|_ga)$")
+# The ports dropped from canonical urls
+DEFAULT_PORTS = {"http": 80, "https": 443}
+# Characters which never need to be percent-encoded (RFC 3986 section 2.3)
+UNRESERVED = frozenset(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~"
+)
+
+
+def _normalise_escape(match):
+    """Decode a percent-escape of an unreserved character, else uppercase it."""
+    char = chr(int(match.group(0)[1:], 16))
+    return char if char in UNRESERVED else match.group(0).upper()
+
+
+def _remove_dot_segments(path):
+    """Resolve the . and .. segments of a url path (RFC 3986 section 5.2.4)."""
+    segments = path.split("/")
+    output = []
+    for segment in segments:
+        if segment == ".":
+            continue
+        if segment == "..":
+            if len(output) > 1:
+                output.pop()
+            continue
+        output.append(segment)
+    if segments[-1] in (".", ".."):
+        output.append("")
+    return "/".join(output)
+
+
+def canonicalise_url(url, base=None, keep_fragment=False, drop_params=TRACKING_PARAMS):
+    """
+    Normalise a url, so that different spellings of the same page compare equal:
+        - relative urls are resolved against base
+        - the scheme and host are lowercased, and default ports are dropped
+        - . and .. path segments are resolved, and an empty path becomes /
+        - percent-escapes are uppercased, and unreserved characters decoded
+        - query parameters are sorted, and tracking parameters (utm_* etc.) dropped
+        - the fragment is dropped
+
+    e.g. canonicalise_url("HTTP://Example.com:80/a/./b/../c?utm_source=x&b=2&a=1#top")
+    is "http://example.com/a/c?a=1&b=2"
+
+    Parameters
+    ----------
+        url : str
+            the url
+        base : str
+            the url of the page the url was found on, if it may be relative
+        keep_fragment : bool
+            whether to keep the fragment (e.g. for single-page apps which route on it)
+        drop_params : re.Pattern
+            the query parameters to drop (None to keep them all)
+
+    Returns
+    ----------
+        url : str
+            the canonical url
+    """
+    if base is not None:
+        url = urljoin(base, url.strip())
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc
+    if parts.hostname is not None:
+        netloc = parts.hostname.rstrip(".")
+        try:
+            port = parts.port
+        except ValueError:
+            port = None
+        if port is not None and port != DEFAULT_PORTS.get(scheme):
+            netloc = f"{netloc}:{port}"
+        if parts.username is not None:
+            userinfo = parts.username
+            if parts.password is not None:
+                userinfo = f"{userinfo}:{parts.password}"
+            netloc = f"{userinfo}@{netloc}"
+    path = re.sub(r"%[0-9a-fA-F]{2}", _normalise_escape, parts.path)
+    path = _remove_dot_segments(path) or "/"
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    if drop_params is not None:
+        params = [(key, value) for key, value in params if not drop_params.match(key)]
+    query = urlencode(sorted(params), quote_via=quote)
+    fragment = parts.fragment if keep_fragment else ""
+    return urlunsplit((scheme, netloc, path, query, fragment))
 
 
 def random_wait(_func=None, *, seconds_min=0, seconds_max=1):
@@ -40,8 +139,8 @@ def random_wait(_func=None, *, seconds_min=0, seconds_max=1):
             seconds_sleep = np.round(
                 np.random.uniform(low=seconds_min, high=seconds_max), 3
             )
-            if args[0].logger:
-                args[0].logger.debug(f"waiting for {seconds_sleep} seconds")
+            if log_enabled(args[0].logger):
+                args[0].logger.debug("waiting for %s seconds", seconds_sleep)
             time.sleep(seconds_sleep)
             return func(*args, **kwargs)
 
@@ -53,6 +152,578 @@ def random_wait(_func=None, *, seconds_min=0, seconds_max=1):
         return decorator_random_wait(_func)
 
 
+class RateLimiter:
+    """
+    A per-domain token bucket rate limiter, shared by all the threads (and, with a
+    path, processes) of a crawl.
+
+    Each domain has a bucket of up to burst tokens, refilled at qps tokens per second.
+    A request takes a token, and only waits if the bucket is empty: a domain which has
+    not been hit recently is requested straight away, while a busy one is held to qps
+    however many workers are requesting it. Waiting requests reserve their token, so
+    they are served in turn.
+
+    Usage:
+
+        set_rate_limiter(RateLimiter(qps=2, burst=4, per_domain={"www.gov.uk": (5, 10)}))
+        page = PageSoup.from_request(url)  # waits if needed (see HttpSession.get)
+
+        @rate_limit
+        def scrape(url): ...
+    """
+
+    # Whether release uses the response, so callers know whether to find its status
+    uses_feedback = False
+
+    def __init__(self, qps=1.0, burst=1, per_domain=None, path=None, logger=None):
+        """
+        Initialise a RateLimiter instance.
+
+        Parameters
+        ----------
+            qps : float
+                the sustained number of requests per second allowed per domain
+            burst : int
+                the number of requests a domain can be sent at once after being idle
+            per_domain : dict
+                (qps, burst) for domains which need a different limit, by domain
+            path : str
+                a file in which to keep the buckets, to share them between processes
+                (which must use the same path); requires fcntl (not on Windows)
+            logger : logging.Logger
+                a logger instance (see core.logger.py)
+        """
+        if path is not None and fcntl is None:
+            raise NotImplementedError(
+                "Sharing a RateLimiter between processes requires fcntl"
+            )
+        self.qps = qps
+        self.burst = burst
+        self.per_domain = dict(per_domain or {})
+        self.path = path
+        self.logger = logger
+        self._lock = threading.Lock()
+        # [tokens, time last refilled] per domain
+        self._buckets = {}
+        # [requests, requests which waited, seconds waited] per domain
+        self._stats = {}
+
+    def get_limit(self, domain):
+        """
+        Parameters
+        ----------
+            domain : str
+                the domain
+
+        Returns
+        ----------
+            output : tuple
+                the (qps, burst) of the domain
+        """
+        return self.per_domain.get(domain, (self.qps, self.burst))
+
+    def _take(self, buckets, domain, now):
+        """Take a token from a domain's bucket, returning how long to wait for it."""
+        qps, burst = self.get_limit(domain)
+        tokens, last = buckets.get(domain, (burst, now))
+        tokens = min(burst, tokens + (now - last) * qps) - 1
+        buckets[domain] = [tokens, now]
+        return -tokens / qps if tokens < 0 else 0.0
+
+    def _take_shared(self, domain):
+        """Take a token from a bucket kept in the shared file, under a file lock."""
+        with open(self.path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                content = f.read()
+                buckets = json.loads(content) if content else {}
+                seconds = self._take(buckets, domain, time.time())
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(buckets))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return seconds
+
+    def acquire(self, url):
+        """
+        Wait (if needed) until a request may be sent to a url's domain. Urls without
+        a domain (e.g. about:blank) are not limited.
+
+        Parameters
+        ----------
+            url : str
+                the url about to be requested
+
+        Returns
+        ----------
+            seconds : float
+                the number of seconds waited
+        """
+        domain = get_domain(url)
+        if not domain:
+            # Nothing to limit, e.g. about:blank
+            return 0.0
+        with self._lock:
+            if self.path is None:
+                seconds = self._take(self._buckets, domain, time.monotonic())
+            else:
+                seconds = self._take_shared(domain)
+            stats = self._stats.setdefault(domain, [0, 0, 0.0])
+            stats[0] += 1
+            if seconds:
+                stats[1] += 1
+                stats[2] += seconds
+        if seconds:
+            if log_enabled(self.logger):
+                self.logger.debug(
+                    "RateLimiter: waiting %.3f seconds for %s", seconds, domain
+                )
+            time.sleep(seconds)
+        return seconds
+
+    def release(self, url, status=None, latency=None, retry_after=None, error=False):
+        """
+        Report the response to a request sent after acquire. A RateLimiter's limits
+        are fixed, so this does nothing (see AdaptiveController.release).
+        """
+
+    def stats(self):
+        """
+        Get the rate limiting statistics.
+
+        Returns
+        ----------
+            output : dict
+                the number of requests, the number which waited, and the total seconds
+                waited, by domain
+        """
+        with self._lock:
+            return {
+                domain: {"requests": requests, "waited": waited, "seconds": seconds}
+                for domain, (requests, waited, seconds) in self._stats.items()
+            }
+
+
+def parse_retry_after(value, now=None):
+    """
+    Parse a Retry-After header.
+
+    Parameters
+    ----------
+        value : str
+            the header value: a number of seconds, or an http date
+        now : float
+            the current unix time (default: time.time())
+
+    Returns
+    ----------
+        seconds : float
+            the number of seconds to wait (0 if the date has passed), or None if the
+            value is missing or invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date is None or date.tzinfo is None:
+        return None
+    return max(date.timestamp() - (time.time() if now is None else now), 0.0)
+
+
+class _DomainState:
+    """The adaptive limits and measurements of one domain (see AdaptiveController)."""
+
+    def __init__(self, qps, concurrency):
+        """Start a domain at the initial qps and concurrency, with nothing measured."""
+        self.qps = qps
+        self.concurrency = concurrency
+        self.in_flight = 0
+        # The (monotonic) times before which no new request may be sent
+        self.next_time = 0.0
+        self.blocked_until = 0.0
+        self.decreased = -float("inf")
+        # The smoothed latency, and its recent lowest
+        self.latency = None
+        self.baseline = None
+        self.requests = 0
+        self.waited = 0
+        self.seconds = 0.0
+        self.increases = 0
+        self.decreases = 0
+
+
+class AdaptiveController:
+    """
+    A per-domain politeness controller, which adapts each domain's request rate and
+    concurrency to how its server responds, instead of fixed or random sleeps.
+
+    Limits follow additive increase, multiplicative decrease (as TCP congestion
+    control does): while a domain responds successfully and its smoothed latency stays
+    within latency_factor of its baseline (its recent lowest, see baseline_decay), its
+    rate grows by increase requests per second with each response, and its concurrency
+    by one request per window of responses. A response with a backoff status (429 or 503),
+    a failed request, or a smoothed latency above latency_factor times the baseline
+    multiplies both by decrease, at most once per round trip. A Retry-After header
+    holds all requests to the domain for as long as it asks.
+
+    It is used (and shared) like a RateLimiter, within one process: acquire waits
+    until a request may be sent, and release reports its response. PageSoup.from_request
+    (see HttpSession.get) and navigation (see task_navigate_to_url in
+    core.selenium.tasks) do both.
+
+    Usage:
+
+        set_rate_limiter(AdaptiveController(qps=1, max_qps=10, max_concurrency=4))
+        page = PageSoup.from_request(url)  # waits if needed, then reports the response
+    """
+
+    uses_feedback = True
+
+    def __init__(
+        self,
+        qps=1.0,
+        min_qps=0.1,
+        max_qps=10.0,
+        concurrency=1,
+        max_concurrency=4,
+        increase=0.1,
+        decrease=0.5,
+        latency_factor=2.0,
+        smoothing=0.3,
+        baseline_decay=0.05,
+        backoff_status=(429, 503),
+        max_retry_after=300.0,
+        logger=None,
+    ):
+        """
+        Initialise an AdaptiveController instance.
+
+        Parameters
+        ----------
+            qps : float
+                the initial number of requests per second per domain
+            min_qps : float
+                the lowest rate a domain is backed off to
+            max_qps : float
+                the highest rate a domain is sped up to
+            concurrency : int
+                the initial number of requests in flight at once per domain
+            max_concurrency : int
+                the most requests in flight at once per domain
+            increase : float
+                the requests per second added to a domain's rate per good response
+            decrease : float
+                the factor a domain's rate and concurrency are multiplied by to back off
+            latency_factor : float
+                how many times its baseline a domain's smoothed latency can rise to
+                before backing off
+            smoothing : float
+                the weight of each new latency in the smoothed latency
+            baseline_decay : float
+                how far (as a fraction) the baseline drifts up towards the smoothed
+                latency with each response
+            backoff_status : tuple
+                the response statuses which back off
+            max_retry_after : float
+                the most seconds a Retry-After header can hold a domain for
+            logger : logging.Logger
+                a logger instance (see core.logger.py)
+        """
+        self.qps = qps
+        self.min_qps = min_qps
+        self.max_qps = max_qps
+        self.concurrency = concurrency
+        self.max_concurrency = max_concurrency
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.smoothing = smoothing
+        self.baseline_decay = baseline_decay
+        self.backoff_status = tuple(backoff_status)
+        self.max_retry_after = max_retry_after
+        self.logger = logger
+        self._condition = threading.Condition()
+        self._domains = {}
+        # The slots held by each thread, by domain, so that nested requests (e.g. a
+        # rate_limit function which calls PageSoup.from_request) do not wait on
+        # themselves
+        self._local = threading.local()
+
+    def _get_state(self, domain):
+        """Get a domain's state, creating it with the initial limits."""
+        state = self._domains.get(domain)
+        if state is None:
+            state = self._domains[domain] = _DomainState(self.qps, self.concurrency)
+        return state
+
+    def _held(self):
+        """Get the number of slots the current thread holds, by domain."""
+        held = getattr(self._local, "held", None)
+        if held is None:
+            held = self._local.held = {}
+        return held
+
+    def acquire(self, url):
+        """
+        Wait (if needed) until a request may be sent to a url's domain: until it has
+        fewer than its concurrency in flight, its rate allows another request, and any
+        Retry-After has passed. Each acquire must be followed by a release.
+
+        Parameters
+        ----------
+            url : str
+                the url about to be requested
+
+        Returns
+        ----------
+            seconds : float
+                the number of seconds waited
+        """
+        domain = get_domain(url)
+        if not domain:
+            # Nothing to limit, e.g. about:blank
+            return 0.0
+        held = self._held()
+        nested = held.get(domain, 0) > 0
+        start = time.monotonic()
+        with self._condition:
+            state = self._get_state(domain)
+            while True:
+                now = time.monotonic()
+                if nested or state.in_flight < max(int(state.concurrency), 1):
+                    ready = max(state.next_time, state.blocked_until)
+                    if ready <= now:
+                        break
+                    timeout = ready - now
+                else:
+                    timeout = None
+                if log_enabled(self.logger):
+                    self.logger.debug(
+                        "AdaptiveController: waiting for %s (%d in flight)",
+                        domain,
+                        state.in_flight,
+                    )
+                self._condition.wait(timeout)
+            if not nested:
+                state.in_flight += 1
+            state.next_time = now + 1 / state.qps
+            seconds = now - start
+            state.requests += 1
+            if seconds > 0.001:
+                state.waited += 1
+                state.seconds += seconds
+        held[domain] = held.get(domain, 0) + 1
+        return seconds
+
+    def release(self, url, status=None, latency=None, retry_after=None, error=False):
+        """
+        Report the response to a request sent after acquire, and adapt the domain's
+        limits to it.
+
+        Parameters
+        ----------
+            url : str
+                the url requested
+            status : int
+                the response status, if known
+            latency : float
+                the seconds the request took, if known
+            retry_after : float
+                the seconds the server asked to wait (see parse_retry_after)
+            error : bool
+                whether the request failed (e.g. a connection error or timeout)
+        """
+        domain = get_domain(url)
+        if not domain:
+            return
+        held = self._held()
+        held[domain] = held.get(domain, 0) - 1
+        nested = held[domain] > 0
+        if not nested:
+            del held[domain]
+        with self._condition:
+            state = self._get_state(domain)
+            if not nested:
+                state.in_flight = max(state.in_flight - 1, 0)
+            now = time.monotonic()
+            if retry_after:
+                retry_after = min(retry_after, self.max_retry_after)
+                state.blocked_until = max(state.blocked_until, now + retry_after)
+            slow = False
+            if latency is not None:
+                if state.latency is None:
+                    state.latency = state.baseline = latency
+                else:
+                    state.latency += self.smoothing * (latency - state.latency)
+                slow = state.latency > self.latency_factor * state.baseline
+                # The baseline drops to a lower latency at once, but only drifts up, so
+                # that one lucky fast response is forgotten, but a sudden rise is not
+                if state.latency < state.baseline:
+                    state.baseline = state.latency
+                else:
+                    state.baseline += self.baseline_decay * (
+                        state.latency - state.baseline
+                    )
+            if error or slow or status in self.backoff_status:
+                self._decrease(domain, state, now)
+            elif (status is None and latency is not None) or (
+                status is not None and status < 400
+            ):
+                self._increase(state)
+            self._condition.notify_all()
+
+    def _increase(self, state):
+        """Speed a domain up, additively."""
+        state.qps = min(state.qps + self.increase, self.max_qps)
+        state.concurrency = min(
+            state.concurrency + 1 / max(state.concurrency, 1), self.max_concurrency
+        )
+        state.increases += 1
+
+    def _decrease(self, domain, state, now):
+        """Back a domain off, multiplicatively, at most once per round trip."""
+        if now - state.decreased < max(state.latency or 0.0, 1 / state.qps):
+            return
+        state.decreased = now
+        state.qps = max(state.qps * self.decrease, self.min_qps)
+        state.concurrency = max(state.concurrency * self.decrease, 1)
+        state.next_time = max(state.next_time, now + 1 / state.qps)
+        state.decreases += 1
+        if log_enabled(self.logger):
+            self.logger.debug(
+                "AdaptiveController: backing off %s to %.2f qps, concurrency %d",
+                domain,
+                state.qps,
+                int(state.concurrency),
+            )
+
+    def stats(self):
+        """
+        Get the adaptive limits and statistics.
+
+        Returns
+        ----------
+            output : dict
+                by domain: the number of requests, the number which waited, and the
+                total seconds waited (as RateLimiter.stats), the current qps,
+                concurrency and requests in flight, the smoothed and baseline latency,
+                and the number of increases and decreases
+        """
+        with self._condition:
+            return {
+                domain: {
+                    "requests": state.requests,
+                    "waited": state.waited,
+                    "seconds": state.seconds,
+                    "qps": state.qps,
+                    "concurrency": int(state.concurrency),
+                    "in_flight": state.in_flight,
+                    "latency": state.latency,
+                    "baseline": state.baseline,
+                    "increases": state.increases,
+                    "decreases": state.decreases,
+                }
+                for domain, state in self._domains.items()
+            }
+
+
+_rate_limiter = None
+
+
+def get_rate_limiter():
+    """
+    Get the shared RateLimiter used by navigation (see task_navigate_to_url in
+    core.selenium.tasks), PageSoup.from_request (see core.soup.session.HttpSession)
+    and rate_limit.
+
+    Returns
+    ----------
+        limiter : RateLimiter
+            the shared rate limiter (or AdaptiveController), or None if requests are
+            not rate limited (the default)
+    """
+    return _rate_limiter
+
+
+def set_rate_limiter(limiter):
+    """
+    Set the shared RateLimiter (see get_rate_limiter).
+
+    Parameters
+    ----------
+        limiter : RateLimiter
+            the rate limiter (or AdaptiveController), or None to stop rate limiting
+    """
+    global _rate_limiter
+    _rate_limiter = limiter
+
+
+def _get_url(args, kwargs):
+    """Find the url a decorated function will request (see rate_limit)."""
+    if isinstance(kwargs.get("url"), str):
+        return kwargs["url"]
+    for arg in args:
+        if isinstance(arg, str) and arg.startswith(("http://", "https://")):
+            return arg
+    url = getattr(args[0], "url", None) if args else None
+    return url if isinstance(url, str) else None
+
+
+def rate_limit(_func=None, *, limiter=None):
+    """
+    Wraps functions (e.g. Page methods, or a crawler's own fetch functions) in order to
+    wait for a RateLimiter before executing the function, like random_wait, but only
+    as long as the domain being requested needs.
+
+    The url is taken from the url argument, else the first argument which is an
+    http(s) url, else the url attribute of the first argument (e.g. a Page). The time
+    the function takes, and whether it raises, are reported to the limiter's release
+    (which an AdaptiveController adapts to).
+
+    Parameters
+    ----------
+        limiter : RateLimiter
+            the rate limiter or AdaptiveController (default: the shared one, see
+            get_rate_limiter)
+    """
+
+    def decorator_rate_limit(func):
+        """Wrap func to wait for the rate limiter, and report back to it."""
+
+        @functools.wraps(func)
+        def wrapper_rate_limit(*args, **kwargs):
+            """Call func between acquire and release of the url's domain."""
+            rate_limiter = limiter or get_rate_limiter()
+            url = _get_url(args, kwargs) if rate_limiter is not None else None
+            if url is None:
+                return func(*args, **kwargs)
+            rate_limiter.acquire(url)
+            start = time.perf_counter()
+            error = True
+            try:
+                output = func(*args, **kwargs)
+                error = False
+                return output
+            finally:
+                latency = time.perf_counter() - start
+                rate_limiter.release(url, latency=latency, error=error)
+
+        return wrapper_rate_limit
+
+    if _func is None:
+        return decorator_rate_limit
+    else:
+        return decorator_rate_limit(_func)
+
+
 def validateUrl(url):
     """Regex to check for a valid URL"""
     reg_exp = (
@@ -4,7 +4,7 @@ from setuptools.command import easy_install
 REQUIREMENTS = [
     "numpy",
     "selenium",
-    "beautifulsoup4",
+    "beautifulsoup4>=4.13",
     "lxml",
     "ipython",
     "requests",
@@ -13,6 +13,10 @@ REQUIREMENTS = [
 
 REQUIREMENTS_TEST = ["coverage", "interrogate", "pytest", "pytest-cov", "black"]
 
+REQUIREMENTS_ASYNC = ["aiohttp"]
+
+REQUIREMENTS_LXML = ["cssselect"]
+
 __version__ = "1.0.2"
 
 setup(
@@ -21,7 +25,9 @@ setup(
     packages=find_packages(),
     install_requires=REQUIREMENTS,
     extras_require={
-        "tests": REQUIREMENTS_TEST
+        "tests": REQUIREMENTS_TEST + REQUIREMENTS_ASYNC + REQUIREMENTS_LXML,
+        "async": REQUIREMENTS_ASYNC,
+        "lxml": REQUIREMENTS_LXML,
     },
     include_package_data=True
 )
@@ -2,19 +2,27 @@ import sys
 import os
 import pytest
 import time
+import logging
+import json
 
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
 
 import selene
 
-from selene.core.crawler import Crawler
+from selene.core.crawler import Crawler, Frontier, BloomFilter
 from selene.core.element import *
-from selene.core.logger import get_logger
+from selene.core.logger import get_logger, close_logger, log_enabled, set_silent
 from selene.core.page import *
 from selene.core.utils import *
 
+from selene.core.config import *
 from selene.core.selenium.driver import *
+from selene.core.selenium.conditions import wait_until, bool_condition
+from selene.core.selenium import crawler as crawler_selene
+from selene.core.selenium.instrument import *
+from selene.core.selenium.page import PageSelene
+from selene.core.selenium.replay import RecordingDriver, ReplayDriver, ReplayError
 
 def test_crawler_init():
     assert Crawler() is not None
@@ -38,34 +46,86 @@ def test_logger_init():
     logger = get_logger()
     assert logger is not None
        
-def test_logger_to_file():
+def test_logger_to_file(tmp_path):
     logger = get_logger(to_file=True, 
-                        dirpath=".",
+                        dirpath=str(tmp_path),
                         filename ="test_logger.log",
                         overwrite=True)
     crawler = Crawler()
     crawler.log('test')
-    assert os.path.isfile("./test_logger.log")
+    assert os.path.isfile(tmp_path / "test_logger.log")
     
+def test_logger_queue_json(tmp_path):
+    logger = get_logger(name="test_queue", to_console=False, to_file=True,
+                        dirpath=str(tmp_path), filename="log.jsonl",
+                        queue=True, json_lines=True)
+    assert isinstance(logger.handlers[0], logging.handlers.QueueHandler)
+    logger.info("hello %s", "world")
+    close_logger("test_queue")
+    import json
+    lines = [json.loads(line) for line in open(tmp_path / "log.jsonl")]
+    assert lines[-1]["message"] == "hello world"
+    assert lines[-1]["level"] == "INFO"
+    assert logger.handlers == []
+
+def test_logger_reused(tmp_path):
+    kwargs = dict(name="test_reused", to_console=False, to_file=True,
+                  dirpath=str(tmp_path), filename="log.log", queue=True)
+    logger = get_logger(**kwargs)
+    handlers = list(logger.handlers)
+    logger.info("first")
+    # the same arguments return the logger as it is, without restarting its listener
+    assert get_logger(**kwargs) is logger
+    assert logger.handlers == handlers
+    # different arguments reconfigure it, keeping the records already queued
+    get_logger(**{**kwargs, "level": "DEBUG"})
+    assert logger.handlers != handlers
+    logger.debug("second")
+    close_logger("test_reused")
+    lines = open(tmp_path / "log.log").read()
+    assert "first" in lines and "second" in lines
+    assert lines.count("Logger started") == 2
+
+def test_logger_rotating(tmp_path):
+    logger = get_logger(name="test_rotating", to_console=False, to_file=True,
+                        dirpath=str(tmp_path), filename="log.log",
+                        max_bytes=200, backup_count=2)
+    for i in range(50):
+        logger.info("message %s", i)
+    close_logger("test_rotating")
+    assert os.path.getsize(tmp_path / "log.log") <= 200
+    assert sorted(os.listdir(tmp_path)) == ["log.log", "log.log.1", "log.log.2"]
+
 def test_page_init():
     test_url = "https://www.scrapethissite.com/"
     page = Page(url=test_url, logger = get_logger())
     assert page is not None
     
-def test_page_logging():
+def test_page_logging(tmp_path):
     test_url = "https://www.scrapethissite.com/"
     logger = get_logger(to_file=True, 
-                        dirpath=".",
+                        dirpath=str(tmp_path),
                         filename ="test_logger.log",
                         overwrite=True)
     page = Page(url=test_url, logger = logger)
     page.log('test log message')
-    assert os.path.isfile("./test_logger.log")
+    assert os.path.isfile(tmp_path / "test_logger.log")
     
 
 def test_utils_get_domain():
     url = "https://www.scrapethissite.com/"
     assert get_domain(url) == "www.scrapethissite.com"
+    assert get_domain("http://www.scrapethissite.com/https-guide") == "www.scrapethissite.com"
+    assert get_domain("http://127.0.0.1:8000/") == "127.0.0.1:8000"
+    assert get_domain("about:blank") == ""
+
+def test_utils_canonicalise_url():
+    url = "HTTP://Example.COM:80/a/./b/../c%7e?utm_source=x&b=2&a=1#top"
+    assert canonicalise_url(url) == "http://example.com/a/c~?a=1&b=2"
+    assert canonicalise_url("https://example.com") == "https://example.com/"
+    assert canonicalise_url("https://example.com:8443/p?q=a b") == "https://example.com:8443/p?q=a%20b"
+    assert canonicalise_url("../x?b=1", base="http://example.com/a/b/") == "http://example.com/a/x?b=1"
+    assert canonicalise_url("/#top", keep_fragment=True, base="http://example.com") == "http://example.com/#top"
       
 def test_random_wait():
     @random_wait(seconds_min=2, seconds_max=3)
@@ -81,4 +141,547 @@ def test_random_wait():
       
 def test_validate_url():
     url = "https://www.scrapethissite.com/"
-    assert validateUrl(url) is True
\ No newline at end of file
+    assert validateUrl(url) is True
+
+def test_wait_policy_intervals():
+    policy = WaitPolicy(poll_min=0.01, poll_max=0.05, backoff=2)
+    intervals = policy.intervals()
+    assert [next(intervals) for _ in range(5)] == [0.01, 0.02, 0.04, 0.05, 0.05]
+
+def test_use_wait_policy():
+    policy = WaitPolicy(poll_max=0.1)
+    assert get_wait_policy() is WAIT_POLICY
+    with use_wait_policy(policy):
+        assert get_wait_policy() is policy
+        assert get_wait_policy(WAIT_POLICY) is WAIT_POLICY
+    assert get_wait_policy() is WAIT_POLICY
+
+def test_wait_until_backoff():
+    calls = []
+    def method(driver):
+        calls.append(time.monotonic())
+        return len(calls) >= 4
+    policy = WaitPolicy(poll_min=0.01, poll_max=0.02, backoff=2)
+    assert wait_until(None, 1, method, policy=policy) is True
+    assert len(calls) == 4
+    assert calls[-1] - calls[0] < 0.5
+
+def test_wait_until_check_once():
+    calls = []
+    def method(driver):
+        calls.append(1)
+        raise NoSuchElementException()
+    with pytest.raises(TimeoutException):
+        wait_until(None, WAIT_TINY, method, "not found")
+    assert len(calls) == 1
+    assert wait_until(None, WAIT_TINY, method, until_not=True) is True
+
+def test_crawler_selene_run(monkeypatch):
+    started, stopped = [], []
+    def fake_get_driver(**kwargs):
+        started.append(object())
+        return started[-1]
+    monkeypatch.setattr(crawler_selene, "get_driver", fake_get_driver)
+    monkeypatch.setattr(crawler_selene, "stop_driver", stopped.append)
+    def task(i):
+        def run(driver, id_page):
+            if i == 3:
+                raise ValueError(i)
+            return (i, id_page)
+        return run
+    crawler = crawler_selene.CrawlerSelene()
+    results = list(crawler.run([task(i) for i in range(10)], workers=3, recycle_after=2))
+    assert sorted(r.index for r in results) == list(range(10))
+    assert all(r.result == (r.index, r.worker) for r in results if r.index != 3)
+    assert isinstance([r for r in results if r.index == 3][0].error, ValueError)
+    assert {r.worker for r in results} <= {1, 2, 3}
+    assert len(started) >= 5
+    assert sorted(map(id, stopped)) == sorted(map(id, started))
+
+def test_crawler_selene_driver_crash(monkeypatch):
+    from urllib3.exceptions import MaxRetryError
+    class DeadDriver:
+        quit_calls = 0
+        def quit(self):
+            DeadDriver.quit_calls += 1
+    def dead_stop_driver(driver):
+        raise MaxRetryError(None, "/session/window")
+    drivers = []
+    monkeypatch.setattr(crawler_selene, "get_driver", lambda **kwargs: drivers.append(DeadDriver()) or drivers[-1])
+    monkeypatch.setattr(crawler_selene, "stop_driver", dead_stop_driver)
+    def task(driver, id_page):
+        raise MaxRetryError(None, "/session/url")
+    crawler = crawler_selene.CrawlerSelene(debug=False)
+    results = list(crawler.run([task] * 3, workers=1))
+    # a dead chromedriver is replaced for each task, and quit although close fails
+    assert all(isinstance(r.error, MaxRetryError) for r in results)
+    assert len(drivers) == 3
+    assert DeadDriver.quit_calls == 3
+
+def test_get_block_patterns():
+    patterns = get_block_patterns(["image", "*tracker.example.com*", "image"])
+    assert "*.png" in patterns and "*.png?*" in patterns
+    assert patterns[-1] == "*tracker.example.com*"
+    assert len(patterns) == len(set(patterns))
+
+def test_block_patterns_extensions():
+    import re
+    patterns = get_block_patterns(["image", "media", "font", "stylesheet"])
+    # as Chrome matches them: "*" is the only wildcard, and the whole URL must match
+    regexes = [re.compile(re.escape(pattern).replace(r"\*", ".*")) for pattern in patterns]
+    def blocked(url):
+        return any(regex.fullmatch(url) for regex in regexes)
+    # pages on hosts which only contain an extension's text are not blocked
+    for url in ["https://www.gifts.com/", "https://www.movies.com/films",
+                "https://www.iconfinder.com/search?q=tea", "https://a.com/svg-guide.html"]:
+        assert not blocked(url)
+    for url in ["https://a.com/logo.gif", "https://a.com/logo.svg?v=2", "https://a.com/x.mov"]:
+        assert blocked(url)
+
+def test_get_network_stats():
+    import json
+    def event(method, **params):
+        return {"message": json.dumps({"message": {"method": method, "params": params}})}
+    class FakeDriver:
+        def get_log(self, name):
+            return [
+                event("Network.requestWillBeSent", requestId="1", request={"url": "http://a/"}),
+                event("Network.loadingFinished", requestId="1", encodedDataLength=100),
+                event("Network.requestWillBeSent", requestId="2", request={"url": "http://a/b.png"}),
+                event("Network.loadingFailed", requestId="2", blockedReason="inspector"),
+            ]
+    stats = get_network_stats(FakeDriver())
+    assert stats == {"requests": 1, "bytes": 100, "blocked": 1, "blocked_urls": ["http://a/b.png"]}
+
+def test_bool_condition():
+    assert bool_condition(None, WAIT_TINY, None, lambda driver: True) is True
+    assert bool_condition(None, WAIT_TINY, None, lambda driver: False) is False
+
+def test_log_enabled():
+    logger = get_logger(level="INFO")
+    assert log_enabled(None) is False
+    assert log_enabled(logger) is False
+    assert log_enabled(logger, logging.INFO) is True
+    set_silent()
+    try:
+        assert log_enabled(logger, logging.INFO) is False
+    finally:
+        set_silent(False)
+
+def test_page_logging_lazy(caplog):
+    class Unformattable:
+        def __str__(self):
+            raise AssertionError("formatted a disabled message")
+    page = Page(url="https://www.scrapethissite.com/", logger=get_logger(level="INFO"), id_page=3)
+    page.log("find: %s", "DEBUG", Unformattable())
+    with caplog.at_level(logging.INFO, logger="log"):
+        page.log("found %s elements", "INFO", 5)
+        page.log("100% done", "INFO")
+    assert "WORKER-03: found 5 elements" in caplog.text
+    assert "WORKER-03: 100% done" in caplog.text
+
+def test_instrumentation(monkeypatch):
+    from selenium.webdriver.remote.webdriver import WebDriver
+    def fake_execute(self, driver_command, params=None):
+        return {"value": "complete"}
+    monkeypatch.setattr(WebDriver, "execute", fake_execute)
+    driver = WebDriver.__new__(WebDriver)
+    class PageTest(PageSelene):
+        pass
+    assert PageTest.is_ready(driver) is True
+    with instrumentation():
+        assert PageTest.is_ready(driver) is True
+        polls = iter([False, False, True])
+        wait_until(None, 1, lambda driver: next(polls), policy=WaitPolicy(0.001, 0.001))
+        driver.execute_script("return 1")
+    assert WebDriver.execute is fake_execute
+    stats = {(row["page"], row["method"]): row for row in get_instrumentation_stats()}
+    assert stats[("PageTest", "PageSelene.is_ready")]["commands"] == 1
+    assert stats[("PageTest", "script_get_ready_state")]["calls"] == 1
+    assert stats[("-", "wait_until")]["polls"] == 3
+    assert stats[("-", "wait_until")]["wait_seconds"] > 0
+    assert stats[("-", "WebDriver.execute")]["commands"] == 1
+    assert "PageSelene.is_ready" in get_instrumentation_summary()
+    assert 'selene_webdriver_commands_total{page="PageTest",method="PageSelene.is_ready"} 1' in get_instrumentation_prometheus()
+    assert len(json.loads(get_instrumentation_json())) == 4
+
+def test_record_replay(tmp_path):
+    class FakeDriver:
+        current_url = "data:,"
+        def get(self, url):
+            self.current_url = url
+            self.page_source = f"<html><body><h1 class='title'>{url}</h1></body></html>"
+        def execute_script(self, script, *args):
+            return "complete" if "readyState" in script else [1, {"a": args[0]}]
+        def get_screenshot_as_png(self):
+            return b"\x89PNG" + self.current_url.encode()
+        def quit(self):
+            pass
+    urls = ["http://a.b/1", "http://a.b/2"]
+    path = str(tmp_path / "session.zip")
+    recorder = RecordingDriver(FakeDriver(), path, screenshots=True)
+    for url in urls:
+        page = PageSelene.from_url(recorder, url)
+        assert page.find_soup("h1", {"class": "title"}).text == url
+        assert PageSelene.is_ready(recorder)
+        assert recorder.execute_script("return x", url) == [1, {"a": url}]
+    recorder.quit()
+    replay = ReplayDriver(path)
+    assert replay.urls == urls
+    for url in reversed(urls):
+        page = PageSelene.from_url(replay, url)
+        assert replay.current_url == url
+        assert page.find_soup("h1", {"class": "title"}).text == url
+        assert page.find_all_soup("h1", {"class": "title"})[0].text == url
+        assert PageSelene.is_ready(replay)
+        assert replay.execute_script("return x", url) == [1, {"a": url}]
+        assert replay.get_screenshot_as_png() == b"\x89PNG" + url.encode()
+    with pytest.raises(ReplayError):
+        replay.get("http://a.b/3")
+    with pytest.raises(ReplayError):
+        replay.find_element(By.ID, "x")
+
+def test_bloom_filter():
+    seen = BloomFilter(capacity=1000, error_rate=1e-3)
+    assert seen.add("http://a.b/0") is True
+    assert seen.add("http://a.b/0") is False
+    for i in range(5000):
+        seen.add(f"http://a.b/{i}")
+    assert len(seen) > 4990
+    assert all(f"http://a.b/{i}" in seen for i in range(5000))
+    assert sum(f"http://c.d/{i}" in seen for i in range(10000)) < 30
+
+def test_frontier():
+    frontier = Frontier(delay=0.05)
+    urls = ["http://a.com/1", "http://a.com/2", "http://A.com/1#x", "http://b.com/1",
+            "http://b.com/2?utm_source=q", "http://b.com/2"]
+    assert frontier.add_all(urls) == 4
+    assert frontier.add("/0", priority=-1, base="http://a.com/") is True
+    start = time.monotonic()
+    popped = []
+    while len(frontier):
+        item = frontier.pop()
+        popped.append((item.url, time.monotonic() - start))
+    assert [url for url, _ in popped] == [
+        "http://a.com/0", "http://b.com/1", "http://a.com/1", "http://b.com/2", "http://a.com/2"
+    ]
+    assert popped[-1][1] >= 0.1
+    assert frontier.pop() is None
+    assert frontier.stats()["duplicates"] == 2
+    frontier.add("http://a.com/3")
+    assert frontier.pop(block=False) is None
+
+def test_rate_limiter():
+    limiter = RateLimiter(qps=20, burst=2, per_domain={"b.com": (100, 1)})
+    start = time.monotonic()
+    waits = [limiter.acquire("http://a.com/") for _ in range(4)]
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] == pytest.approx(0.05, abs=0.01)
+    assert waits[3] == pytest.approx(0.05, abs=0.01)
+    assert time.monotonic() - start >= 0.09
+    # another domain is not held up by a.com
+    assert limiter.acquire("http://b.com/") == 0.0
+    assert limiter.stats()["a.com"] == {"requests": 4, "waited": 2, "seconds": pytest.approx(0.1, abs=0.02)}
+
+def test_rate_limiter_no_domain():
+    # urls without a domain are not limited
+    for limiter in (RateLimiter(qps=1), AdaptiveController(qps=1)):
+        for url in ("about:blank", "data:,"):
+            assert limiter.acquire(url) == 0.0
+            limiter.release(url)
+        assert limiter.stats() == {}
+
+def test_rate_limiter_threads():
+    import threading
+    limiter = RateLimiter(qps=20, burst=1)
+    waits = []
+    threads = [threading.Thread(target=lambda: waits.append(limiter.acquire("http://a.com/")))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # concurrent requests reserve their turn
+    assert sorted(waits) == pytest.approx([0.0, 0.05, 0.1, 0.15], abs=0.01)
+
+def test_rate_limiter_shared(tmp_path):
+    path = str(tmp_path / "buckets.json")
+    limiters = [RateLimiter(qps=10, burst=1, path=path) for _ in range(2)]
+    assert limiters[0].acquire("http://a.com/") == 0.0
+    assert limiters[1].acquire("http://a.com/") > 0.05
+
+def test_rate_limit_decorator():
+    limiter = RateLimiter(qps=10, burst=1)
+    calls = []
+    @rate_limit(limiter=limiter)
+    def fetch(url):
+        calls.append(url)
+    start = time.monotonic()
+    fetch("http://a.com/1")
+    fetch(url="http://a.com/2")
+    assert time.monotonic() - start >= 0.09
+    assert calls == ["http://a.com/1", "http://a.com/2"]
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:30 GMT", now=1445412500.0) == 10.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT", now=1445412500.0) == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+def test_adaptive_controller():
+    controller = AdaptiveController(qps=10, max_qps=12, increase=1, max_concurrency=2)
+    # fast successful responses speed a domain up, to its maximum
+    for _ in range(4):
+        controller.acquire("http://a.com/")
+        controller.release("http://a.com/", status=200, latency=0.01)
+    stats = controller.stats()["a.com"]
+    assert stats["qps"] == 12
+    assert stats["concurrency"] == 2
+    assert stats["in_flight"] == 0
+    # a 429 backs off, once per round trip
+    controller.release("http://a.com/", status=429)
+    controller.release("http://a.com/", status=429)
+    stats = controller.stats()["a.com"]
+    assert stats["qps"] == 6
+    assert stats["concurrency"] == 1
+    assert stats["decreases"] == 1
+    # and other domains are unaffected
+    controller.acquire("http://b.com/")
+    controller.release("http://b.com/", status=404, latency=0.01)
+    assert controller.stats()["b.com"]["qps"] == 10
+
+def test_adaptive_controller_latency():
+    controller = AdaptiveController(qps=100, max_qps=100, increase=0, smoothing=1.0)
+    for latency in (0.01, 0.01, 0.05):
+        controller.acquire("http://a.com/")
+        controller.release("http://a.com/", latency=latency)
+    stats = controller.stats()["a.com"]
+    assert stats["baseline"] == pytest.approx(0.012)
+    assert stats["decreases"] == 1
+    assert stats["qps"] == 50
+
+def test_adaptive_controller_retry_after():
+    controller = AdaptiveController(qps=100, max_qps=100)
+    controller.acquire("http://a.com/")
+    controller.release("http://a.com/", status=503, retry_after=0.2)
+    assert controller.acquire("http://a.com/") == pytest.approx(0.2, abs=0.03)
+    controller.release("http://a.com/", status=200)
+
+def test_adaptive_controller_concurrency():
+    import threading
+    controller = AdaptiveController(qps=1000, max_qps=1000, concurrency=2, max_concurrency=2)
+    lock = threading.Lock()
+    active = [0, 0]
+    def fetch():
+        controller.acquire("http://a.com/")
+        with lock:
+            active[0] += 1
+            active[1] = max(active)
+        time.sleep(0.02)
+        with lock:
+            active[0] -= 1
+        controller.release("http://a.com/", status=200, latency=0.02)
+    threads = [threading.Thread(target=fetch) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert active[1] == 2
+    assert controller.stats()["a.com"]["in_flight"] == 0
+
+def test_adaptive_controller_nested():
+    controller = AdaptiveController(qps=1000, max_qps=1000, concurrency=1)
+    @rate_limit(limiter=controller)
+    def scrape(url):
+        # a nested request to the same domain does not wait on its own slot
+        controller.acquire(url)
+        controller.release(url, status=200)
+        return url
+    assert scrape("http://a.com/") == "http://a.com/"
+    assert controller.stats()["a.com"]["in_flight"] == 0
+    assert controller.stats()["a.com"]["requests"] == 2
+
+def test_adaptive_controller_baseline_decays():
+    controller = AdaptiveController(qps=100, min_qps=100, max_qps=100, smoothing=1.0)
+    # one lucky fast response is forgotten as ordinary responses come in
+    for latency in [0.001] + [0.01] * 40:
+        controller.acquire("http://a.com/")
+        controller.release("http://a.com/", latency=latency)
+    assert controller.stats()["a.com"]["baseline"] > 0.005
+
+def test_adaptive_controller_released_on_any_error():
+    from urllib3.exceptions import MaxRetryError
+    from selene.core.selenium.tasks import task_navigate_to_url
+
+    class DeadDriver:
+        current_url = "about:blank"
+        def get(self, url):
+            raise MaxRetryError(None, url)
+
+    controller = AdaptiveController(qps=1000, max_qps=1000, concurrency=1)
+    for _ in range(2):
+        with pytest.raises(MaxRetryError):
+            task_navigate_to_url(DeadDriver(), "http://a.com/", limiter=controller)
+    stats = controller.stats()["a.com"]
+    assert stats["in_flight"] == 0
+    assert stats["requests"] == 2
+
+def test_driver_pool_capped(monkeypatch):
+    from selene.core.selenium import driver as driver_module
+
+    class FakeDriver:
+        stopped = 0
+        window_handles = ["home"]
+        current_url = "about:blank"
+        class switch_to:
+            def window(handle):
+                pass
+        def delete_all_cookies(self):
+            pass
+        def get(self, url):
+            pass
+        def close(self):
+            pass
+        def quit(self):
+            FakeDriver.stopped += 1
+
+    monkeypatch.setattr(driver_module, "get_driver", lambda **kwargs: FakeDriver())
+    pool = driver_module.DriverPool(size=1)
+    # misses launch extra drivers, which are stopped rather than kept when released
+    drivers = [pool.acquire() for _ in range(3)]
+    for pool_driver in drivers:
+        pool.release(pool_driver)
+    assert pool.stats()["ready"] == 1
+    assert FakeDriver.stopped >= 2
+    pool.close()
+    assert pool.stats()["ready"] == 0
+
+def test_driver_pool_no_replacement_when_full(monkeypatch):
+    from selene.core.selenium import driver as driver_module
+
+    class FakeDriver:
+        window_handles = ["home"]
+        current_url = "about:blank"
+        class switch_to:
+            def window(handle):
+                pass
+        def delete_all_cookies(self):
+            pass
+        def get(self, url):
+            pass
+        def quit(self):
+            pass
+
+    class DeadDriver(FakeDriver):
+        @property
+        def window_handles(self):
+            raise ConnectionError("dead")
+
+    launched = []
+    def get_driver(**kwargs):
+        launched.append(FakeDriver())
+        return launched[-1]
+
+    monkeypatch.setattr(driver_module, "get_driver", get_driver)
+    pool = driver_module.DriverPool(size=1)
+    while pool.stats()["ready"] < 1:
+        time.sleep(0.01)
+    pool.release(DeadDriver())
+    time.sleep(0.1)
+    # a dead driver is not replaced while the pool already has size drivers ready
+    assert len(launched) == 1
+    assert pool.stats()["ready"] == 1
+    pool.close()
+
+def test_page_selene_soup_driver_moved():
+    class FakeDriver:
+        url = "http://a.com/1"
+        reads = 0
+        page_source = "<html><body><h1>1</h1></body></html>"
+        @property
+        def current_url(self):
+            self.reads += 1
+            return self.url
+    driver = FakeDriver()
+    page = PageSelene(driver, "http://a.com/1")
+    assert page.find_soup("h1").text == "1"
+    moved = PageSelene(driver, "http://a.com/1")
+    # creating a page sends no command
+    assert driver.reads == 1
+    driver.url = "http://a.com/2"
+    driver.page_source = "<html><body><h1>2</h1></body></html>"
+    # the soup is not silently parsed from another page
+    with pytest.raises(RuntimeError):
+        moved.page_soup
+    assert moved.snapshot(driver).find("h1").text == "2"
+    assert page.find_soup("h1").text == "1"
+
+def test_script_wait_for_restores_script_timeout():
+    from collections import namedtuple
+    from selene.core.selenium.scripts import script_wait_for
+    Timeouts = namedtuple("Timeouts", ["script"])
+    class FakeDriver:
+        def __init__(self, script):
+            self.script = script
+            self.set_calls = []
+        @property
+        def timeouts(self):
+            return Timeouts(self.script)
+        def set_script_timeout(self, seconds):
+            self.set_calls.append(seconds)
+            self.script = seconds
+        def execute_async_script(self, script, *args):
+            return True
+    # a short timeout is raised for the call only, and then restored
+    driver = FakeDriver(5)
+    assert script_wait_for(driver, "visible", [], 20) is True
+    assert driver.set_calls == [21, 5]
+    assert driver.script == 5
+    # a long enough timeout is left alone
+    driver = FakeDriver(30)
+    assert script_wait_for(driver, "visible", [], 5) is True
+    assert driver.set_calls == []
+
+def test_from_urls_in_tabs_rate_limited():
+    class FakeDriver:
+        def __init__(self):
+            self.handles = {"home": "about:blank"}
+            self.handle = "home"
+            self.opened = 0
+            driver = self
+            class switch_to:
+                def window(handle):
+                    driver.handle = handle
+            self.switch_to = switch_to
+        @property
+        def window_handles(self):
+            return list(self.handles)
+        @property
+        def current_window_handle(self):
+            return self.handle
+        @property
+        def current_url(self):
+            return self.handles[self.handle]
+        def execute_script(self, script, *args):
+            if "window.open" in script:
+                self.opened += 1
+                self.handles[f"tab{self.opened}"] = args[0]
+            elif "readyState" in script:
+                return "loading" if self.current_url.endswith("slow") else "complete"
+            elif "responseStatus" in script:
+                return 200
+        def close(self):
+            del self.handles[self.handle]
+
+    urls = ["http://a.com/1", "http://a.com/2", "http://a.com/slow", "http://b.com/1"]
+    controller = AdaptiveController(qps=1000, max_qps=1000, concurrency=1)
+    driver = FakeDriver()
+    pages = PageSelene.from_urls_in_tabs(driver, urls, tabs=2, wait=0.2, limiter=controller)
+    loaded = [page.url for page in pages]
+    assert sorted(loaded) == sorted(set(urls) - {"http://a.com/slow"})
+    # each url was acquired, and released once its tab was ready or timed out
+    stats = controller.stats()
+    assert stats["a.com"]["requests"] == 3 and stats["b.com"]["requests"] == 1
+    assert stats["a.com"]["in_flight"] == 0 and stats["b.com"]["in_flight"] == 0
+    assert driver.window_handles == ["home"]
@@ -13,6 +13,7 @@ from selene.core.selenium.driver import *
 from selene.core.selenium.page import *
 from selene.core.selenium.crawler import *
 from selene.core.selenium.tasks import *
+from selene.core.schema import Field
 from selene.core.logger import get_logger
 
 # initialise the driver
@@ -188,4 +189,169 @@ def test_close_all_tabs_except_specified_tab():
     assert handles[0] == tab_to_keep
     
 def test_mouse_move():
-    assert mouse_move(driver) >= 1
\ No newline at end of file
+    assert mouse_move(driver) >= 1
+
+def test_driver_pool():
+    pool = DriverPool(size=1)
+    with pool.driver() as pool_driver:
+        pool_driver.get("https://www.scrapethissite.com/")
+    with pool.driver() as pool_driver:
+        assert pool_driver.current_url == "about:blank"
+    stats = pool.stats()
+    pool.close()
+    assert stats["hits"] + stats["misses"] == 2
+    assert stats["launches"] >= 1
+
+
+def test_find_all_prefetch():
+    page = PageSelene.from_url(driver=driver, url = "https://www.scrapethissite.com/pages/simple/")
+    countries = page.find_all(driver, By.CLASS_NAME, identifier = "country-name", prefetch = True)
+    assert countries[0].text == "Andorra"
+    assert countries[0].size["width"] > 0
+
+
+def test_extract_all():
+    page = PageSelene.from_url(driver=driver, url = "https://www.scrapethissite.com/pages/simple/")
+    countries = page.extract_all(driver, By.CLASS_NAME, "country", fields = ["text", "class", "rect", "html"])
+    assert len(countries) > 200
+    assert countries[0]["class"] == "col-md-4 country"
+    assert "Andorra" in countries[0]["text"]
+    assert countries[0]["html"].startswith("<div")
+    assert countries[0]["rect"]["width"] > 0
+
+
+def test_page_soup_lazy():
+    page = PageSelene.from_url(driver=driver, url = "https://www.scrapethissite.com/pages/simple/")
+    assert page._page_soup is None
+    assert page.find_soup("h3", {"class": "country-name"}) is not None
+    assert page._page_soup is not None
+    page.invalidate_soup()
+    assert page._page_soup is None
+    assert page.snapshot(driver) is page.page_soup
+
+
+def test_wait_engine_observer():
+    from selene.core import config
+    config.WAIT_ENGINE = "observer"
+    try:
+        page = PageSelene.from_url(driver=driver, url = "https://www.scrapethissite.com/pages/simple/")
+        assert bool_visible(driver, by = By.CLASS_NAME, identifier = 'country', wait = 1) == True
+        assert bool_url_contains(driver, wait=1, logger=None, string = "simple") == True
+        assert bool_url_contains(driver, wait=1, logger=None, string = "not-in-url") == False
+        orig_offset = driver.execute_script("return window.pageYOffset")
+        script_scroll_to(driver, orig_offset + 200)
+        assert bool_yoffset_changed(driver, wait = 1, yoffset = orig_offset, logger = None) == True
+        assert page.find(driver, By.CLASS_NAME, "country-name").text == "Andorra"
+    finally:
+        config.WAIT_ENGINE = "poll"
+
+
+def test_from_urls_in_tabs():
+    handle = driver.current_window_handle
+    urls = [
+        "https://www.scrapethissite.com/pages/simple/",
+        "https://www.scrapethissite.com/pages/forms/",
+        "https://www.scrapethissite.com/pages/ajax-javascript/",
+    ]
+    found = []
+    for page in PageSelene.from_urls_in_tabs(driver, urls, tabs=2):
+        assert driver.current_url == page.url
+        found.append(page.url)
+    assert sorted(found) == sorted(urls)
+    assert driver.window_handles == [handle]
+    assert driver.current_window_handle == handle
+
+
+def test_from_urls_in_tabs_all_yielded():
+    import time
+    import threading
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/slow"):
+                time.sleep(3)
+            body = f"<html><body><h1>{self.path}</h1></body></html>".encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    handle = driver.current_window_handle
+    # more urls than tabs, and one which times out, so tabs are closed and reopened
+    urls = [f"{base_url}/page-{i}" for i in range(7)]
+    found = []
+    for page in PageSelene.from_urls_in_tabs(driver, urls + [f"{base_url}/slow"], tabs=2, wait=1):
+        found.append(page.url)
+    server.shutdown()
+    assert sorted(found) == sorted(urls)
+    assert driver.window_handles == [handle]
+    assert driver.current_window_handle == handle
+
+
+def test_get_driver_block():
+    import threading
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.endswith(".png"):
+                body, content_type = b"\x89PNG" + b"0" * 100000, "image/png"
+            else:
+                images = "".join(f'<img src="/{i}.png">' for i in range(5))
+                body, content_type = f"<html><body>{images}</body></html>".encode(), "text/html"
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    driver_blocking = get_driver(block=["image"], network_stats=True)
+    try:
+        driver_blocking.get(f"http://127.0.0.1:{server.server_port}/")
+        stats = get_network_stats(driver_blocking)
+        assert stats["blocked"] == 5
+        assert stats["bytes"] < 100000
+    finally:
+        stop_driver(driver_blocking)
+        server.shutdown()
+
+
+def test_page_load_strategy_ready_condition():
+    class PageCountries(PageSelene):
+        ready_condition = (By.CLASS_NAME, "country")
+
+    driver_eager = get_driver(page_load_strategy="eager")
+    try:
+        page = PageCountries.from_url(driver_eager, "https://www.scrapethissite.com/pages/simple/")
+        assert PageCountries.is_ready(driver_eager)
+        assert page.find(driver_eager, By.CLASS_NAME, "country-name", wait=0) is not None
+    finally:
+        stop_driver(driver_eager)
+
+
+def test_extract_schema():
+    class PageCountries(PageSelene):
+        schema = {
+            "first": Field("h3.country-name"),
+            "names": Field("h3.country-name", many=True),
+            "classes": Field("div.country", attr="class"),
+        }
+
+    page = PageCountries.from_url(driver=driver, url = "https://www.scrapethissite.com/pages/simple/")
+    record = page.extract(driver)
+    assert record["first"] == "Andorra"
+    assert len(record["names"]) > 200
+    assert "country" in record["classes"]
@@ -1,9 +1,16 @@
 import pytest
+import asyncio
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 
 from selene.core.soup.element import *
 from selene.core.soup.page import *
+from selene.core.soup.session import *
+from selene.core.soup.cache import HttpCache
 from selene.core.selenium.driver import *
 from selene.core.selenium.page import *
+from selene.core.schema import Field
+from benchmarks.fixtures import page_countries
 
 # initialise the driver, get a page, get its soup
 driver = get_driver()
@@ -50,3 +57,328 @@ def test_get():
 def test_element_blank():
     element_blank = ElementSoupBlank()
     assert element_blank.text is None
+
+
+class LocalHandler(BaseHTTPRequestHandler):
+    """Serve a small html page for every path, so requests can be tested offline."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = f"<html><body><h1 class='title'>{self.path}</h1></body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), LocalHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def test_page_soup_from_requests_async():
+    server, base_url = start_local_server()
+    urls = [f"{base_url}/page-{i}" for i in range(20)]
+
+    async def collect():
+        return [page async for page in PageSoup.from_requests_async(urls, per_host_limit=4)]
+
+    pages = asyncio.run(collect())
+    server.shutdown()
+    assert len(pages) == 20
+    assert {page.find("h1", {"class": "title"}).text for page in pages} == {
+        f"/page-{i}" for i in range(20)
+    }
+
+
+def test_page_soup_from_requests_async_charsets():
+    class CharsetHandler(LocalHandler):
+        def do_GET(self):
+            if self.path == "/latin-1":
+                body = "<html><body><h1 class='title'>caf\xe9</h1></body></html>".encode("latin-1")
+                content_type = "text/html; charset=iso-8859-1"
+            else:
+                body = f"<html><body><h1 class='title'>{self.path}</h1></body></html>".encode()
+                content_type = "text/html"
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CharsetHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    urls = [f"{base_url}/latin-1"] + [f"{base_url}/page-{i}" for i in range(10)]
+
+    async def collect():
+        return [page async for page in PageSoup.from_requests_async(iter(urls), concurrency=3)]
+
+    pages = asyncio.run(collect())
+    server.shutdown()
+    titles = {page.find("h1", {"class": "title"}).text for page in pages}
+    assert len(pages) == 11
+    assert "caf\xe9" in titles
+
+
+def test_page_soup_from_request_session():
+    server, base_url = start_local_server()
+    with HttpSession(pool_maxsize=2, timeout=(1, 1)) as session:
+        for i in range(5):
+            page = PageSoup.from_request(f"{base_url}/page-{i}", session=session)
+            assert page.find("h1", {"class": "title"}).text == f"/page-{i}"
+        stats = session.stats()
+    server.shutdown()
+    assert stats["requests"] == 5
+    assert stats["pools"][f"http://127.0.0.1:{server.server_port}"]["connections"] == 1
+
+
+def test_http_session_accept_encoding():
+    from importlib.util import find_spec
+
+    brotli = any(find_spec(name) is not None for name in ("brotli", "brotlicffi"))
+    with HttpSession() as session:
+        encodings = session.session.headers["Accept-Encoding"].split(", ")
+    # brotli is only asked for if urllib3 can decode it
+    assert ("br" in encodings) == brotli
+    assert "gzip" in encodings
+
+
+class CachingHandler(BaseHTTPRequestHandler):
+    """Serve pages with an ETag, replying 304 Not Modified to a matching If-None-Match."""
+
+    protocol_version = "HTTP/1.1"
+    requests = []
+
+    def do_GET(self):
+        CachingHandler.requests.append((self.path, self.headers.get("If-None-Match")))
+        etag = f'"{self.path}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        body = f"<html><body><h1 class='title'>{self.path}</h1></body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        if self.path.startswith("/fresh"):
+            self.send_header("Cache-Control", "max-age=3600")
+        if self.path.startswith("/private"):
+            self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_page_soup_from_request_cache(tmp_path):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CachingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    CachingHandler.requests = []
+    with HttpCache(str(tmp_path), max_bytes=10**6) as cache:
+        with HttpSession(cache=cache) as session:
+            for _ in range(3):
+                for path in ("/fresh", "/stale", "/private"):
+                    page = PageSoup.from_request(base_url + path, session=session)
+                    assert page.find("h1", {"class": "title"}).text == path
+            stats = session.stats()
+        cache_stats = cache.stats()
+    server.shutdown()
+    # /fresh is requested once, /stale once then revalidated, /private every time
+    assert CachingHandler.requests == [
+        ("/fresh", None), ("/stale", None), ("/private", None),
+        ("/stale", '"/stale"'), ("/private", None),
+        ("/stale", '"/stale"'), ("/private", None),
+    ]
+    assert stats["cached"] == 2
+    assert cache_stats["responses"] == 2
+    assert cache_stats["revalidated"] == 2
+
+
+def test_http_cache_eviction(tmp_path):
+    import requests
+    with HttpCache(str(tmp_path), max_bytes=2000, default_ttl=60) as cache:
+        for i in range(20):
+            response = requests.Response()
+            response.status_code = 200
+            response._content = bytes(range(256)) * (i + 4)
+            cache.store(f"http://a.b/{i}", response)
+            cache.get("http://a.b/0")
+        stats = cache.stats()
+        assert stats["bytes"] <= 2000
+        assert stats["evicted"] > 0
+        # the most recently used responses are kept
+        assert cache.get("http://a.b/0") is not None
+        assert cache.get("http://a.b/19") is not None
+        assert cache.get("http://a.b/1") is None
+
+
+def test_page_soup_lxml_backend():
+    html = page_countries(n = 250)
+    page_bs4 = PageSoup.from_html(url = "http://localhost/", html = html, backend = "bs4")
+    page_lxml = PageSoup.from_html(url = "http://localhost/", html = html, backend = "lxml")
+    countries_bs4 = page_bs4.find_all('div', {'class': 'col-md-4 country'})
+    countries_lxml = page_lxml.find_all('div', {'class': 'col-md-4 country'})
+    assert len(countries_bs4) == len(countries_lxml) == 250
+    assert countries_bs4[0].attrs == countries_lxml[0].attrs
+    assert countries_lxml[0].attrs["class"] == ["col-md-4", "country"]
+    assert countries_bs4[0].find('h3').text.strip() == countries_lxml[0].find('h3').text.strip() == "Country 0"
+    assert page_lxml.find('a', {'class': 'data-attribution'}).get("href") == "http://example.com/"
+    assert page_lxml.find('div', {'class': 'does-not-exist'}).text is None
+
+
+def test_page_soup_lxml_backend_quoting():
+    html = """<div><a title="it's &quot;quoted&quot;">1</a><p class="it's">2</p></div>"""
+    for backend in ["bs4", "lxml"]:
+        page = PageSoup.from_html(url = "http://localhost/", html = html, backend = backend)
+        assert page.find('a', {'title': 'it\'s "quoted"'}).text == "1"
+        assert page.find('p', {'class': "it's"}).text == "2"
+        # names are not spliced into the XPath, so they cannot widen the search
+        assert page.find_all('a]|//p') == []
+        assert page.find_all('a', {'x]|//p[@y': True}) == []
+
+
+def test_page_soup_parse_only():
+    class PageCountries(PageSoup):
+        parse_only = ("div", {"class": "country"})
+
+    for backend in ["bs4", "lxml"]:
+        page_countries_only = PageCountries.from_html(url = "http://localhost/", html = page_countries(n = 250), backend = backend)
+        assert len(page_countries_only.find_all('div', {'class': 'col-md-4 country'})) == 250
+        assert len(page_countries_only.find_all('h3')) == 250
+        assert page_countries_only.find('a', {'class': 'data-attribution'}).text is None
+
+
+def test_page_soup_extract():
+    html = """
+        <div class="country"><h3>Andorra</h3><span class="population">84000</span></div>
+        <div class="country"><h3>Angola</h3><span class="population">13068161</span></div>
+        <a class="next" href="/page/2">next</a>
+    """
+
+    class PageCountries(PageSoup):
+        schema = {
+            "first": Field("div.country h3"),
+            "names": Field("div.country h3", many=True),
+            "populations": Field("span.population", post=int, many=True),
+            "next": Field("a.next", attr="href"),
+            "missing": Field("table", default=""),
+        }
+
+    for backend in ["bs4", "lxml"]:
+        page_countries = PageCountries.from_html(url = "http://localhost/", html = html, backend = backend)
+        assert page_countries.extract() == {
+            "first": "Andorra",
+            "names": ["Andorra", "Angola"],
+            "populations": [84000, 13068161],
+            "next": "/page/2",
+            "missing": "",
+        }
+        assert page_countries.extract(as_record=True).next == "/page/2"
+
+
+def test_page_soup_extract_field_names():
+    class PageProduct(PageSoup):
+        schema = {"product-title": Field("h1"), "price": Field("span.price")}
+
+    page = PageProduct.from_html(url="http://localhost/", html="<h1>Tea</h1><span class='price'>2</span>")
+    # field names which are not identifiers work as dicts, and are renamed in records
+    assert page.extract() == {"product-title": "Tea", "price": "2"}
+    assert tuple(page.extract(as_record=True)) == ("Tea", "2")
+    assert page.extract(as_record=True).price == "2"
+
+
+def test_selector_cache():
+    from selene.core.soup.backends import SELECTOR_CACHE, get_selector_stats
+
+    SELECTOR_CACHE.clear()
+    html = '<div class="country"><h3>Andorra</h3></div><div class="country"><h3>Angola</h3></div>'
+    for backend in ["bs4", "lxml"]:
+        for _ in range(3):
+            page_countries = PageSoup.from_html(url = "http://localhost/", html = html, backend = backend)
+            assert len(page_countries.find_all("div", {"class": "country"})) == 2
+    stats = {s["backend"]: s for s in get_selector_stats()}
+    assert stats["bs4"]["misses"] == 1 and stats["bs4"]["hits"] == 2
+    assert stats["lxml"]["misses"] == 1 and stats["lxml"]["hits"] == 2
+    assert stats["bs4"]["calls"] == 3 and stats["bs4"]["seconds"] > 0
+
+
+def test_selector_cache_tag_name():
+    from selene.core.soup.backends import SELECTOR_CACHE, get_selector_stats
+
+    SELECTOR_CACHE.clear()
+    html = '<div class="country"><h3>Andorra</h3></div><div class="country"><h3>Angola</h3></div>'
+    for _ in range(3):
+        page_countries = PageSoup.from_html(url = "http://localhost/", html = html)
+        assert len(page_countries.find_all("h3")) == 2
+    # a bare tag name is searched for as it is, but its searches are still counted
+    stats = get_selector_stats()
+    assert len(stats) == 1 and stats[0]["selector"][0] == "h3"
+    assert stats[0]["misses"] == 1 and stats[0]["calls"] == 3
+
+
+def test_selector_cache_bounded():
+    from selene.core.soup.backends import SelectorCache
+
+    cache = SelectorCache(maxsize=2)
+    for i in range(100):
+        key = ("bs4", "a", (("href", f"/page-{i}"),))
+        cache.get(key, lambda: i)
+        cache.record(key, 0.001)
+    # the statistics of evicted selectors are dropped with them
+    assert len(cache) == 2
+    assert len(cache.stats()) == 2
+
+
+class ThrottlingHandler(BaseHTTPRequestHandler):
+    """Reply 429 Too Many Requests, with a Retry-After, to every other request."""
+
+    protocol_version = "HTTP/1.1"
+    count = 0
+
+    def do_GET(self):
+        ThrottlingHandler.count += 1
+        if ThrottlingHandler.count % 2 == 0:
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = b"<html><body><h1 class='title'>ok</h1></body></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_page_soup_from_request_adaptive():
+    from selene.core.utils import AdaptiveController
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ThrottlingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    ThrottlingHandler.count = 0
+    controller = AdaptiveController(qps=50, max_qps=100, increase=10)
+    with HttpSession(retries=0, limiter=controller) as session:
+        for i in range(4):
+            session.get(f"{base_url}/page-{i}")
+    server.shutdown()
+    stats = controller.stats()["127.0.0.1:" + str(server.server_port)]
+    assert stats["requests"] == 4
+    assert stats["in_flight"] == 0
+    assert stats["increases"] == 2
+    assert stats["decreases"] >= 1
+    assert stats["qps"] < 50